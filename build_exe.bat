@@ -13,11 +13,16 @@ if %ERRORLEVEL% neq 0 exit /b 1
 python -m pip install -r requirements.txt
 if %ERRORLEVEL% neq 0 exit /b 1
 
+python scripts\build_assets.py
+if %ERRORLEVEL% neq 0 exit /b 1
+
 pyinstaller --noconfirm --onefile --windowed --name OW2HeroBansGUI ^
   --add-data "assets;assets" ^
+  --add-data "bundles;bundles" ^
   --add-data "css;css" ^
-  --add-data "data;data" ^
+  --add-data "data\heroes.json;data" ^
   --add-data "js;js" ^
+  --add-data "templates;templates" ^
   --add-data "team1.html;." ^
   --add-data "team2.html;." ^
   --add-data "control.html;." ^
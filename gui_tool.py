@@ -3,25 +3,106 @@
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import base64
+import gzip
+import hashlib
+import html
+import http.client
+import io
 import json
+import math
+import mimetypes
+import os
 import re
+import select
+import selectors
+import socket
+import socketserver
+import stat
+import struct
 import sys
+import tempfile
 import threading
 import time
 import tkinter as tk
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
 from tkinter import ttk
+from types import MappingProxyType
+from string import Template
 from typing import Any, Callable
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, unquote, unquote_to_bytes, urlencode, urlparse
+
+try:
+    import sqlite3
+except ImportError:  # Some embedded Python builds ship without it; match history is then unavailable.
+    sqlite3 = None  # type: ignore[assignment]
 
 from PIL import Image, ImageTk
 
 APP_HOST = "127.0.0.1"
 APP_PORT = 8765
 MAX_SUGGESTIONS = 12
-
+SSE_HEARTBEAT_SECONDS = 15.0
+SSE_RETRY_MS = 1000
+GZIP_MIN_BYTES = 1024
+STATIC_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Static files this large (the Valorant map art) are streamed with sendfile instead of held in memory.
+STATIC_SENDFILE_MIN_BYTES = 256 * 1024
+# Content types that get a gzip variant; images and fonts are compressed already.
+STATIC_GZIP_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+# Bundles from scripts/build_assets.py carry their content hash in the name, so a URL never changes content.
+HASHED_ASSET_RE = re.compile(r"^[a-z0-9-]+\.[0-9a-f]{12}\.(?:js|css)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ASSET_TAG_RE = re.compile(r'<(?:script|link)\b[^>]*?\b(?:src|href)="(?:\./)?(?P<ref>[^"?#]+)"[^>]*>(?:</script>)?')
+LONG_POLL_DEFAULT_SECONDS = 25.0
+LONG_POLL_MAX_SECONDS = 55.0
+# How often a waiting long-poll checks whether its client hung up.
+LONG_POLL_CHECK_SECONDS = 1.0
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+WS_PING_SECONDS = 15.0
+WS_OP_CONTINUATION = 0x0
+WS_OP_TEXT = 0x1
+WS_OP_CLOSE = 0x8
+WS_OP_PING = 0x9
+WS_OP_PONG = 0xA
+BRIDGE_ENGINES = ("threaded", "asyncio")
+DEFAULT_LANE_WORKERS = {"api": 4, "stream": 32, "static": 4}
+# Requests a lane may queue beyond its free workers; lanes not listed queue without limit.
+LANE_QUEUE_LIMITS = {"stream": 0}
+LANE_RETRY_AFTER_SECONDS = 2
+LANE_WAIT_WINDOW = 512
+LANE_PEEK_BYTES = 2048
+LANE_CLASSIFY_TIMEOUT_SECONDS = 30.0
+LOCAL_SOCKET_MAX_FRAME_BYTES = 16 * 1024 * 1024
+CACHE_WRITE_INTERVAL_SECONDS = 1.0
+CACHE_FSYNC_POLICIES = ("always", "shutdown", "never")
+JOURNAL_COMPACT_ENTRIES = 500
+HISTORY_LIMIT = 100
+ASYNC_IDLE_TIMEOUT_SECONDS = 75.0
+ASYNC_MAX_HEADER_BYTES = 64 * 1024
+ASYNC_MAX_BODY_BYTES = 16 * 1024 * 1024
+SIGNAL_TTL_DEFAULT_MS = 2000
+SIGNAL_TTL_MAX_MS = 10000
+SIGNAL_BUFFER = 64
+MATCH_CACHE_LIMIT = 16
+DEFAULT_MATCH = "default"
+STATS_LIMIT_DEFAULT = 20
+STATS_LIMIT_MAX = 500
+SQLITE_INT_MIN = -(2**63)
+SQLITE_INT_MAX = 2**63 - 1
+
+ICON_SIZE = 24
+ICON_DECODE_WORKERS = 4
 WINDOW_WIDTH = 300
 WINDOW_HEIGHT = 450
 
@@ -38,16 +119,125 @@ BTN_DANGER = "#ff5f67"
 
 if getattr(sys, "frozen", False):
     ROOT_DIR = Path(getattr(sys, "_MEIPASS", Path.cwd()))
+    # A --onefile build unpacks ROOT_DIR into a temp folder that is deleted on
+    # exit, so the state, history and caches it writes go to a per-user folder.
+    if os.environ.get("LOCALAPPDATA"):
+        DATA_DIR = Path(os.environ["LOCALAPPDATA"]) / "OW2HeroBansGUI"
+    else:
+        DATA_DIR = Path(sys.executable).resolve().parent / "data"
 else:
     ROOT_DIR = Path(__file__).resolve().parent
+    DATA_DIR = ROOT_DIR / "data"
 
 HEROES_JSON = ROOT_DIR / "data" / "heroes.json"
-STATE_CACHE_PATH = ROOT_DIR / "data" / "controller_state_cache.json"
+STATE_CACHE_PATH = DATA_DIR / "controller_state_cache.json"
+STATE_JOURNAL_PATH = DATA_DIR / "controller_state_journal.jsonl"
+MATCHES_DIR = DATA_DIR / "matches"
+HISTORY_DB_PATH = DATA_DIR / "match_history.sqlite3"
+ICON_CACHE_DIR = DATA_DIR / "icon_cache"
+MATCH_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+BLOBS_DIR = DATA_DIR / "blobs"
+BLOB_MAX_BYTES = 4 * 1024 * 1024
+# Freshly uploaded blobs survive GC this long so the state commit that references them can land.
+BLOB_GC_GRACE_SECONDS = 600.0
+BLOB_REF_RE = re.compile(r"^blob:([0-9a-f]{64})$")
+BLOB_REF_SCAN_RE = re.compile(r"blob:([0-9a-f]{64})")
+BLOB_CONTENT_TYPES = {"image/png": ".png", "image/jpeg": ".jpg", "image/gif": ".gif", "image/webp": ".webp", "image/svg+xml": ".svg"}
 FONTS_DIR = ROOT_DIR / "assets" / "Fonts"
+VALORANT_MAPS_JSON = ROOT_DIR / "assets" / "valorant" / "maps.json"
+BUNDLES_DIR = ROOT_DIR / "bundles"
+ASSET_MANIFEST_PATH = BUNDLES_DIR / "manifest.json"
+OVERLAY_TEMPLATES_DIR = ROOT_DIR / "templates"
+OVERLAY_CACHE_SIZE = 64
+BOOTSTRAP_CACHE_SIZE = 16
+SCOREBOARD_ROLES = ("name", "logo", "score")
+# The per-team scoreboard pages that /overlay/scoreboard replaced; their URLs redirect to it.
+LEGACY_OVERLAY_PAGES = {f"/scoreboard-{team}-{role}.html": (team, role) for team in ("team1", "team2") for role in SCOREBOARD_ROLES}
 FONT_EXTENSIONS = {".ttf", ".otf", ".woff", ".woff2"}
 VALORANT_MAP_OPTIONS = {"Ascent", "Bind", "Breeze", "Fracture", "Haven", "Icebox", "Lotus", "Pearl", "Split", "Sunset", "Abyss", "Corrode"}
 VALORANT_MAP_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
 VALORANT_MAP_ID_RE = re.compile(r"^[a-z0-9][a-z0-9-]*$")
+STATE_TEAMS = ("team1", "team2")
+VALORANT_VETO_SLOTS = ("ban1", "ban2", "pick1", "pick2", "ban3", "ban4", "pick3")
+VALORANT_PICKS = ("pick1", "pick2", "pick3")
+# Best-of-three veto order: the teams alternate starting with team1 and the last pick is the decider.
+VALORANT_VETO_TEAMS = {"ban1": "team1", "ban2": "team2", "pick1": "team1", "pick2": "team2", "ban3": "team1", "ban4": "team2", "pick3": ""}
+# Top-level state keys whose changes can touch the match history.
+HISTORY_STATE_KEYS = frozenset({"team1", "team2", "scoreboard", "valorantMapVeto", "valorantGameScore"})
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match TEXT PRIMARY KEY,
+    team1_name TEXT NOT NULL DEFAULT '',
+    team2_name TEXT NOT NULL DEFAULT '',
+    team1_score INTEGER NOT NULL DEFAULT 0,
+    team2_score INTEGER NOT NULL DEFAULT 0,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hero_bans (
+    id INTEGER PRIMARY KEY,
+    match TEXT NOT NULL,
+    team TEXT NOT NULL,
+    team_name TEXT NOT NULL,
+    hero TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hero_bans_hero ON hero_bans (hero, match);
+CREATE INDEX IF NOT EXISTS hero_bans_match ON hero_bans (match, hero);
+CREATE INDEX IF NOT EXISTS hero_bans_team ON hero_bans (team_name COLLATE NOCASE, hero);
+CREATE INDEX IF NOT EXISTS hero_bans_ts ON hero_bans (ts);
+CREATE TABLE IF NOT EXISTS map_vetoes (
+    match TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    team TEXT NOT NULL,
+    team_name TEXT NOT NULL,
+    map TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    PRIMARY KEY (match, slot)
+);
+CREATE INDEX IF NOT EXISTS map_vetoes_map ON map_vetoes (map, kind);
+CREATE INDEX IF NOT EXISTS map_vetoes_team ON map_vetoes (team_name COLLATE NOCASE, kind, map);
+CREATE TABLE IF NOT EXISTS game_scores (
+    match TEXT NOT NULL,
+    pick TEXT NOT NULL,
+    map TEXT NOT NULL,
+    team1_name TEXT NOT NULL,
+    team2_name TEXT NOT NULL,
+    team1_score INTEGER NOT NULL,
+    team2_score INTEGER NOT NULL,
+    winner TEXT NOT NULL,
+    winner_name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    PRIMARY KEY (match, pick)
+);
+CREATE INDEX IF NOT EXISTS game_scores_map ON game_scores (map);
+CREATE INDEX IF NOT EXISTS game_scores_team1 ON game_scores (team1_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS game_scores_team2 ON game_scores (team2_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS game_scores_ts ON game_scores (ts);
+"""
+COMMAND_BATCH_LIMIT = 256
+# Longest string a command may carry; hero and map names are far shorter.
+COMMAND_TEXT_MAX_CHARS = 64
+# Slices served by /api/state/<section> and /api/events/<section>, as dotted paths into the state.
+STATE_SECTIONS = {
+    "heroBans": ("team1", "team2"),
+    "heroBans/team1": ("team1",),
+    "heroBans/team2": ("team2",),
+    "scoreboard": ("scoreboard",),
+    "scoreboard/team1": ("scoreboard.team1",),
+    "scoreboard/team2": ("scoreboard.team2",),
+    "valorantMapVeto": ("valorantMapVeto", "valorantMapPool", "valorantPickSides", "valorantGameScore", "scoreboard.team1.logo", "scoreboard.team2.logo"),
+    "logoParticle": ("logoParticle",),
+}
+# One-shot triggers accepted by /api/signals, by topic; a topic is delivered on
+# the /api/events stream of the section with the same name.
+SIGNAL_TYPES = {
+    "logoParticle": ("start-sequence", "burst"),
+}
 
 
 def _humanize_font_name(path: Path) -> str:
@@ -71,36 +261,19 @@ def _list_font_entries() -> list[dict[str, str]]:
     return entries
 
 
-def _sanitize_score(value: Any) -> int:
-    try:
-        return max(0, int(float(value or 0)))
-    except Exception:
-        return 0
-
-
-def _sanitize_logo_scale(value: Any) -> int:
-    try:
-        numeric = int(round(float(value or 0)))
-    except Exception:
-        return 0
-
-    if numeric < -50:
-        return -50
-    if numeric > 50:
-        return 50
-    return numeric
-
-
-def _sanitize_name_png_scale(value: Any) -> int:
-    return _sanitize_logo_scale(value)
-
-
-def _sanitize_name_png_toggle(value: Any) -> bool:
-    if isinstance(value, bool):
-        return value
-    if isinstance(value, str):
-        return value.strip().lower() in {"1", "true", "yes", "on"}
-    return bool(value)
+def _fonts_signature() -> tuple[tuple[str, int], ...]:
+    """The mtimes of ``FONTS_DIR`` and its subdirectories, which move whenever a font is added or removed."""
+    signature: list[tuple[str, int]] = []
+    pending = [str(FONTS_DIR)]
+    while pending:
+        directory = pending.pop()
+        try:
+            signature.append((directory, os.stat(directory).st_mtime_ns))
+            with os.scandir(directory) as entries:
+                pending.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return tuple(sorted(signature))
 
 
 def _sanitize_valorant_map(value):
@@ -116,12 +289,24 @@ def _sanitize_valorant_map(value):
     return ""
 
 
+def _sanitize_valorant_map_pool(value):
+    """The selected maps, or ``None`` until a controller has sent a pool (every map is allowed)."""
+    if not isinstance(value, (list, tuple)):
+        return None
+    pool = []
+    for entry in value:
+        cleaned = _sanitize_valorant_map(entry)
+        if cleaned and cleaned not in pool:
+            pool.append(cleaned)
+    return pool
+
+
 def _sanitize_valorant_pick_team(value):
-    return "team2" if str(value or "").strip() == "team2" else "team1"
+    return "team2" if str(value or "").strip().lower() == "team2" else "team1"
 
 
 def _sanitize_valorant_pick_sides(value):
-    value = value or {}
+    value = value if isinstance(value, dict) else {}
     defenders = _sanitize_valorant_pick_team(value.get("defenders", "team1"))
     attackers = _sanitize_valorant_pick_team(value.get("attackers", "team2"))
     if attackers == defenders:
@@ -129,159 +314,2485 @@ def _sanitize_valorant_pick_sides(value):
     return {"defenders": defenders, "attackers": attackers}
 
 
-def _sanitize_valorant_winner(value):
-    value = str(value or "").strip()
-    return value if value in ("team1", "team2") else ""
+def _sanitize_particle_logo_source(value):
+    raw = str(value or "")
+    if not raw:
+        return ""
+    if BLOB_REF_RE.match(raw):
+        return raw
+    if not raw.startswith("data:image/"):
+        return ""
+    if len(raw) > 4 * 1024 * 1024:
+        return ""
+    # Inline logos from older controllers are moved into the blob store so the
+    # state document (and every poll of it) stays small.
+    try:
+        return BLOB_STORE.put_data_url(raw)
+    except Exception:
+        return raw
+
+
+def _sanitize_logo_particle_command(value):
+    if not isinstance(value, dict):
+        return None
+    command_type = str(value.get("type", "") or "").strip()
+    if command_type not in ("start-sequence", "burst"):
+        return None
+    try:
+        nonce = int(float(value.get("nonce", 0)))
+    except Exception:
+        nonce = 0
+    try:
+        ts = int(float(value.get("ts", int(time.time() * 1000))))
+    except Exception:
+        ts = int(time.time() * 1000)
+    return {"type": command_type, "nonce": nonce, "ts": ts}
+
+
+# BEGIN GENERATED STATE SANITIZER (scripts/state_schema.py; do not edit by hand)
+_SCHEMA_COLOR_RE = re.compile(r"#[0-9a-fA-F]{6}")
+_SCHEMA_FONT_FILE_RE = re.compile(r"file:[a-zA-Z0-9_./ %\\-]+\.(ttf|otf|woff2?)", re.IGNORECASE)
+_SCHEMA_BUILTIN_FONTS = ("varsity", "block", "classic")
+
+
+def _schema_list(value):
+    return value if isinstance(value, (list, tuple)) else ()
+
+
+def _schema_number(value):
+    # ints are by far the most common input, so they skip the float round trip.
+    if type(value) is int:
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        numeric = float(value)
+    except ValueError:
+        return None
+    return numeric if math.isfinite(numeric) else None
+
+
+def _schema_float(value, default, minimum, maximum):
+    numeric = None if value is None else _schema_number(value)
+    if numeric is None:
+        return default
+    if minimum is not None and numeric < minimum:
+        return minimum
+    if maximum is not None and numeric > maximum:
+        return maximum
+    return numeric
+
+
+def _schema_int(value, default, minimum, maximum):
+    numeric = None if value is None else _schema_number(value)
+    if numeric is None:
+        return default
+    if type(numeric) is not int:
+        numeric = int(math.floor(numeric + 0.5))
+    if minimum is not None and numeric < minimum:
+        return minimum
+    if maximum is not None and numeric > maximum:
+        return maximum
+    return numeric
 
 
-def _sanitize_valorant_game_score(value):
-    value = value or {}
+def _schema_floor(value, default, minimum, maximum):
+    numeric = None if value is None else _schema_number(value)
+    if numeric is None:
+        return default
+    if type(numeric) is not int:
+        numeric = int(math.floor(numeric))
+    if minimum is not None and numeric < minimum:
+        return minimum
+    if maximum is not None and numeric > maximum:
+        return maximum
+    return numeric
+
+
+def _schema_text(value, default):
+    return value if isinstance(value, str) and value else default
+
+
+def _schema_toggle(value, default):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(value, (int, float)):
+        return value != 0
+    return default
+
+
+def _schema_flag(value, default):
+    return value if isinstance(value, bool) else default
+
+
+def _schema_color(value, default):
+    raw = value.strip() if isinstance(value, str) else ""
+    return raw if _SCHEMA_COLOR_RE.fullmatch(raw) else default
+
+
+def _schema_font(value, default):
+    raw = value.strip() if isinstance(value, str) else ""
+    return raw if raw in _SCHEMA_BUILTIN_FONTS or _SCHEMA_FONT_FILE_RE.fullmatch(raw) else default
+
+
+def _schema_choice(value, options, default):
+    raw = value.strip() if isinstance(value, str) else ""
+    return raw if raw in options else default
+
+
+def _sanitize_state(payload):
+    source = payload if type(payload) is dict else {}
+    team1 = source.get("team1")
+    if type(team1) is not dict:
+        team1 = {}
+    team1_ban = team1.get("ban")
+    team2 = source.get("team2")
+    if type(team2) is not dict:
+        team2 = {}
+    team2_ban = team2.get("ban")
+    scoreboard = source.get("scoreboard")
+    if type(scoreboard) is not dict:
+        scoreboard = {}
+    scoreboard_team1 = scoreboard.get("team1")
+    if type(scoreboard_team1) is not dict:
+        scoreboard_team1 = {}
+    scoreboard_team1_name = scoreboard_team1.get("name")
+    scoreboard_team1_name_use_png = scoreboard_team1.get("nameUsePng")
+    scoreboard_team1_name_png = scoreboard_team1.get("namePng")
+    scoreboard_team1_name_png_scale = scoreboard_team1.get("namePngScale")
+    scoreboard_team1_logo = scoreboard_team1.get("logo")
+    scoreboard_team1_logo_scale = scoreboard_team1.get("logoScale")
+    scoreboard_team1_score = scoreboard_team1.get("score")
+    scoreboard_team2 = scoreboard.get("team2")
+    if type(scoreboard_team2) is not dict:
+        scoreboard_team2 = {}
+    scoreboard_team2_name = scoreboard_team2.get("name")
+    scoreboard_team2_name_use_png = scoreboard_team2.get("nameUsePng")
+    scoreboard_team2_name_png = scoreboard_team2.get("namePng")
+    scoreboard_team2_name_png_scale = scoreboard_team2.get("namePngScale")
+    scoreboard_team2_logo = scoreboard_team2.get("logo")
+    scoreboard_team2_logo_scale = scoreboard_team2.get("logoScale")
+    scoreboard_team2_score = scoreboard_team2.get("score")
+    valorant_map_veto = source.get("valorantMapVeto")
+    if type(valorant_map_veto) is not dict:
+        valorant_map_veto = {}
+    valorant_pick_sides = source.get("valorantPickSides")
+    if type(valorant_pick_sides) is not dict:
+        valorant_pick_sides = {}
+    valorant_game_score = source.get("valorantGameScore")
+    if type(valorant_game_score) is not dict:
+        valorant_game_score = {}
+    valorant_game_score_pick1 = valorant_game_score.get("pick1")
+    if type(valorant_game_score_pick1) is not dict:
+        valorant_game_score_pick1 = {}
+    valorant_game_score_pick1_team1_score = valorant_game_score_pick1.get("team1Score")
+    valorant_game_score_pick1_team2_score = valorant_game_score_pick1.get("team2Score")
+    valorant_game_score_pick2 = valorant_game_score.get("pick2")
+    if type(valorant_game_score_pick2) is not dict:
+        valorant_game_score_pick2 = {}
+    valorant_game_score_pick2_team1_score = valorant_game_score_pick2.get("team1Score")
+    valorant_game_score_pick2_team2_score = valorant_game_score_pick2.get("team2Score")
+    valorant_game_score_pick3 = valorant_game_score.get("pick3")
+    if type(valorant_game_score_pick3) is not dict:
+        valorant_game_score_pick3 = {}
+    valorant_game_score_pick3_team1_score = valorant_game_score_pick3.get("team1Score")
+    valorant_game_score_pick3_team2_score = valorant_game_score_pick3.get("team2Score")
     return {
-        "winner": _sanitize_valorant_winner(value.get("winner", "")),
-        "team1Score": _sanitize_score(value.get("team1Score", 0)),
-        "team2Score": _sanitize_score(value.get("team2Score", 0)),
+        "team1": {
+            "ban": team1_ban if type(team1_ban) is str and team1_ban else "",
+        },
+        "team2": {
+            "ban": team2_ban if type(team2_ban) is str and team2_ban else "",
+        },
+        "scoreboard": {
+            "team1": {
+                "name": scoreboard_team1_name if type(scoreboard_team1_name) is str and scoreboard_team1_name else "",
+                "nameUsePng": scoreboard_team1_name_use_png if type(scoreboard_team1_name_use_png) is bool else _schema_toggle(scoreboard_team1_name_use_png, False),
+                "namePng": scoreboard_team1_name_png if type(scoreboard_team1_name_png) is str and scoreboard_team1_name_png else "",
+                "namePngScale": scoreboard_team1_name_png_scale if type(scoreboard_team1_name_png_scale) is int and -50 <= scoreboard_team1_name_png_scale and scoreboard_team1_name_png_scale <= 50 else _schema_int(scoreboard_team1_name_png_scale, 0, -50, 50),
+                "logo": scoreboard_team1_logo if type(scoreboard_team1_logo) is str and scoreboard_team1_logo else "",
+                "logoScale": scoreboard_team1_logo_scale if type(scoreboard_team1_logo_scale) is int and -50 <= scoreboard_team1_logo_scale and scoreboard_team1_logo_scale <= 50 else _schema_int(scoreboard_team1_logo_scale, 0, -50, 50),
+                "score": scoreboard_team1_score if type(scoreboard_team1_score) is int and 0 <= scoreboard_team1_score else _schema_floor(scoreboard_team1_score, 0, 0, None),
+                "nameColor": _schema_color(scoreboard_team1.get("nameColor"), "#e9eefc"),
+                "bevelColor": _schema_color(scoreboard_team1.get("bevelColor"), "#7dd3fc"),
+                "nameFont": _schema_font(scoreboard_team1.get("nameFont"), "varsity"),
+            },
+            "team2": {
+                "name": scoreboard_team2_name if type(scoreboard_team2_name) is str and scoreboard_team2_name else "",
+                "nameUsePng": scoreboard_team2_name_use_png if type(scoreboard_team2_name_use_png) is bool else _schema_toggle(scoreboard_team2_name_use_png, False),
+                "namePng": scoreboard_team2_name_png if type(scoreboard_team2_name_png) is str and scoreboard_team2_name_png else "",
+                "namePngScale": scoreboard_team2_name_png_scale if type(scoreboard_team2_name_png_scale) is int and -50 <= scoreboard_team2_name_png_scale and scoreboard_team2_name_png_scale <= 50 else _schema_int(scoreboard_team2_name_png_scale, 0, -50, 50),
+                "logo": scoreboard_team2_logo if type(scoreboard_team2_logo) is str and scoreboard_team2_logo else "",
+                "logoScale": scoreboard_team2_logo_scale if type(scoreboard_team2_logo_scale) is int and -50 <= scoreboard_team2_logo_scale and scoreboard_team2_logo_scale <= 50 else _schema_int(scoreboard_team2_logo_scale, 0, -50, 50),
+                "score": scoreboard_team2_score if type(scoreboard_team2_score) is int and 0 <= scoreboard_team2_score else _schema_floor(scoreboard_team2_score, 0, 0, None),
+                "nameColor": _schema_color(scoreboard_team2.get("nameColor"), "#e9eefc"),
+                "bevelColor": _schema_color(scoreboard_team2.get("bevelColor"), "#7dd3fc"),
+                "nameFont": _schema_font(scoreboard_team2.get("nameFont"), "varsity"),
+            },
+        },
+        "valorantMapVeto": {
+            "ban1": _sanitize_valorant_map(valorant_map_veto.get("ban1")),
+            "ban2": _sanitize_valorant_map(valorant_map_veto.get("ban2")),
+            "pick1": _sanitize_valorant_map(valorant_map_veto.get("pick1")),
+            "pick2": _sanitize_valorant_map(valorant_map_veto.get("pick2")),
+            "ban3": _sanitize_valorant_map(valorant_map_veto.get("ban3")),
+            "ban4": _sanitize_valorant_map(valorant_map_veto.get("ban4")),
+            "pick3": _sanitize_valorant_map(valorant_map_veto.get("pick3")),
+        },
+        "valorantMapPool": _sanitize_valorant_map_pool(source.get("valorantMapPool")),
+        "valorantPickSides": {
+            "pick1": _sanitize_valorant_pick_sides(valorant_pick_sides.get("pick1")),
+            "pick2": _sanitize_valorant_pick_sides(valorant_pick_sides.get("pick2")),
+            "pick3": _sanitize_valorant_pick_sides(valorant_pick_sides.get("pick3")),
+        },
+        "valorantGameScore": {
+            "pick1": {
+                "winner": _schema_choice(valorant_game_score_pick1.get("winner"), ("team1", "team2"), ""),
+                "team1Score": valorant_game_score_pick1_team1_score if type(valorant_game_score_pick1_team1_score) is int and 0 <= valorant_game_score_pick1_team1_score else _schema_floor(valorant_game_score_pick1_team1_score, 0, 0, None),
+                "team2Score": valorant_game_score_pick1_team2_score if type(valorant_game_score_pick1_team2_score) is int and 0 <= valorant_game_score_pick1_team2_score else _schema_floor(valorant_game_score_pick1_team2_score, 0, 0, None),
+            },
+            "pick2": {
+                "winner": _schema_choice(valorant_game_score_pick2.get("winner"), ("team1", "team2"), ""),
+                "team1Score": valorant_game_score_pick2_team1_score if type(valorant_game_score_pick2_team1_score) is int and 0 <= valorant_game_score_pick2_team1_score else _schema_floor(valorant_game_score_pick2_team1_score, 0, 0, None),
+                "team2Score": valorant_game_score_pick2_team2_score if type(valorant_game_score_pick2_team2_score) is int and 0 <= valorant_game_score_pick2_team2_score else _schema_floor(valorant_game_score_pick2_team2_score, 0, 0, None),
+            },
+            "pick3": {
+                "winner": _schema_choice(valorant_game_score_pick3.get("winner"), ("team1", "team2"), ""),
+                "team1Score": valorant_game_score_pick3_team1_score if type(valorant_game_score_pick3_team1_score) is int and 0 <= valorant_game_score_pick3_team1_score else _schema_floor(valorant_game_score_pick3_team1_score, 0, 0, None),
+                "team2Score": valorant_game_score_pick3_team2_score if type(valorant_game_score_pick3_team2_score) is int and 0 <= valorant_game_score_pick3_team2_score else _schema_floor(valorant_game_score_pick3_team2_score, 0, 0, None),
+            },
+        },
+        "logoParticle": _sanitize_logo_particle_state(source.get("logoParticle")),
+        "updatedAt": int(time.time() * 1000),
     }
 
 
+def _sanitize_logo_particle_state(payload):
+    source = payload if type(payload) is dict else {}
+    density = source.get("density")
+    size = source.get("size")
+    speed = source.get("speed")
+    depth = source.get("depth")
+    start_angle = source.get("startAngle")
+    team1_reset = source.get("team1Reset")
+    hold_time = source.get("holdTime")
+    burst_force = source.get("burstForce")
+    camera_distance = source.get("cameraDistance")
+    active_logo_index = source.get("activeLogoIndex")
+    logo_sources = _schema_list(source.get("logoSources"))
+    return {
+        "density": density if type(density) is int and 3 <= density and density <= 12 else _schema_int(density, 6, 3, 12),
+        "size": size if type(size) is float and 1.0 <= size and size <= 5.0 else _schema_float(size, 2.0, 1.0, 5.0),
+        "speed": speed if type(speed) is float and 0.03 <= speed and speed <= 0.2 else _schema_float(speed, 0.08, 0.03, 0.2),
+        "depth": depth if type(depth) is float and 0.0 <= depth and depth <= 1.0 else _schema_float(depth, 0.55, 0.0, 1.0),
+        "startAngle": start_angle if type(start_angle) is int and 0 <= start_angle and start_angle <= 359 else _schema_int(start_angle, 10, 0, 359),
+        "team1Reset": team1_reset if type(team1_reset) is bool else _schema_flag(team1_reset, True),
+        "holdTime": hold_time if type(hold_time) is int and 2 <= hold_time and hold_time <= 15 else _schema_int(hold_time, 6, 2, 15),
+        "burstForce": burst_force if type(burst_force) is float and 0.0 <= burst_force and burst_force <= 2.0 else _schema_float(burst_force, 1.0, 0.0, 2.0),
+        "cameraDistance": camera_distance if type(camera_distance) is int and 420 <= camera_distance and camera_distance <= 1100 else _schema_int(camera_distance, 700, 420, 1100),
+        "activeLogoIndex": active_logo_index if type(active_logo_index) is int and 0 <= active_logo_index and active_logo_index <= 1 else _schema_int(active_logo_index, 0, 0, 1),
+        "logoSources": [
+            _sanitize_particle_logo_source(logo_sources[0] if len(logo_sources) > 0 else None),
+            _sanitize_particle_logo_source(logo_sources[1] if len(logo_sources) > 1 else None),
+        ],
+        "command": _sanitize_logo_particle_command(source.get("command")),
+    }
+# END GENERATED STATE SANITIZER
+
+
+def _query_int(query: dict[str, list[str]], key: str) -> int | None:
+    try:
+        return int(query[key][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def _query_float(query: dict[str, list[str]], key: str, default: float) -> float:
+    try:
+        return float(query[key][0])
+    except (KeyError, IndexError, ValueError):
+        return default
+
+
+def _query_fields(query: dict[str, list[str]]) -> tuple[str, ...]:
+    fields = []
+    for raw in query.get("fields", []):
+        fields.extend(field.strip() for field in raw.split(",") if field.strip())
+    return tuple(fields)
+
+
+def _project_state(state: dict[str, Any], paths: tuple[str, ...]) -> dict[str, Any]:
+    """Copy only the dotted ``paths`` out of ``state``, keeping the document shape.
+
+    Missing paths are skipped so a projection never invents keys the bridge does not store.
+    """
+    projected: dict[str, Any] = {}
+    # Deepest paths first: a shorter path later replaces the whole subtree instead of
+    # writing into a dict that still belongs to the committed state.
+    for path in sorted(paths, key=lambda item: -item.count(".")):
+        keys = path.split(".")
+        value: Any = state
+        for key in keys:
+            if not isinstance(value, Mapping) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = projected
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+    return projected
+
+
 @dataclass(frozen=True)
 class Hero:
     name: str
     image_path: Path | None
 
 
-class SharedState:
+def _freeze(value: Any) -> Any:
+    """Deep read-only copy of ``value``: mappings become ``MappingProxyType`` and lists tuples."""
+    if isinstance(value, MappingProxyType):
+        return value
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Plain, mutable deep copy of a frozen state."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StateSnapshot:
+    """One committed state version, serialized once and shared by every reader.
+
+    ``state`` is frozen (see ``_freeze``), so a published snapshot can be handed
+    to any thread without copying; callers that want to edit it use ``_thaw``.
+    """
+
+    def __init__(self, version: int, state: Mapping[str, Any]) -> None:
+        self.version = version
+        self.body = json.dumps(state, default=_json_default).encode("utf-8")
+        self.state = _freeze(state)
+        self.etag = f'"{version}"'
+        self._gzip_lock = threading.Lock()
+        self._gzip_body: bytes | None = None
+
+    def gzip_body(self) -> bytes:
+        with self._gzip_lock:
+            if self._gzip_body is None:
+                self._gzip_body = gzip.compress(self.body, compresslevel=6)
+            return self._gzip_body
+
+
+class StateSubscription:
+    """Single-slot mailbox for one push client.
+
+    Publishing overwrites any update the client has not consumed yet, so a slow
+    reader only ever receives the newest state instead of a growing backlog.
+    """
+
+    def __init__(self, section: str | None = None) -> None:
+        self.section = section
+        self._cond = threading.Condition()
+        self._pending: StateSnapshot | None = None
+        self._closed = False
+        self._woken = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, snapshot: StateSnapshot) -> None:
+        with self._cond:
+            self._pending = snapshot
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def wake(self) -> None:
+        """Make a waiting ``next`` return early, e.g. because a signal is ready."""
+        with self._cond:
+            self._woken = True
+            self._cond.notify()
+
+    def next(self, timeout: float) -> StateSnapshot | None:
+        with self._cond:
+            if self._pending is None and not self._closed and not self._woken:
+                self._cond.wait(timeout)
+            pending, self._pending = self._pending, None
+            self._woken = False
+            return pending
+
+
+def _collect_blob_refs(value: Any, refs: set[str]) -> set[str]:
+    if isinstance(value, Mapping):
+        for item in value.values():
+            _collect_blob_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_blob_refs(item, refs)
+    elif isinstance(value, str):
+        match = BLOB_REF_RE.match(value)
+        if match:
+            refs.add(match.group(1))
+    return refs
+
+
+class BlobStore:
+    """Content-addressed image files stored as ``<sha256><ext>`` under ``BLOBS_DIR``.
+
+    State documents reference them as ``blob:<sha256>`` so large logos are uploaded
+    once instead of riding along with every state write and poll.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Guards the background collection below; see ``request_collect``.
+        self._collect_lock = threading.Lock()
+        self._collect_source: Callable[[], set[str]] | None = None
+        self._collector: threading.Thread | None = None
+
+    def path_for(self, digest: str) -> Path | None:
+        for extension in BLOB_CONTENT_TYPES.values():
+            path = self.directory / f"{digest}{extension}"
+            if path.is_file():
+                return path
+        return None
+
+    def content_type_for(self, path: Path) -> str:
+        for content_type, extension in BLOB_CONTENT_TYPES.items():
+            if path.suffix == extension:
+                return content_type
+        return "application/octet-stream"
+
+    def put(self, data: bytes, content_type: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            existing = self.path_for(digest)
+            if existing is not None:
+                # Refresh the GC grace period for re-uploads of a blob nobody references yet.
+                os.utime(existing)
+                return digest
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_path = self.directory / f".{digest}.tmp"
+            temp_path.write_bytes(data)
+            os.replace(temp_path, self.directory / f"{digest}{BLOB_CONTENT_TYPES[content_type]}")
+        return digest
+
+    def put_data_url(self, value: str) -> str:
+        """Store a ``data:image/...`` URL and return its ``blob:`` ref, or ``""`` if it is unusable."""
+        header, _, encoded = value.partition(",")
+        content_type = header[len("data:"):].split(";")[0].strip().lower()
+        if content_type not in BLOB_CONTENT_TYPES:
+            return ""
+        try:
+            data = base64.b64decode(encoded) if header.endswith(";base64") else unquote_to_bytes(encoded)
+        except ValueError:
+            return ""
+        if not data or len(data) > BLOB_MAX_BYTES:
+            return ""
+        return f"blob:{self.put(data, content_type)}"
+
+    def collect(self, referenced: set[str]) -> int:
+        """Delete blobs outside ``referenced`` once they are past the upload grace period."""
+        removed = 0
+        cutoff = time.time() - BLOB_GC_GRACE_SECONDS
+        with self._lock:
+            try:
+                entries = list(self.directory.iterdir())
+            except OSError:
+                return 0
+            for path in entries:
+                digest = path.name.split(".")[1] if path.name.startswith(".") else path.stem
+                if len(digest) != 64 or digest in referenced:
+                    continue
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def request_collect(self, referenced: Callable[[], set[str]]) -> None:
+        """Run ``collect(referenced())`` on a background thread.
+
+        Gathering the refs reads every stored match from disk, so commits only
+        ask for a pass and never wait for it. Requests made while a pass runs
+        coalesce into one more pass; the thread exits once none is pending.
+        """
+        with self._collect_lock:
+            self._collect_source = referenced
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect_pending, name="blob-gc", daemon=True)
+                self._collector.start()
+
+    def _collect_pending(self) -> None:
+        while True:
+            with self._collect_lock:
+                referenced, self._collect_source = self._collect_source, None
+                if referenced is None:
+                    self._collector = None
+                    return
+            try:
+                self.collect(referenced())
+            except Exception:
+                # Best effort: the next change of the referenced blobs asks again.
+                continue
+
+
+BLOB_STORE = BlobStore(BLOBS_DIR)
+
+
+def _state_diff(old: Any, new: Any) -> dict[str, Any]:
+    """Merge-patch (RFC 7386) turning ``old`` into ``new``; removed keys map to ``None``."""
+    diff: dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, Mapping) and isinstance(previous, Mapping):
+            nested = _state_diff(previous, value)
+            if nested:
+                diff[key] = nested
+        elif key not in old or previous != value:
+            diff[key] = value
+    for key in old:
+        if key not in new:
+            diff[key] = None
+    return diff
+
+
+def _apply_state_diff(base: Any, diff: Any) -> Any:
+    if not isinstance(diff, dict):
+        return diff
+    merged = dict(base) if isinstance(base, dict) else {}
+    for key, value in diff.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = _apply_state_diff(merged.get(key), value)
+    return merged
+
+
+def _history_entries(chain: Any, current: dict[str, Any]) -> list[dict[str, Any]]:
+    """Describe undo/redo ring entries, nearest first, by what stepping onto each one changes."""
+    entries = []
+    neighbour = current
+    for version, state in chain:
+        changes = sorted(key for key in _state_diff(neighbour, state) if key != "updatedAt")
+        entries.append({"version": version, "updatedAt": state.get("updatedAt"), "changes": changes})
+        neighbour = state
+    return entries
+
+
+def _fresh_bans(previous: Mapping[str, Any], current: Mapping[str, Any]) -> list[str]:
+    """The teams whose ban a commit sets to a new hero.
+
+    Exchanging the two teams' bans (the controller's swap button) only moves
+    bans that were already counted, so it yields none.
+    """
+    bans = {team: current[team]["ban"] for team in STATE_TEAMS}
+    if bans["team1"] != bans["team2"] and bans["team1"] == previous["team2"]["ban"] and bans["team2"] == previous["team1"]["ban"]:
+        return []
+    return [team for team in STATE_TEAMS if bans[team] and bans[team] != previous[team]["ban"]]
+
+
+def _sqlite_int(value: int) -> int:
+    """Clamp a state number to SQLite's 64-bit INTEGER range; scores have no upper bound."""
+    return min(max(value, SQLITE_INT_MIN), SQLITE_INT_MAX)
+
+
+def _journal_record(record: dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":"), default=_json_default).encode("utf-8") + b"\n"
+
+
+class CacheWriter:
+    """Write-behind persistence for the shared state.
+
+    Every commit becomes one line in the append-only ``STATE_JOURNAL_PATH``:
+    ``{"v": version, "d": diff}``, where ``diff`` is a merge patch against the
+    previous state. A background thread appends the queued lines at most once
+    per ``interval`` seconds, so a burst of slider drags costs one small append
+    and the state lock is never held across disk I/O. Once the journal holds
+    ``JOURNAL_COMPACT_ENTRIES`` diffs it is compacted: rewritten atomically as a
+    single ``{"v": version, "s": state}`` snapshot line, and the full state is
+    also written to ``STATE_CACHE_PATH`` (temp file plus rename). Shutdown
+    appends what is left and refreshes the cache file without compacting, so
+    the next start can still undo into the previous session. ``fsync`` is one
+    of ``CACHE_FSYNC_POLICIES``: ``always`` syncs every write, ``shutdown`` only
+    the final flush, ``never`` leaves it to the OS. Match namespaces pass their
+    own ``cache_path`` and ``journal_path``; without them the writer follows
+    the module-level paths of the default match.
+    """
+
+    def __init__(
+        self,
+        interval: float = CACHE_WRITE_INTERVAL_SECONDS,
+        fsync: str = "always",
+        cache_path: Path | None = None,
+        journal_path: Path | None = None,
+    ) -> None:
+        self.interval = interval
+        self.fsync = fsync
+        self._cache_path = cache_path
+        self._journal_path = journal_path
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending: list[tuple[int, dict[str, Any]]] = []
+        self._latest: tuple[int, bytes] | None = None
+        # Diffs after the journal's snapshot line; ``None`` until this process has
+        # written one, so the journal left by an earlier run is compacted first.
+        self._journal_entries: int | None = None
+        self._dirty_since = 0.0
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._commits = 0
+        self._flushes = 0
+        self._appends = 0
+        self._writes = 0
+        self._errors = 0
+        self._last_append = 0.0
+        self._total_append = 0.0
+        self._max_append = 0.0
+        self._last_write = 0.0
+        self._total_write = 0.0
+        self._max_write = 0.0
+
+    @property
+    def cache_path(self) -> Path:
+        return Path(self._cache_path or STATE_CACHE_PATH)
+
+    @property
+    def journal_path(self) -> Path:
+        return Path(self._journal_path or STATE_JOURNAL_PATH)
+
+    def schedule(self, body: bytes, version: int, diff: dict[str, Any]) -> None:
+        with self._cond:
+            if not self._pending:
+                self._dirty_since = time.monotonic()
+            self._pending.append((version, diff))
+            self._latest = (version, body)
+            self._commits += 1
+            closed = self._closed
+            if not closed and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="state-cache-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        if closed:
+            self.flush(durable=self.fsync != "never")
+
+    def flush(self, durable: bool = False, final: bool = False) -> None:
+        """Append the queued diffs now; ``final`` also refreshes the cache file."""
+        with self._write_lock:
+            with self._cond:
+                pending, self._pending = self._pending, []
+                latest = self._latest
+                entries = self._journal_entries
+                compact = entries is None or entries + len(pending) >= JOURNAL_COMPACT_ENTRIES
+                # A compaction still owed after a failed write runs even with nothing queued.
+                if latest is None or not (pending or final or compact):
+                    return
+                if compact or final:
+                    self._latest = None
+            if compact:
+                written = self._write_journal_snapshot(latest, durable) and self._write_cache(latest, durable)
+            else:
+                written = self._append_journal(pending, durable)
+                if final:
+                    written = self._write_cache(latest, durable) and written
+            with self._cond:
+                if written:
+                    self._flushes += 1
+                else:
+                    # The journal may now miss these diffs or end in a torn line, so the
+                    # next flush compacts it from the newest state instead of appending.
+                    self._journal_entries = None
+                    if self._latest is None:
+                        self._latest = latest
+
+    def close(self) -> None:
+        """Stop the writer thread and flush what is left; called on shutdown."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush(durable=self.fsync != "never", final=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "intervalMs": round(self.interval * 1000),
+                "fsync": self.fsync,
+                "commits": self._commits,
+                "appends": self._appends,
+                "writes": self._writes,
+                "coalesced": self._commits - self._flushes - len(self._pending),
+                "pending": len(self._pending),
+                "journalEntries": self._journal_entries,
+                "compactAt": JOURNAL_COMPACT_ENTRIES,
+                "errors": self._errors,
+                "appendMs": {
+                    "last": round(self._last_append * 1000, 3),
+                    "avg": round(self._total_append / self._appends * 1000, 3) if self._appends else 0.0,
+                    "max": round(self._max_append * 1000, 3),
+                },
+                "writeMs": {
+                    "last": round(self._last_write * 1000, 3),
+                    "avg": round(self._total_write / self._writes * 1000, 3) if self._writes else 0.0,
+                    "max": round(self._max_write * 1000, 3),
+                },
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                delay = self._dirty_since + self.interval - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            self.flush(durable=self.fsync == "always")
+
+    def _append_journal(self, pending: list[tuple[int, dict[str, Any]]], durable: bool) -> bool:
+        started = time.perf_counter()
+        try:
+            with open(self.journal_path, "ab") as journal_file:
+                journal_file.write(b"".join(_journal_record({"v": version, "d": diff}) for version, diff in pending))
+                if durable:
+                    journal_file.flush()
+                    os.fsync(journal_file.fileno())
+        except OSError:
+            with self._cond:
+                self._errors += 1
+            return False
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._appends += 1
+            self._journal_entries = (self._journal_entries or 0) + len(pending)
+            self._last_append = elapsed
+            self._total_append += elapsed
+            self._max_append = max(self._max_append, elapsed)
+        return True
+
+    def _write_journal_snapshot(self, latest: tuple[int, bytes], durable: bool) -> bool:
+        version, body = latest
+        # The journal goes first: a crash before the cache file is replaced still recovers from it.
+        if not self._replace(self.journal_path, b'{"v":%d,"s":%s}\n' % (version, body), durable):
+            return False
+        with self._cond:
+            self._journal_entries = 0
+        return True
+
+    def _write_cache(self, latest: tuple[int, bytes], durable: bool) -> bool:
+        version, body = latest
+        started = time.perf_counter()
+        # The version leads the state object, so recovery can tell whether this file or the journal is newer.
+        if not self._replace(self.cache_path, b'{"version":%d,%s' % (version, body[1:]), durable):
+            return False
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._writes += 1
+            self._last_write = elapsed
+            self._total_write += elapsed
+            self._max_write = max(self._max_write, elapsed)
+        return True
+
+    def _replace(self, path: Path, body: bytes, durable: bool) -> bool:
+        temp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as target:
+                target.write(body)
+                if durable:
+                    target.flush()
+                    os.fsync(target.fileno())
+            os.replace(temp_path, path)
+        except OSError:
+            # Persistence is optional; a failed write is retried with the next commit.
+            with self._cond:
+                self._errors += 1
+            return False
+        return True
+
+
+CACHE_WRITER = CacheWriter()
+
+
+class HistoryStore:
+    """Optional SQLite record of the hero bans, map vetoes and game scores of every match.
+
+    ``record`` runs inside each state commit and only queues the change; a
+    background thread turns the queue into rows in one transaction, so the
+    state lock never waits on SQLite. The database runs in WAL mode, which lets
+    the ``/api/stats`` readers (one connection per worker thread) query while
+    the writer appends.
+
+    Hero bans are a log: a ban counts each time a team's ban changes to a new
+    hero, because a match bans again on every map. Vetoes and game scores are
+    facts of the match and are rewritten from its current state whenever they
+    or the team names change. Rows carry the team slot and the scoreboard name
+    the team had at the time; bans made before a name was typed pick it up
+    once it is.
+    """
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+        self.error = ""
+        self.last_error = ""
+        self._cond = threading.Condition()
+        self._pending: list[tuple[str, int, Mapping[str, Any], Mapping[str, Any], tuple[str, ...]]] = []
+        self._writer: Any = None
+        self._thread: threading.Thread | None = None
+        self._local = threading.local()
+        self._readers: list[Any] = []
+        self._writes = 0
+        self._rows = 0
+        self._errors = 0
+        self._total_write = 0.0
+        self._max_write = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def open(self, path: Path) -> bool:
+        """Start recording into ``path``; ``False`` (with ``error`` set) if SQLite is unavailable."""
+        if self.path is not None:
+            return True
+        if sqlite3 is None:
+            self.error = "This Python build has no sqlite3 module"
+            return False
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+            writer.execute("PRAGMA journal_mode=WAL")
+            writer.execute("PRAGMA synchronous=NORMAL")
+            writer.executescript(HISTORY_SCHEMA)
+        except (OSError, sqlite3.Error) as exc:
+            self.error = str(exc)
+            return False
+        self._writer = writer
+        self.error = ""
+        self.path = path
+        self._thread = threading.Thread(target=self._run, name="match-history-writer", daemon=True)
+        self._thread.start()
+        return True
+
+    def record(
+        self, match: str, version: int, previous: Mapping[str, Any], current: Mapping[str, Any], diff: dict[str, Any], user_edit: bool = True
+    ) -> None:
+        """Queue one commit; called with the state lock held, so it only appends.
+
+        Undo and redo steps (``user_edit`` false) and ban swaps log no
+        ``hero_bans`` rows; the match, veto and game tables still follow them.
+        """
+        if self.path is None or HISTORY_STATE_KEYS.isdisjoint(diff):
+            return
+        bans = tuple(_fresh_bans(previous, current)) if user_edit else ()
+        with self._cond:
+            self._pending.append((match, version, previous, current, bans))
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Write what is queued and close every connection; called on shutdown."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self.path = None
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+        with self._cond:
+            readers, self._readers = self._readers, []
+        for connection in readers + ([self._writer] if self._writer is not None else []):
+            connection.close()
+        self._writer = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and self.path is not None:
+                    self._cond.wait()
+                pending, self._pending = self._pending, []
+                closing = self.path is None
+            if pending:
+                self._write(pending)
+            if closing:
+                return
+
+    def _write(self, pending: list[tuple[str, int, Mapping[str, Any], Mapping[str, Any], tuple[str, ...]]]) -> None:
+        started = time.perf_counter()
+        rows = 0
+        try:
+            with self._writer:
+                self._writer.execute("BEGIN")
+                for change in pending:
+                    # A change that cannot be written is rolled back and skipped alone;
+                    # letting it escape would end this thread and silently stop the history.
+                    self._writer.execute("SAVEPOINT change")
+                    try:
+                        rows += self._write_change(*change)
+                    except Exception as exc:
+                        self._writer.execute("ROLLBACK TO change")
+                        with self._cond:
+                            self._errors += 1
+                            self.last_error = f"Skipped version {change[1]} of match {change[0]}: {exc}"
+                    self._writer.execute("RELEASE change")
+        except Exception as exc:
+            with self._cond:
+                self._errors += 1
+                self.last_error = f"Dropped {len(pending)} queued changes: {exc}"
+            return
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._writes += 1
+            self._rows += rows
+            self._total_write += elapsed
+            self._max_write = max(self._max_write, elapsed)
+
+    def _write_change(self, match: str, version: int, previous: Mapping[str, Any], current: Mapping[str, Any], bans: tuple[str, ...]) -> int:
+        db = self._writer
+        ts = _sqlite_int(current.get("updatedAt") or int(time.time() * 1000))
+        names = {team: current["scoreboard"][team]["name"] for team in STATE_TEAMS}
+        renamed = [team for team in STATE_TEAMS if names[team] != previous["scoreboard"][team]["name"]]
+        db.execute(
+            "INSERT OR IGNORE INTO matches (match, first_seen, last_seen) VALUES (?, ?, ?)",
+            (match, ts, ts),
+        )
+        db.execute(
+            "UPDATE matches SET team1_name = ?, team2_name = ?, team1_score = ?, team2_score = ?, last_seen = ? WHERE match = ?",
+            (names["team1"], names["team2"], _sqlite_int(current["scoreboard"]["team1"]["score"]), _sqlite_int(current["scoreboard"]["team2"]["score"]), ts, match),
+        )
+        rows = 0
+        for team in STATE_TEAMS:
+            if team in bans:
+                db.execute(
+                    "INSERT INTO hero_bans (match, team, team_name, hero, version, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                    (match, team, names[team], current[team]["ban"], version, ts),
+                )
+                rows += 1
+            if team in renamed and names[team]:
+                db.execute("UPDATE hero_bans SET team_name = ? WHERE match = ? AND team = ? AND team_name = ''", (names[team], match, team))
+        if renamed or current["valorantMapVeto"] != previous["valorantMapVeto"]:
+            db.execute("DELETE FROM map_vetoes WHERE match = ?", (match,))
+            vetoes = [
+                (match, slot, slot[:-1], VALORANT_VETO_TEAMS[slot], names.get(VALORANT_VETO_TEAMS[slot], ""), current["valorantMapVeto"][slot], version, ts)
+                for slot in VALORANT_VETO_SLOTS
+                if current["valorantMapVeto"][slot]
+            ]
+            db.executemany("INSERT INTO map_vetoes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", vetoes)
+            rows += len(vetoes)
+        if renamed or current["valorantGameScore"] != previous["valorantGameScore"] or current["valorantMapVeto"] != previous["valorantMapVeto"]:
+            db.execute("DELETE FROM game_scores WHERE match = ?", (match,))
+            games = []
+            for pick in VALORANT_PICKS:
+                score = current["valorantGameScore"][pick]
+                if score["winner"] or score["team1Score"] or score["team2Score"]:
+                    games.append((
+                        match, pick, current["valorantMapVeto"][pick], names["team1"], names["team2"],
+                        _sqlite_int(score["team1Score"]), _sqlite_int(score["team2Score"]), score["winner"], names.get(score["winner"], ""), version, ts,
+                    ))
+            db.executemany("INSERT INTO game_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", games)
+            rows += len(games)
+        return rows
+
+    def _reader(self) -> Any:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+            connection.execute("PRAGMA query_only = ON")
+            self._local.connection = connection
+            with self._cond:
+                self._readers.append(connection)
+        return connection
+
+    @staticmethod
+    def _filters(query: dict[str, list[str]], team_columns: tuple[str, ...]) -> tuple[list[str], list[Any]]:
+        """SQL conditions for the ``team``, ``event``, ``since`` and ``until`` query parameters."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        team = query.get("team", [""])[-1].strip()
+        if team:
+            clauses.append("(" + " OR ".join(f"{column} = ? COLLATE NOCASE" for column in team_columns) + ")")
+            params.extend([team] * len(team_columns))
+        # An event is every match whose id starts with the prefix; a range keeps it on the index.
+        event = query.get("event", [""])[-1].strip()
+        if event:
+            clauses.append("match >= ? AND match < ?")
+            params.extend([event, event[:-1] + chr(ord(event[-1]) + 1)])
+        for key, operator in (("since", ">="), ("until", "<")):
+            value = _query_int(query, key)
+            if value is not None:
+                clauses.append(f"ts {operator} ?")
+                params.append(value)
+        return clauses, params
+
+    def _select(self, sql: str, clauses: list[str], params: list[Any], tail: str = "") -> list[Any]:
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._reader().execute(sql + where + tail, params).fetchall()
+
+    @staticmethod
+    def _limit(query: dict[str, list[str]]) -> int:
+        return min(max(_query_int(query, "limit") or STATS_LIMIT_DEFAULT, 1), STATS_LIMIT_MAX)
+
+    def hero_bans(self, query: dict[str, list[str]]) -> dict[str, Any]:
+        """Most-banned heroes, optionally by one team, in one event or time window."""
+        clauses, params = self._filters(query, ("team_name",))
+        rows = self._select(
+            "SELECT hero, COUNT(*), COUNT(DISTINCT match) FROM hero_bans", clauses, params + [self._limit(query)],
+            " GROUP BY hero ORDER BY 2 DESC, hero LIMIT ?",
+        )
+        return {"heroes": [{"hero": hero, "bans": bans, "matches": matches} for hero, bans, matches in rows]}
+
+    def map_vetoes(self, query: dict[str, list[str]]) -> dict[str, Any]:
+        """Picks and bans per map; ``team`` narrows them to the ones that team made, ``kind`` to picks or bans."""
+        clauses, params = self._filters(query, ("team_name",))
+        kind = query.get("kind", [""])[-1]
+        if kind in ("pick", "ban"):
+            clauses.append("kind = ?")
+            params.append(kind)
+        rows = self._select(
+            "SELECT map, SUM(kind = 'pick'), SUM(kind = 'ban') FROM map_vetoes", clauses, params + [self._limit(query)],
+            " GROUP BY map ORDER BY 2 DESC, 3 DESC, map LIMIT ?",
+        )
+        return {"maps": [{"map": map_id, "picks": picks, "bans": bans} for map_id, picks, bans in rows]}
+
+    def game_scores(self, query: dict[str, list[str]]) -> dict[str, Any]:
+        """The latest game results, optionally of one team or map, with that team's record."""
+        clauses, params = self._filters(query, ("team1_name", "team2_name"))
+        map_id = query.get("map", [""])[-1].strip()
+        if map_id:
+            clauses.append("map = ?")
+            params.append(map_id)
+        rows = self._select(
+            "SELECT match, pick, map, team1_name, team2_name, team1_score, team2_score, winner_name, ts FROM game_scores",
+            clauses, params + [self._limit(query)], " ORDER BY ts DESC LIMIT ?",
+        )
+        report: dict[str, Any] = {
+            "games": [
+                {
+                    "match": match, "pick": pick, "map": game_map, "team1": team1, "team2": team2,
+                    "team1Score": team1_score, "team2Score": team2_score, "winner": winner, "ts": ts,
+                }
+                for match, pick, game_map, team1, team2, team1_score, team2_score, winner, ts in rows
+            ]
+        }
+        team = query.get("team", [""])[-1].strip()
+        if team:
+            played, won = self._select("SELECT COUNT(*), SUM(winner_name = ? COLLATE NOCASE) FROM game_scores", clauses, [team] + params)[0]
+            report["record"] = {"team": team, "played": played, "wins": won or 0}
+        return report
+
+    def totals(self) -> dict[str, list[tuple[Any, ...]]]:
+        """Everything recorded so far, in the shape ``AggregateCounters.load`` rebuilds its counters from."""
+        reader = self._reader()
+        return {
+            "bans": reader.execute("SELECT match, team, team_name, hero, COUNT(*) FROM hero_bans GROUP BY match, team, team_name, hero").fetchall(),
+            "vetoes": reader.execute("SELECT match, slot, team_name, map FROM map_vetoes").fetchall(),
+            "games": reader.execute("SELECT match, map, team1_name, team2_name, winner_name FROM game_scores WHERE winner != ''").fetchall(),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        counts: dict[str, int] = {}
+        if self.path is not None:
+            for table in ("matches", "hero_bans", "map_vetoes", "game_scores"):
+                counts[table] = self._reader().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        with self._cond:
+            return {
+                "enabled": self.path is not None,
+                "path": str(self.path) if self.path is not None else None,
+                "error": self.error or None,
+                "rows": counts,
+                "pending": len(self._pending),
+                "writes": self._writes,
+                "rowsWritten": self._rows,
+                "errors": self._errors,
+                "lastError": self.last_error or None,
+                "writeMs": {
+                    "avg": round(self._total_write / self._writes * 1000, 3) if self._writes else 0.0,
+                    "max": round(self._max_write * 1000, 3),
+                },
+            }
+
+
+HISTORY_DB = HistoryStore()
+
+
+class AggregateCounters:
+    """Live ban and veto tallies across every match, kept current on each commit.
+
+    ``record`` turns the transition a commit already computed into counter
+    updates, so ``/api/aggregates`` never scans the history. Hero bans count
+    like the history log: once each time a team bans a new hero. Map picks,
+    bans and game results are facts of a match; each match's share is kept
+    next to the totals and swapped for the new one when its veto, results or
+    team names change. The payload is rebuilt at most once per version, on the
+    first read after a change, and published as a ``StateSnapshot`` so readers
+    get ETags and 304s like any state section.
+
+    With match history enabled ``load`` seeds the counters from the database
+    at startup; otherwise they count from bridge start.
+    """
+
     def __init__(self) -> None:
         self._lock = threading.Lock()
+        self._counts: Counter[tuple[str, ...]] = Counter()
+        # The veto and result counts each match currently contributes to _counts.
+        self._facts: dict[str, Counter[tuple[str, ...]]] = {}
+        # Bans made before the team had a name, credited to it once it gets one.
+        self._unnamed: dict[tuple[str, str], Counter[str]] = {}
+        # Seeded from the wall clock like state versions, so ETags keep increasing across restarts.
+        self._version = int(time.time() * 1000)
+        self._snapshot = StateSnapshot(self._version, self._payload())
+
+    def load(self, history: HistoryStore) -> None:
+        """Replace the counters with the totals recorded in ``history``."""
+        totals = history.totals()
+        with self._lock:
+            self._counts.clear()
+            self._facts.clear()
+            self._unnamed.clear()
+            for match, team, team_name, hero, bans in totals["bans"]:
+                self._count_ban(match, team, team_name, hero, bans)
+            for match, slot, team_name, map_id in totals["vetoes"]:
+                self._facts.setdefault(match, Counter()).update(self._veto_keys(slot, team_name, map_id))
+            for match, map_id, team1_name, team2_name, winner_name in totals["games"]:
+                self._facts.setdefault(match, Counter()).update(self._game_keys(map_id, (team1_name, team2_name), winner_name))
+            for facts in self._facts.values():
+                self._counts.update(facts)
+            self._version += 1
+
+    def record(self, match: str, previous: Mapping[str, Any], current: Mapping[str, Any], diff: dict[str, Any], user_edit: bool = True) -> None:
+        """Apply one commit of ``match``; called with that match's state lock held.
+
+        Undo and redo steps (``user_edit`` false) revisit bans that were counted
+        when they were made, so only the veto and result facts follow them.
+        """
+        if HISTORY_STATE_KEYS.isdisjoint(diff):
+            return
+        names = {team: current["scoreboard"][team]["name"] for team in STATE_TEAMS}
+        facts = self._facts_of(current, names)
+        fresh = _fresh_bans(previous, current) if user_edit else []
+        with self._lock:
+            changed = False
+            for team in STATE_TEAMS:
+                if team in fresh:
+                    self._count_ban(match, team, names[team], current[team]["ban"])
+                    changed = True
+                if names[team] and (match, team) in self._unnamed:
+                    for hero, bans in self._unnamed.pop((match, team)).items():
+                        self._counts[("teamBan", names[team], hero)] += bans
+                    changed = True
+            old = self._facts.get(match, Counter())
+            if facts != old:
+                self._counts.subtract(old)
+                self._counts.update(facts)
+                for key in old:
+                    if self._counts[key] <= 0:
+                        del self._counts[key]
+                if facts:
+                    self._facts[match] = facts
+                else:
+                    self._facts.pop(match, None)
+                changed = True
+            if changed:
+                self._version += 1
+
+    def snapshot(self) -> StateSnapshot:
+        """The current aggregates; only the first read after a change serializes them."""
+        snapshot = self._snapshot
+        if snapshot.version == self._version:
+            return snapshot
+        with self._lock:
+            if self._snapshot.version != self._version:
+                self._snapshot = StateSnapshot(self._version, self._payload())
+            return self._snapshot
+
+    def _count_ban(self, match: str, team: str, team_name: str, hero: str, bans: int = 1) -> None:
+        self._counts[("heroBan", hero)] += bans
+        if team_name:
+            self._counts[("teamBan", team_name, hero)] += bans
+        else:
+            self._unnamed.setdefault((match, team), Counter())[hero] += bans
+
+    @staticmethod
+    def _veto_keys(slot: str, team_name: str, map_id: str) -> list[tuple[str, ...]]:
+        kind = "picks" if slot.startswith("pick") else "bans"
+        keys = [("map", map_id, kind)]
+        if team_name:
+            keys.append(("teamMap", team_name, map_id, kind))
+        return keys
+
+    @staticmethod
+    def _game_keys(map_id: str, team_names: tuple[str, str], winner_name: str) -> list[tuple[str, ...]]:
+        keys = [("games",)]
+        if map_id:
+            keys.append(("map", map_id, "games"))
+        keys.extend(("played", name) for name in team_names if name)
+        if winner_name:
+            keys.append(("wins", winner_name))
+        return keys
+
+    def _facts_of(self, state: Mapping[str, Any], names: dict[str, str]) -> Counter[tuple[str, ...]]:
+        facts: Counter[tuple[str, ...]] = Counter()
+        veto = state["valorantMapVeto"]
+        for slot in VALORANT_VETO_SLOTS:
+            if veto[slot]:
+                facts.update(self._veto_keys(slot, names.get(VALORANT_VETO_TEAMS[slot], ""), veto[slot]))
+        for pick in VALORANT_PICKS:
+            winner = state["valorantGameScore"][pick]["winner"]
+            if winner:
+                facts.update(self._game_keys(veto[pick], (names["team1"], names["team2"]), names.get(winner, "")))
+        return facts
+
+    def _payload(self) -> dict[str, Any]:
+        heroes: dict[str, dict[str, Any]] = {}
+        maps: dict[str, dict[str, Any]] = {}
+        teams: dict[str, dict[str, Any]] = {}
+        totals = {"heroBans": 0, "mapPicks": 0, "mapBans": 0, "games": 0}
+
+        def team_entry(name: str) -> dict[str, Any]:
+            return teams.setdefault(name, {"heroBans": {}, "mapPicks": {}, "mapBans": {}, "played": 0, "wins": 0})
+
+        for key, count in self._counts.items():
+            if key[0] == "heroBan":
+                heroes[key[1]] = {"bans": count}
+                totals["heroBans"] += count
+            elif key[0] == "map":
+                maps.setdefault(key[1], {"picks": 0, "bans": 0, "games": 0})[key[2]] = count
+                if key[2] != "games":
+                    totals["mapPicks" if key[2] == "picks" else "mapBans"] += count
+            elif key[0] == "teamBan":
+                team_entry(key[1])["heroBans"][key[2]] = count
+            elif key[0] == "teamMap":
+                team_entry(key[1])["mapPicks" if key[3] == "picks" else "mapBans"][key[2]] = count
+            elif key[0] in ("played", "wins"):
+                team_entry(key[1])[key[0]] = count
+            else:
+                totals["games"] = count
+        for entry in heroes.values():
+            entry["rate"] = round(entry["bans"] / totals["heroBans"], 4)
+        for entry in maps.values():
+            entry["pickRate"] = round(entry["picks"] / totals["mapPicks"], 4) if totals["mapPicks"] else 0.0
+            entry["banRate"] = round(entry["bans"] / totals["mapBans"], 4) if totals["mapBans"] else 0.0
+        return {"totals": totals, "heroes": heroes, "maps": maps, "teams": teams}
+
+
+AGGREGATES = AggregateCounters()
+
+
+class SharedState:
+    """The state of one match namespace: its versions, snapshots, history and subscribers.
+
+    ``writer`` persists it; the default match uses ``CACHE_WRITER``, the others
+    get one from ``MatchRegistry``.
+    """
+
+    def __init__(self, match: str = DEFAULT_MATCH, writer: CacheWriter | None = None) -> None:
+        self.match = match
+        self.writer = writer or CACHE_WRITER
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
         self._state = self.default_state()
+        # Seeded from the wall clock so versions keep increasing across restarts.
+        self._version = int(time.time() * 1000)
+        self._subscribers: set[StateSubscription] = set()
+        self._listeners: list[Callable[[], None]] = []
+        # Earlier states for undo/redo, newest last; entries are (version, state).
+        self._undo: deque[tuple[int, dict[str, Any]]] = deque(maxlen=HISTORY_LIMIT)
+        self._redo: deque[tuple[int, dict[str, Any]]] = deque(maxlen=HISTORY_LIMIT)
+        # Writes that only restated the current content and were not committed.
+        self._deduplicated = 0
         self._load_cache()
+        self._blob_refs = _collect_blob_refs(self._state, set())
+        self._snapshot = StateSnapshot(self._version, self._state)
+        self._sections = {
+            section: StateSnapshot(self._version, _project_state(self._snapshot.state, paths))
+            for section, paths in STATE_SECTIONS.items()
+        }
 
     @staticmethod
     def default_state() -> dict[str, Any]:
+        return _sanitize_state({})
+
+    def _load_cache(self) -> None:
+        """Recover from the journal, or from the cache file when it was written at a later version.
+
+        The cache file wins when a journal write failed but the shutdown flush
+        still refreshed the cache file.
+        """
+        journal_version = self._load_journal()
+        cached = self._read_cache()
+        if cached is None or (journal_version is not None and journal_version >= cached[0]):
+            return
+        self._version = max(self._version, cached[0])
+        self._state = cached[1]
+
+    def _read_cache(self) -> tuple[int, dict[str, Any]] | None:
+        """The cache file's version and state; files written before it carried a version count as 0."""
+        try:
+            if not self.writer.cache_path.exists():
+                return None
+            payload = json.loads(self.writer.cache_path.read_text(encoding="utf-8"))
+            version = payload.get("version") if isinstance(payload, dict) else None
+            return (version if isinstance(version, int) else 0), _sanitize_state(payload)
+        except Exception:
+            return None
+
+    def _load_journal(self) -> int | None:
+        """Recover from the journal's last snapshot line plus the diffs after it.
+
+        Replay stops at the first torn or malformed line, which is what a crash
+        in the middle of an append leaves behind. The replayed states also seed
+        the undo ring, so a bad click can still be undone after a restart.
+        Returns the version replayed up to, or ``None`` without a usable journal.
+        """
+        try:
+            raw = self.writer.journal_path.read_bytes()
+        except OSError:
+            return None
+        state: dict[str, Any] | None = None
+        version = 0
+        history: list[tuple[int, dict[str, Any]]] = []
+        for line in raw.splitlines():
+            try:
+                record = json.loads(line)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                break
+            if not isinstance(record, dict) or not isinstance(record.get("v"), int):
+                break
+            if isinstance(record.get("s"), dict):
+                state, history = record["s"], []
+            elif state is not None and isinstance(record.get("d"), dict):
+                if any(key != "updatedAt" for key in record["d"]):
+                    history.append((version, state))
+                state = _apply_state_diff(state, record["d"])
+            else:
+                break
+            version = record["v"]
+        if state is None:
+            return None
+        try:
+            self._state = _sanitize_state(state)
+        except Exception:
+            return None
+        self._version = max(self._version, version)
+        self._undo.extend(history[-HISTORY_LIMIT:])
+        return version
+
+    @property
+    def blob_refs(self) -> set[str]:
+        """Blobs the current state or an undo/redo entry references; stepping back must find them stored."""
+        with self._lock:
+            refs = set(self._blob_refs)
+            history = [*self._undo, *self._redo]
+        # History entries are never modified once on a ring, so they are walked without the lock.
+        for _version, state in history:
+            _collect_blob_refs(state, refs)
+        return refs
+
+    @property
+    def deduplicated(self) -> int:
+        return self._deduplicated
+
+    def get(self) -> Mapping[str, Any]:
+        """The current state, frozen; see ``snapshot``."""
+        return self._snapshot.state
+
+    def _snapshot_locked(self, section: str | None) -> StateSnapshot:
+        return self._snapshot if section is None else self._sections[section]
+
+    def snapshot(self, section: str | None = None) -> StateSnapshot:
+        """The current snapshot of ``section`` (or the whole document), without taking the lock.
+
+        Commits never change a published snapshot or the ``_sections`` dict; they
+        build new ones and swap the references, so a reader always sees one
+        complete version.
+        """
+        return self._snapshot_locked(section)
+
+    def set(self, payload: dict[str, Any] | None) -> StateSnapshot:
+        with self._lock:
+            return self._commit_locked(payload)
+
+    def update(self, change: Callable[[dict[str, Any]], dict[str, Any]]) -> StateSnapshot:
+        """Commit ``change(current_state)`` atomically, so read-modify-write callers never lose updates."""
+        with self._lock:
+            return self._commit_locked(change(_thaw(self._snapshot.state)))
+
+    def apply(self, commands: list[Any]) -> StateSnapshot:
+        """Run ``commands`` through ``STATE_COMMANDS`` and commit the result as one version.
+
+        A batch is atomic: it costs one version, one persistence write and one
+        broadcast, and if any command is rejected nothing is committed and the
+        ``CommandError`` names it.
+        """
+        return self.update(lambda state: _apply_commands(state, commands))
+
+    def undo(self) -> StateSnapshot | None:
+        """Commit the previous state on the undo ring as a new version; ``None`` if there is none."""
+        with self._lock:
+            return self._step_locked(self._undo, self._redo)
+
+    def redo(self) -> StateSnapshot | None:
+        with self._lock:
+            return self._step_locked(self._redo, self._undo)
+
+    def history(self) -> dict[str, Any]:
+        with self._lock:
+            current = self._snapshot
+            undo = list(self._undo)
+            redo = list(self._redo)
         return {
-            "team1": {"ban": ""},
-            "team2": {"ban": ""},
-            "scoreboard": {
-                "team1": {"name": "", "nameUsePng": False, "namePng": "", "namePngScale": 0, "logo": "", "logoScale": 0, "score": 0, "nameColor": "#e9eefc", "bevelColor": "#7dd3fc", "nameFont": "varsity"},
-                "team2": {"name": "", "nameUsePng": False, "namePng": "", "namePngScale": 0, "logo": "", "logoScale": 0, "score": 0, "nameColor": "#e9eefc", "bevelColor": "#7dd3fc", "nameFont": "varsity"},
-            },
-            "valorantMapVeto": {"ban1": "", "ban2": "", "pick1": "", "pick2": "", "ban3": "", "ban4": "", "pick3": ""},
-            "valorantPickSides": {
-                "pick1": {"defenders": "team1", "attackers": "team2"},
-                "pick2": {"defenders": "team1", "attackers": "team2"},
-                "pick3": {"defenders": "team1", "attackers": "team2"},
-            },
-            "valorantGameScore": {
-                "pick1": {"winner": "", "team1Score": 0, "team2Score": 0},
-                "pick2": {"winner": "", "team1Score": 0, "team2Score": 0},
-                "pick3": {"winner": "", "team1Score": 0, "team2Score": 0},
-            },
-            "updatedAt": int(time.time() * 1000),
+            "version": current.version,
+            "limit": HISTORY_LIMIT,
+            "undo": _history_entries(reversed(undo), current.state),
+            "redo": _history_entries(reversed(redo), current.state),
         }
 
+    def _step_locked(self, source: deque[tuple[int, dict[str, Any]]], target: deque[tuple[int, dict[str, Any]]]) -> StateSnapshot | None:
+        if not source:
+            return None
+        _version, state = source.pop()
+        target.append((self._snapshot.version, self._snapshot.state))
+        # Stepping is an ordinary commit with a fresh version, so every client and the journal follow along.
+        return self._commit_locked(_thaw(state), record=False)
+
+    def _commit_locked(self, payload: dict[str, Any] | None, record: bool = True) -> StateSnapshot:
+        previous = self._snapshot
+        state = _sanitize_state(payload)
+        frozen = _freeze(state)
+        diff = _state_diff(previous.state, frozen)
+        if not any(key != "updatedAt" for key in diff):
+            # The same content again (a repeated Update click, a storage-event
+            # echo): only updatedAt moved, and a new version would make every
+            # overlay repaint. Keep the version, the files and the subscribers.
+            self._deduplicated += 1
+            return previous
+        self._state = state
+        self._version += 1
+        blob_refs = _collect_blob_refs(self._state, set())
+        if blob_refs != self._blob_refs:
+            self._blob_refs = blob_refs
+            BLOB_STORE.request_collect(MATCHES.blob_refs)
+        self._snapshot = StateSnapshot(self._version, frozen)
+        if record:
+            self._undo.append((previous.version, previous.state))
+            self._redo.clear()
+        self.writer.schedule(self._snapshot.body, self._version, diff)
+        HISTORY_DB.record(self.match, self._version, previous.state, self._snapshot.state, diff, user_edit=record)
+        AGGREGATES.record(self.match, previous.state, self._snapshot.state, diff, user_edit=record)
+        # A section only takes the new version when its own slice changed, so
+        # overlays watching it are not woken by edits elsewhere in the document.
+        sections = dict(self._sections)
+        for section, paths in STATE_SECTIONS.items():
+            projected = _project_state(self._snapshot.state, paths)
+            if projected != sections[section].state:
+                sections[section] = StateSnapshot(self._version, projected)
+        self._sections = sections
+        for subscription in self._subscribers:
+            snapshot = self._snapshot_locked(subscription.section)
+            if snapshot.version == self._version:
+                subscription.publish(snapshot)
+        self._changed.notify_all()
+        for listener in self._listeners:
+            listener()
+        return self._snapshot
+
+    def wait_for_change(self, since: int, timeout: float, section: str | None = None) -> StateSnapshot:
+        """Block until ``section`` moves off version ``since`` or ``timeout`` expires."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self._snapshot_locked(section).version == since:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self._snapshot_locked(section)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener`` after every commit, with the state lock held; it must not block."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def subscribe(self, section: str | None = None) -> StateSubscription:
+        subscription = StateSubscription(section)
+        with self._lock:
+            self._subscribers.add(subscription)
+            subscription.publish(self._snapshot_locked(section))
+        return subscription
+
+    def unsubscribe(self, subscription: StateSubscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.close()
+
+    def close_subscribers(self) -> None:
+        with self._lock:
+            subscriptions = list(self._subscribers)
+            self._subscribers.clear()
+            self._changed.notify_all()
+        for subscription in subscriptions:
+            subscription.close()
+
+    def close(self) -> None:
+        """Disconnect every subscriber and flush what is left to disk."""
+        self.close_subscribers()
+        self.writer.close()
+
+
+SHARED_STATE = SharedState()
+
+
+class MatchRegistry:
+    """The ``SharedState`` of every match namespace, with idle ones evicted LRU.
+
+    ``DEFAULT_MATCH`` is ``SHARED_STATE`` and keeps the classic cache files;
+    any other id gets its own store, versions, subscribers and ``CacheWriter``
+    under ``MATCHES_DIR/<id>/``. Callers ``acquire`` a store for as long as
+    they use it (one request, one event stream) and ``release`` it afterwards.
+    When loading a match brings more than ``limit`` of them into memory, the
+    least recently used stores nobody holds are flushed and dropped; the next
+    request reloads them from their journal.
+    """
+
+    def __init__(self, default: SharedState, limit: int = MATCH_CACHE_LIMIT) -> None:
+        self.limit = limit
+        self._default = default
+        # Serializes loads and evictions, so a match is never read back from
+        # disk while its evicted store is still flushing.
+        self._load_lock = threading.Lock()
+        # Guards the maps below; held briefly and never while taking a store's lock.
+        self._lock = threading.Lock()
+        self._stores: OrderedDict[str, SharedState] = OrderedDict()
+        self._closing: dict[str, SharedState] = {}
+        self._leases: dict[str, int] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self._loads = 0
+        self._evictions = 0
+        BLOB_STORE.request_collect(self.blob_refs)
+
+    def acquire(self, match: str) -> SharedState:
+        """The store of ``match``, loaded from disk if needed; hold it until ``release``."""
+        store = self.try_acquire(match)
+        if store is not None:
+            return store
+        with self._load_lock:
+            store = self.try_acquire(match)
+            if store is None:
+                directory = MATCHES_DIR / match
+                writer = CacheWriter(CACHE_WRITER.interval, CACHE_WRITER.fsync, directory / STATE_CACHE_PATH.name, directory / STATE_JOURNAL_PATH.name)
+                store = SharedState(match, writer)
+                with self._lock:
+                    # Nobody else can see the new store yet, so taking its lock here is safe.
+                    for listener in self._listeners:
+                        store.add_listener(listener)
+                    self._stores[match] = store
+                    self._leases[match] = 1
+                    self._loads += 1
+            self._evict_idle()
+        return store
+
+    def release(self, store: SharedState) -> None:
+        if store is self._default:
+            return
+        with self._lock:
+            self._leases[store.match] -= 1
+
+    def try_acquire(self, match: str) -> SharedState | None:
+        """Like ``acquire``, but ``None`` instead of touching the disk when ``match`` is not in memory."""
+        if match == DEFAULT_MATCH:
+            return self._default
+        with self._lock:
+            store = self._stores.get(match)
+            if store is not None:
+                self._stores.move_to_end(match)
+                self._leases[match] += 1
+            return store
+
+    def _evict_idle(self) -> None:
+        while True:
+            with self._lock:
+                if len(self._stores) <= self.limit:
+                    return
+                match = next((match for match in self._stores if not self._leases[match]), None)
+                if match is None:
+                    return
+                # Unlisted first, so a concurrent acquire waits on the load lock
+                # and then reloads what the flush below wrote.
+                store = self._closing[match] = self._stores.pop(match)
+                del self._leases[match]
+            store.close()
+            with self._lock:
+                del self._closing[match]
+                self._evictions += 1
+
+    def blob_refs(self) -> set[str]:
+        """Blob digests referenced by any match, in memory or only on disk.
+
+        Besides each state and its undo/redo rings this covers every journal,
+        whose older lines may still be replayed into a ring after a restart.
+        """
+        with self._lock:
+            stores = [self._default, *self._stores.values(), *self._closing.values()]
+        refs: set[str] = set()
+        files: list[Path] = []
+        for store in stores:
+            refs |= store.blob_refs
+            files.append(store.writer.journal_path)
+        loaded = {store.match for store in stores}
+        for match in self.stored():
+            if match not in loaded:
+                files += [MATCHES_DIR / match / STATE_CACHE_PATH.name, MATCHES_DIR / match / STATE_JOURNAL_PATH.name]
+        for path in files:
+            try:
+                refs.update(BLOB_REF_SCAN_RE.findall(path.read_text(encoding="utf-8", errors="replace")))
+            except OSError:
+                continue
+        return refs
+
     @staticmethod
-    def sanitize(payload: dict[str, Any] | None) -> dict[str, Any]:
-        payload = payload or {}
-        scoreboard = payload.get("scoreboard", {}) or {}
-        valorant_map_veto = payload.get("valorantMapVeto", {}) or {}
-        valorant_pick_sides = payload.get("valorantPickSides", {}) or {}
-        valorant_game_score = payload.get("valorantGameScore", {}) or {}
-        team1_style = scoreboard.get("team1", {}) or {}
-        team2_style = scoreboard.get("team2", {}) or {}
+    def stored() -> list[str]:
+        """Ids of the matches that have state on disk."""
+        try:
+            return sorted(entry.name for entry in MATCHES_DIR.iterdir() if entry.is_dir() and MATCH_ID_RE.match(entry.name))
+        except OSError:
+            return []
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Add ``listener`` (see ``SharedState.add_listener``) to every match, including ones loaded later."""
+        with self._lock:
+            self._listeners.append(listener)
+            stores = [self._default, *self._stores.values()]
+        for store in stores:
+            store.add_listener(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+            stores = [self._default, *self._stores.values()]
+        for store in stores:
+            store.remove_listener(listener)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            resident = [(store, self._leases.get(match, 0)) for match, store in self._stores.items()]
+            loads, evictions = self._loads, self._evictions
         return {
-            "team1": {"ban": str(payload.get("team1", {}).get("ban", "") or "")},
-            "team2": {"ban": str(payload.get("team2", {}).get("ban", "") or "")},
-            "scoreboard": {
-                "team1": {
-                    "name": str(team1_style.get("name", "") or ""),
-                    "nameUsePng": _sanitize_name_png_toggle(team1_style.get("nameUsePng", False)),
-                    "namePng": str(team1_style.get("namePng", "") or ""),
-                    "namePngScale": _sanitize_name_png_scale(team1_style.get("namePngScale", 0)),
-                    "logo": str(team1_style.get("logo", "") or ""),
-                    "logoScale": _sanitize_logo_scale(team1_style.get("logoScale", 0)),
-                    "score": _sanitize_score(team1_style.get("score", 0)),
-                    "nameColor": str(team1_style.get("nameColor", "#e9eefc") or "#e9eefc"),
-                    "bevelColor": str(team1_style.get("bevelColor", "#7dd3fc") or "#7dd3fc"),
-                    "nameFont": str(team1_style.get("nameFont", "varsity") or "varsity"),
-                },
-                "team2": {
-                    "name": str(team2_style.get("name", "") or ""),
-                    "nameUsePng": _sanitize_name_png_toggle(team2_style.get("nameUsePng", False)),
-                    "namePng": str(team2_style.get("namePng", "") or ""),
-                    "namePngScale": _sanitize_name_png_scale(team2_style.get("namePngScale", 0)),
-                    "logo": str(team2_style.get("logo", "") or ""),
-                    "logoScale": _sanitize_logo_scale(team2_style.get("logoScale", 0)),
-                    "score": _sanitize_score(team2_style.get("score", 0)),
-                    "nameColor": str(team2_style.get("nameColor", "#e9eefc") or "#e9eefc"),
-                    "bevelColor": str(team2_style.get("bevelColor", "#7dd3fc") or "#7dd3fc"),
-                    "nameFont": str(team2_style.get("nameFont", "varsity") or "varsity"),
-                },
-            },
-            "valorantMapVeto": {
-                "ban1": _sanitize_valorant_map(valorant_map_veto.get("ban1", "")),
-                "ban2": _sanitize_valorant_map(valorant_map_veto.get("ban2", "")),
-                "pick1": _sanitize_valorant_map(valorant_map_veto.get("pick1", "")),
-                "pick2": _sanitize_valorant_map(valorant_map_veto.get("pick2", "")),
-                "ban3": _sanitize_valorant_map(valorant_map_veto.get("ban3", "")),
-                "ban4": _sanitize_valorant_map(valorant_map_veto.get("ban4", "")),
-                "pick3": _sanitize_valorant_map(valorant_map_veto.get("pick3", "")),
-            },
-            "valorantPickSides": {
-                "pick1": _sanitize_valorant_pick_sides(valorant_pick_sides.get("pick1", {})),
-                "pick2": _sanitize_valorant_pick_sides(valorant_pick_sides.get("pick2", {})),
-                "pick3": _sanitize_valorant_pick_sides(valorant_pick_sides.get("pick3", {})),
-            },
-            "valorantGameScore": {
-                "pick1": _sanitize_valorant_game_score(valorant_game_score.get("pick1", {})),
-                "pick2": _sanitize_valorant_game_score(valorant_game_score.get("pick2", {})),
-                "pick3": _sanitize_valorant_game_score(valorant_game_score.get("pick3", {})),
-            },
-            "updatedAt": int(time.time() * 1000),
+            "limit": self.limit,
+            "loads": loads,
+            "evictions": evictions,
+            # Least recently used first; the default match is never evicted.
+            "resident": [{"match": DEFAULT_MATCH, "version": self._default.snapshot().version, "leases": None}]
+            + [{"match": store.match, "version": store.snapshot().version, "leases": leases} for store, leases in resident],
+            "stored": self.stored(),
         }
 
-    def _load_cache(self) -> None:
+    def close(self) -> None:
+        """Flush and close every match in memory; called on shutdown."""
+        with self._lock:
+            stores = [self._default, *self._stores.values()]
+        for store in stores:
+            store.writer.close()
+
+
+MATCHES = MatchRegistry(SHARED_STATE)
+
+
+class SignalBus:
+    """Fire-and-forget triggers (``SIGNAL_TYPES``) that ride along the event streams.
+
+    A signal is not state: it never bumps the version or reaches the journal or
+    the cache file, and it is dropped once its TTL runs out. Every stream reads
+    the short ring of recent signals from its own cursor, so each subscriber
+    gets each live signal once, and one that fell behind skips stale triggers
+    instead of firing them late.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (id, match, topic, monotonic expiry, serialized signal), oldest first.
+        self._recent: deque[tuple[int, str, str, float, bytes]] = deque(maxlen=SIGNAL_BUFFER)
+        # Seeded from the wall clock like state versions, so ids keep increasing across restarts.
+        self._last_id = int(time.time() * 1000)
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, topic: Any, name: Any, ttl_ms: Any = None, match: str = DEFAULT_MATCH) -> int:
+        """Queue signal ``name`` on ``topic`` for every current subscriber of ``match`` and return its id."""
+        if topic not in SIGNAL_TYPES:
+            raise ValueError(f"Unknown signal topic: {topic}")
+        if name not in SIGNAL_TYPES[topic]:
+            raise ValueError(f"Unknown {topic} signal: {name}")
+        ttl = SIGNAL_TTL_DEFAULT_MS if ttl_ms is None else ttl_ms
+        if type(ttl) not in (int, float) or not 0 < ttl <= SIGNAL_TTL_MAX_MS:
+            raise ValueError(f"Signal ttl must be between 1 and {SIGNAL_TTL_MAX_MS} ms")
+        with self._lock:
+            self._last_id += 1
+            body = json.dumps({"id": self._last_id, "topic": topic, "name": name, "ts": int(time.time() * 1000)})
+            self._recent.append((self._last_id, match, topic, time.monotonic() + ttl / 1000, body.encode("utf-8")))
+            for listener in self._listeners:
+                listener()
+            return self._last_id
+
+    def since(self, cursor: int, topic: str | None = None, match: str = DEFAULT_MATCH) -> tuple[int, list[bytes]]:
+        """The new cursor and the live signals of ``match`` after ``cursor``, for ``topic`` or for every topic."""
+        now = time.monotonic()
+        with self._lock:
+            signals = [
+                body
+                for signal_id, signal_match, signal_topic, expires, body in self._recent
+                if signal_id > cursor and signal_match == match and expires > now and (topic is None or signal_topic == topic)
+            ]
+            return self._last_id, signals
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener`` after every publish, with the bus lock held; it must not block."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+SIGNAL_BUS = SignalBus()
+
+
+class WebSocketClosed(Exception):
+    """Raised when the peer closes the socket or sends a frame we refuse."""
+
+
+def _ws_accept_key(key: str) -> str:
+    digest = hashlib.sha1((key + WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def _ws_read_exact(rfile: Any, size: int) -> bytes:
+    data = rfile.read(size)
+    if len(data) < size:
+        raise WebSocketClosed("connection closed mid-frame")
+    return data
+
+
+def _ws_unmask(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    # XOR the whole payload as one big integer; per-byte loops are far too slow for logo uploads.
+    repeated = (mask * (len(payload) // 4 + 1))[: len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(payload), "big")
+
+
+def _ws_read_frame(rfile: Any) -> tuple[bool, int, bytes]:
+    head = _ws_read_exact(rfile, 2)
+    fin = bool(head[0] & 0x80)
+    opcode = head[0] & 0x0F
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _ws_read_exact(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _ws_read_exact(rfile, 8))[0]
+    if length > WS_MAX_MESSAGE_BYTES:
+        raise WebSocketClosed("frame too large")
+    if not head[1] & 0x80:
+        raise WebSocketClosed("client frames must be masked")
+    mask = _ws_read_exact(rfile, 4)
+    return fin, opcode, _ws_unmask(_ws_read_exact(rfile, length), mask)
+
+
+def _ws_encode_frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        head = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 65536:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return head + payload
+
+
+class ControllerSocketSession:
+    """One ``/api/ws`` connection.
+
+    The client sends ``{"type": "set", "seq": n, "state": {...}}`` or a batch
+    of ``STATE_COMMANDS`` as ``{"type": "commands", "seq": n, "commands": [...]}``
+    and gets ``{"type": "ack", "seq": n, "version": v}`` back. Commits from every other
+    producer are pushed as ``{"type": "state", "version": v, "state": {...}}``;
+    the connection's own ``set`` commits are never echoed back to it, but
+    command batches are, because only the bridge knows their result.
+    ``{"type": "signal", "seq": n, "topic": t, "name": s}`` publishes a
+    ``SIGNAL_BUS`` trigger and is acked with its id instead of a version.
+    Everything happens in the match namespace of ``store``.
+    """
+
+    def __init__(self, rfile: Any, wfile: Any, store: SharedState) -> None:
+        self._rfile = rfile
+        self._wfile = wfile
+        self._store = store
+        self._write_lock = threading.Lock()
+        self._last_own_version: int | None = None
+        self._subscription = store.subscribe()
+
+    def _send(self, opcode: int, payload: bytes) -> None:
+        self._wfile.write(_ws_encode_frame(opcode, payload))
+
+    def _send_json(self, message: dict[str, Any]) -> None:
+        self._send(WS_OP_TEXT, json.dumps(message).encode("utf-8"))
+
+    def _push_loop(self) -> None:
         try:
-            if not STATE_CACHE_PATH.exists():
+            while True:
+                snapshot = self._subscription.next(WS_PING_SECONDS)
+                if self._subscription.closed:
+                    break
+                # Checked under the write lock so a commit made by this connection
+                # (see _handle_message) is never pushed back before its ack.
+                with self._write_lock:
+                    if snapshot is None:
+                        self._send(WS_OP_PING, b"")
+                    elif snapshot.version != self._last_own_version:
+                        prefix = f'{{"type": "state", "version": {snapshot.version}, "state": '.encode("ascii")
+                        self._send(WS_OP_TEXT, prefix + snapshot.body + b"}")
+            with self._write_lock:
+                self._send(WS_OP_CLOSE, struct.pack("!H", 1001))
+        except OSError:
+            return
+
+    def _handle_message(self, raw: bytes) -> None:
+        try:
+            message = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            with self._write_lock:
+                self._send_json({"type": "error", "seq": None, "error": "Invalid JSON"})
+            return
+
+        seq = message.get("seq") if isinstance(message, dict) else None
+        kind = message.get("type") if isinstance(message, dict) else None
+        if kind == "signal":
+            try:
+                signal_id = SIGNAL_BUS.publish(message.get("topic"), message.get("name"), message.get("ttl"), self._store.match)
+                reply = {"type": "ack", "seq": seq, "signal": signal_id}
+            except ValueError as exc:
+                reply = {"type": "error", "seq": seq, "error": str(exc)}
+            with self._write_lock:
+                self._send_json(reply)
+            return
+        if kind == "set" and isinstance(message.get("state"), dict):
+            commands = None
+        elif kind == "commands" and isinstance(message.get("commands"), list) and 0 < len(message["commands"]) <= COMMAND_BATCH_LIMIT:
+            commands = message["commands"]
+        else:
+            with self._write_lock:
+                self._send_json({"type": "error", "seq": seq, "error": "Expected a set message with a state object or a commands message"})
+            return
+
+        with self._write_lock:
+            try:
+                snapshot = self._store.set(message["state"]) if commands is None else self._store.apply(commands)
+            except CommandError as exc:
+                self._send_json({"type": "error", "seq": seq, "error": str(exc), "index": exc.index})
                 return
-            payload = json.loads(STATE_CACHE_PATH.read_text(encoding="utf-8"))
-            self._state = self.sanitize(payload)
-        except Exception:
-            self._state = self.default_state()
+            if commands is None:
+                self._last_own_version = snapshot.version
+            self._send_json({"type": "ack", "seq": seq, "version": snapshot.version})
+
+    def run(self) -> None:
+        threading.Thread(target=self._push_loop, daemon=True).start()
+        fragments: list[bytes] = []
+        fragment_opcode: int | None = None
+        try:
+            while True:
+                fin, opcode, payload = _ws_read_frame(self._rfile)
+                if opcode == WS_OP_CLOSE:
+                    with self._write_lock:
+                        self._send(WS_OP_CLOSE, payload[:2])
+                    return
+                if opcode == WS_OP_PING:
+                    with self._write_lock:
+                        self._send(WS_OP_PONG, payload)
+                    continue
+                if opcode == WS_OP_PONG:
+                    continue
+                if opcode == WS_OP_CONTINUATION:
+                    if fragment_opcode is None:
+                        raise WebSocketClosed("unexpected continuation frame")
+                else:
+                    fragment_opcode = opcode
+                    fragments = []
+                fragments.append(payload)
+                if sum(len(fragment) for fragment in fragments) > WS_MAX_MESSAGE_BYTES:
+                    raise WebSocketClosed("message too large")
+                if not fin:
+                    continue
+                if fragment_opcode == WS_OP_TEXT:
+                    self._handle_message(b"".join(fragments))
+                fragments = []
+                fragment_opcode = None
+        except (WebSocketClosed, OSError):
+            return
+        finally:
+            self._store.unsubscribe(self._subscription)
+
+
+def _merge_patch(base: Any, patch: Any) -> Any:
+    """Apply ``patch`` onto ``base``: objects merge recursively, anything else replaces."""
+    if not isinstance(base, dict) or not isinstance(patch, dict):
+        return patch
+    merged = dict(base)
+    for key, value in patch.items():
+        merged[key] = _merge_patch(base.get(key), value)
+    return merged
+
+
+class CommandError(ValueError):
+    """A command of a batch was rejected; ``index`` is its position in the batch."""
+
+    def __init__(self, index: int, message: str) -> None:
+        super().__init__(message)
+        self.index = index
+
+
+def _command_choice(command: dict[str, Any], key: str, options: tuple[str, ...]) -> str:
+    value = command.get(key)
+    if value not in options:
+        raise ValueError(f"{key} must be one of {', '.join(repr(option) for option in options)}")
+    return value
+
+
+def _command_number(command: dict[str, Any], key: str, default: float | None = None) -> float:
+    value = command.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (isinstance(value, float) and not math.isfinite(value)):
+        raise ValueError(f"{key} must be a finite number")
+    return value
+
+
+def _command_text(command: dict[str, Any], key: str) -> str:
+    value = command.get(key)
+    if not isinstance(value, str):
+        raise ValueError(f"{key} must be a string")
+    if len(value) > COMMAND_TEXT_MAX_CHARS:
+        raise ValueError(f"{key} must be at most {COMMAND_TEXT_MAX_CHARS} characters")
+    return value
+
+
+def _reduce_score_set(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    state["scoreboard"][_command_choice(command, "team", STATE_TEAMS)]["score"] = _command_number(command, "value")
+    return state
 
-    def _save_cache(self) -> None:
+
+def _reduce_score_increment(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    style = state["scoreboard"][_command_choice(command, "team", STATE_TEAMS)]
+    style["score"] = max(0, style["score"] + _command_number(command, "by", 1))
+    return state
+
+
+def _reduce_ban_set(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    state[_command_choice(command, "team", STATE_TEAMS)]["ban"] = _command_text(command, "hero")
+    return state
+
+
+def _reduce_veto_set(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    slot = _command_choice(command, "slot", VALORANT_VETO_SLOTS)
+    selected = _sanitize_valorant_map(_command_text(command, "map"))
+    veto = state["valorantMapVeto"]
+    # A map can only be banned or picked once, so it leaves any other slot.
+    for other in VALORANT_VETO_SLOTS:
+        if selected and veto[other] == selected:
+            veto[other] = ""
+    veto[slot] = selected
+    return state
+
+
+def _reduce_sides_set(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    defenders = _command_choice(command, "defenders", STATE_TEAMS)
+    attackers = "team2" if defenders == "team1" else "team1"
+    state["valorantPickSides"][_command_choice(command, "pick", VALORANT_PICKS)] = {"defenders": defenders, "attackers": attackers}
+    return state
+
+
+def _reduce_sides_swap(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    sides = state["valorantPickSides"][_command_choice(command, "pick", VALORANT_PICKS)]
+    sides["defenders"], sides["attackers"] = sides["attackers"], sides["defenders"]
+    return state
+
+
+def _reduce_game_score_set(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    game = state["valorantGameScore"][_command_choice(command, "pick", VALORANT_PICKS)]
+    if "winner" in command:
+        game["winner"] = _command_choice(command, "winner", ("",) + STATE_TEAMS)
+    for key in ("team1Score", "team2Score"):
+        if key in command:
+            game[key] = _command_number(command, key)
+    return state
+
+
+def _reduce_patch(state: dict[str, Any], command: dict[str, Any]) -> dict[str, Any]:
+    patch = command.get("state")
+    if not isinstance(patch, dict):
+        raise ValueError("state must be an object")
+    return _merge_patch(state, patch)
+
+
+# Reducers behind POST /api/commands: each takes the current state (a private
+# mutable copy) and one command object, and returns the next state. The result
+# is sanitized on commit like any other write.
+STATE_COMMANDS: dict[str, Callable[[dict[str, Any], dict[str, Any]], dict[str, Any]]] = {
+    "score.set": _reduce_score_set,
+    "score.increment": _reduce_score_increment,
+    "ban.set": _reduce_ban_set,
+    "veto.set": _reduce_veto_set,
+    "sides.set": _reduce_sides_set,
+    "sides.swap": _reduce_sides_swap,
+    "gameScore.set": _reduce_game_score_set,
+    "patch": _reduce_patch,
+}
+
+
+def _apply_commands(state: dict[str, Any], commands: list[Any]) -> dict[str, Any]:
+    for index, command in enumerate(commands):
+        if not isinstance(command, dict):
+            raise CommandError(index, "Commands must be objects")
+        op = command.get("op")
+        reducer = STATE_COMMANDS.get(op) if isinstance(op, str) else None
+        if reducer is None:
+            raise CommandError(index, f"Unknown command: {op}")
         try:
-            STATE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-            STATE_CACHE_PATH.write_text(json.dumps(self._state, indent=2), encoding="utf-8")
-        except Exception:
+            state = reducer(state, command)
+        except ValueError as exc:
+            raise CommandError(index, f"{op}: {exc}") from None
+    return state
+
+
+def _default_unix_socket_path(port: int = APP_PORT) -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"ow2-hero-bans-{port}.sock")
+
+
+def _read_socket_frame(rfile: Any) -> bytes | None:
+    header = rfile.read(4)
+    if len(header) < 4:
+        return None
+    (size,) = struct.unpack(">I", header)
+    if size > LOCAL_SOCKET_MAX_FRAME_BYTES:
+        raise ValueError(f"frame of {size} bytes exceeds the limit")
+    body = rfile.read(size)
+    if len(body) < size:
+        return None
+    return body
+
+
+class LocalSocketSession:
+    """One client of the bridge's Unix domain socket.
+
+    Every message is a 4-byte big-endian length followed by a UTF-8 JSON
+    object. Requests carry a ``type``, an optional ``seq`` that is echoed
+    in the reply and an optional ``match`` namespace (``DEFAULT_MATCH`` if
+    omitted):
+
+    - ``{"type": "get", "section": s?}`` -> ``{"type": "state", "seq", "section", "version", "state"}``
+    - ``{"type": "set", "state": {...}}`` -> ``{"type": "ack", "seq", "version"}``
+    - ``{"type": "command", "name": n, "args": {...}}`` -> ``{"type": "ack", "seq", "version"}``,
+      where ``n`` is a ``STATE_COMMANDS`` op, ``undo`` or ``redo``
+    - ``{"type": "signal", "topic": t, "name": s, "ttl": ms?}`` -> ``{"type": "ack", "seq", "signal"}``,
+      publishing a ``SIGNAL_BUS`` trigger
+    - ``{"type": "subscribe", "section": s?}`` -> ack, then a ``state`` message
+      (without ``seq``, with ``match``) whenever that section changes;
+      ``unsubscribe`` stops it.
+
+    Failures answer ``{"type": "error", "seq", "error"}``. State bodies reuse
+    the snapshots' cached JSON, so a get or a push costs no re-serialization.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._write_lock = threading.Lock()
+        # Each subscription holds its match's store until it is dropped.
+        self._subscriptions: dict[tuple[str, str | None], tuple[SharedState, StateSubscription]] = {}
+
+    def _send_raw(self, body: bytes) -> None:
+        with self._write_lock:
+            self._sock.sendall(struct.pack(">I", len(body)) + body)
+
+    def _send_json(self, message: dict[str, Any]) -> None:
+        self._send_raw(json.dumps(message).encode("utf-8"))
+
+    def _send_state(self, seq: Any, match: str, section: str | None, snapshot: StateSnapshot) -> None:
+        head = json.dumps({"type": "state", "seq": seq, "match": match, "section": section, "version": snapshot.version})
+        self._send_raw(head[:-1].encode("utf-8") + b', "state": ' + snapshot.body + b"}")
+
+    def _push_loop(self, match: str, section: str | None, subscription: StateSubscription) -> None:
+        try:
+            while not subscription.closed:
+                snapshot = subscription.next(SSE_HEARTBEAT_SECONDS)
+                if snapshot is not None and not subscription.closed:
+                    self._send_state(None, match, section, snapshot)
+        except OSError:
             return
 
-    def get(self) -> dict[str, Any]:
-        with self._lock:
-            return {
-                "team1": {"ban": self._state["team1"]["ban"]},
-                "team2": {"ban": self._state["team2"]["ban"]},
-                "scoreboard": self._state["scoreboard"],
-                "valorantMapVeto": dict(self._state.get("valorantMapVeto", {})),
-                "valorantPickSides": dict(self._state.get("valorantPickSides", {})),
-                "valorantGameScore": dict(self._state.get("valorantGameScore", {})),
-                "updatedAt": self._state["updatedAt"],
-            }
+    def _run_command(self, store: SharedState, name: Any, args: Any) -> StateSnapshot:
+        if not isinstance(args, dict):
+            raise ValueError("Command args must be an object")
+        if name in STATE_COMMANDS:
+            return store.apply([{**args, "op": name}])
+        if name in ("undo", "redo"):
+            snapshot = store.undo() if name == "undo" else store.redo()
+            if snapshot is None:
+                raise ValueError(f"Nothing to {name}")
+            return snapshot
+        raise ValueError(f"Unknown command: {name}")
+
+    def _handle_message(self, raw: bytes) -> None:
+        try:
+            message = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self._send_json({"type": "error", "seq": None, "error": "Invalid JSON"})
+            return
+        if not isinstance(message, dict):
+            self._send_json({"type": "error", "seq": None, "error": "Expected a JSON object"})
+            return
 
-    def set(self, payload: dict[str, Any] | None) -> dict[str, Any]:
-        with self._lock:
-            self._state = self.sanitize(payload)
-            self._save_cache()
-            return {
-                "team1": {"ban": self._state["team1"]["ban"]},
-                "team2": {"ban": self._state["team2"]["ban"]},
-                "scoreboard": self._state["scoreboard"],
-                "valorantMapVeto": dict(self._state.get("valorantMapVeto", {})),
-                "valorantPickSides": dict(self._state.get("valorantPickSides", {})),
-                "valorantGameScore": dict(self._state.get("valorantGameScore", {})),
-                "updatedAt": self._state["updatedAt"],
-            }
+        seq = message.get("seq")
+        kind = message.get("type")
+        section = message.get("section")
+        match = message.get("match", DEFAULT_MATCH)
+        if section is not None and section not in STATE_SECTIONS:
+            self._send_json({"type": "error", "seq": seq, "error": f"Unknown state section: {section}"})
+            return
+        if not isinstance(match, str) or not MATCH_ID_RE.match(match):
+            self._send_json({"type": "error", "seq": seq, "error": f"Invalid match id: {match}"})
+            return
+        store = MATCHES.acquire(match)
+        try:
+            if kind == "get":
+                self._send_state(seq, match, section, store.snapshot(section))
+            elif kind == "set":
+                if not isinstance(message.get("state"), dict):
+                    raise ValueError("set needs a state object")
+                self._send_json({"type": "ack", "seq": seq, "version": store.set(message["state"]).version})
+            elif kind == "command":
+                snapshot = self._run_command(store, message.get("name"), message.get("args", {}))
+                self._send_json({"type": "ack", "seq": seq, "version": snapshot.version})
+            elif kind == "signal":
+                signal_id = SIGNAL_BUS.publish(message.get("topic"), message.get("name"), message.get("ttl"), match)
+                self._send_json({"type": "ack", "seq": seq, "signal": signal_id})
+            elif kind == "subscribe":
+                if (match, section) not in self._subscriptions:
+                    subscription = store.subscribe(section)
+                    self._subscriptions[(match, section)] = (MATCHES.acquire(match), subscription)
+                    threading.Thread(target=self._push_loop, args=(match, section, subscription), daemon=True).start()
+                self._send_json({"type": "ack", "seq": seq, "version": store.snapshot(section).version})
+            elif kind == "unsubscribe":
+                self._unsubscribe(match, section)
+                self._send_json({"type": "ack", "seq": seq, "version": store.snapshot(section).version})
+            else:
+                raise ValueError(f"Unknown message type: {kind}")
+        except ValueError as exc:
+            self._send_json({"type": "error", "seq": seq, "error": str(exc)})
+        finally:
+            MATCHES.release(store)
+
+    def _unsubscribe(self, match: str, section: str | None) -> None:
+        held = self._subscriptions.pop((match, section), None)
+        if held is not None:
+            store, subscription = held
+            store.unsubscribe(subscription)
+            MATCHES.release(store)
+
+    def run(self) -> None:
+        rfile = self._sock.makefile("rb")
+        try:
+            while True:
+                raw = _read_socket_frame(rfile)
+                if raw is None:
+                    return
+                self._handle_message(raw)
+        except (OSError, ValueError):
+            return
+        finally:
+            for match, section in list(self._subscriptions):
+                self._unsubscribe(match, section)
+            rfile.close()
 
 
-SHARED_STATE = SharedState()
+class LocalSocketHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        LocalSocketSession(self.request).run()
+
+
+if hasattr(socket, "AF_UNIX"):
+
+    class LocalSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Unix domain socket listener for in-host tools (see ``LocalSocketSession``)."""
+
+        daemon_threads = True
+
+        def __init__(self, path: str) -> None:
+            # Replace a socket left behind by a crashed run, but never an unrelated file.
+            try:
+                if stat.S_ISSOCK(os.stat(path).st_mode):
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+            super().__init__(path, LocalSocketHandler)
+            os.chmod(path, 0o600)
+
+        def server_close(self) -> None:
+            super().server_close()
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+
+def start_local_socket_server(path: str) -> LocalSocketServer | None:
+    if not path or not hasattr(socket, "AF_UNIX"):
+        return None
+    server = LocalSocketServer(path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    for token in str(header or "").split(","):
+        token = token.strip()
+        if token.startswith("W/"):
+            token = token[2:]
+        if token == "*" or token == etag:
+            return True
+    return False
+
+
+def _state_route(path: str) -> tuple[str, str | None] | None:
+    """Split ``/api/state[/<section>]`` and ``/api/events[/<section>]`` into prefix and section."""
+    for prefix in ("/api/state", "/api/events"):
+        if path == prefix or path.startswith(prefix + "/"):
+            return prefix, path[len(prefix):].strip("/") or None
+    return None
+
+
+def _match_route(path: str, query: dict[str, list[str]]) -> tuple[str | None, str]:
+    """Pick the match namespace of a request and the plain ``/api/...`` path it addresses.
+
+    ``/api/matches/<id>/state`` is ``/api/state`` of match ``<id>``; any other
+    route takes ``?match=<id>`` and defaults to ``DEFAULT_MATCH``. The id is
+    ``None`` when it is malformed.
+    """
+    if path.startswith("/api/matches/"):
+        match, _, rest = path[len("/api/matches/"):].partition("/")
+        path = f"/api/{rest}"
+    else:
+        match = query.get("match", [DEFAULT_MATCH])[-1]
+    return (match if MATCH_ID_RE.match(match) else None), path
+
+
+# Response builders shared by both server engines; each returns (status, headers, body)
+# and leaves Content-Length to the engine.
+def _json_response(status: int, payload: dict[str, Any]) -> tuple[int, list[tuple[str, str]], bytes]:
+    headers = [
+        ("Content-Type", "application/json; charset=utf-8"),
+        ("Cache-Control", "no-store"),
+        ("Access-Control-Allow-Origin", "*"),
+    ]
+    return status, headers, json.dumps(payload).encode("utf-8")
+
+
+def _options_response() -> tuple[int, list[tuple[str, str]], bytes]:
+    headers = [
+        ("Access-Control-Allow-Origin", "*"),
+        ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+        ("Access-Control-Allow-Headers", "Content-Type, If-None-Match"),
+        ("Access-Control-Max-Age", "600"),
+    ]
+    return 204, headers, b""
+
+
+def _snapshot_response(snapshot: StateSnapshot, request_headers: Any, conditional: bool = True) -> tuple[int, list[tuple[str, str]], bytes]:
+    headers = [
+        ("ETag", snapshot.etag),
+        ("Cache-Control", "no-cache"),
+        ("Access-Control-Allow-Origin", "*"),
+        ("Access-Control-Expose-Headers", "ETag"),
+    ]
+    if conditional and _etag_matches(request_headers.get("If-None-Match", ""), snapshot.etag):
+        return 304, headers, b""
+
+    body = snapshot.body
+    headers += [("Content-Type", "application/json; charset=utf-8"), ("Vary", "Accept-Encoding")]
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in str(request_headers.get("Accept-Encoding", "") or "").lower():
+        body = snapshot.gzip_body()
+        headers.append(("Content-Encoding", "gzip"))
+    return 200, headers, body
+
+
+def _state_response(snapshot: StateSnapshot, query: dict[str, list[str]], request_headers: Any) -> tuple[int, list[tuple[str, str]], bytes]:
+    fields = _query_fields(query)
+    if fields:
+        # Projections share the version of the document they were cut from.
+        snapshot = StateSnapshot(snapshot.version, _project_state(snapshot.state, fields))
+    return _snapshot_response(snapshot, request_headers)
+
+
+def _blob_response(digest: str, request_headers: Any) -> tuple[int, list[tuple[str, str]], bytes]:
+    path = BLOB_STORE.path_for(digest) if BLOB_REF_RE.match(f"blob:{digest}") else None
+    etag = f'"{digest}"'
+    not_modified = path is not None and _etag_matches(request_headers.get("If-None-Match", ""), etag)
+    try:
+        body = b"" if path is None or not_modified else path.read_bytes()
+    except OSError:
+        path = None
+    if path is None:
+        return _json_response(404, {"error": "Unknown blob"})
+
+    headers = [
+        ("ETag", etag),
+        ("Cache-Control", "public, max-age=31536000, immutable"),
+        ("X-Content-Type-Options", "nosniff"),
+        # Uploaded SVGs must never run script in the bridge's origin.
+        ("Content-Security-Policy", "default-src 'none'; style-src 'unsafe-inline'; sandbox"),
+        ("Access-Control-Allow-Origin", "*"),
+    ]
+    if not_modified:
+        return 304, headers, b""
+    return 200, headers + [("Content-Type", BLOB_STORE.content_type_for(path))], body
+
+
+def _stats_response(report: str, query: dict[str, list[str]]) -> tuple[int, list[tuple[str, str]], bytes]:
+    if not HISTORY_DB.enabled:
+        return _json_response(503, {"error": f"Match history is disabled{': ' + HISTORY_DB.error if HISTORY_DB.error else ''}"})
+    reports = {"": lambda _query: HISTORY_DB.stats(), "heroes": HISTORY_DB.hero_bans, "maps": HISTORY_DB.map_vetoes, "games": HISTORY_DB.game_scores}
+    if report not in reports:
+        return _json_response(404, {"error": f"Unknown stats report: {report}"})
+    started = time.perf_counter()
+    try:
+        payload = reports[report](query)
+    except sqlite3.Error as exc:
+        return _json_response(500, {"error": f"Match history query failed: {exc}"})
+    payload["queryMs"] = round((time.perf_counter() - started) * 1000, 3)
+    return _json_response(200, payload)
+
+
+def _get_response(
+    path: str, request_headers: Any, match: str = DEFAULT_MATCH, query: dict[str, list[str]] | None = None
+) -> tuple[int, list[tuple[str, str]], bytes] | None:
+    """Answer the plain API GET routes, or return ``None`` for static files."""
+    if path == "/api/fonts":
+        return _json_response(200, {"fonts": _list_font_entries()})
+    if path == "/api/aggregates":
+        return _state_response(AGGREGATES.snapshot(), query or {}, request_headers)
+    if path == "/api/bootstrap":
+        return _snapshot_response(BOOTSTRAP.snapshot(match), request_headers)
+    if path == "/api/static":
+        return _json_response(200, dict(STATIC_CACHE.stats(), bundles=ASSET_MANIFEST.stats(), overlays=OVERLAY_PAGES.stats(), bootstrap=BOOTSTRAP.stats()))
+    if path == "/api/stats" or path.startswith("/api/stats/"):
+        return _stats_response(path[len("/api/stats"):].strip("/"), query or {})
+    if path == "/api/matches":
+        return _json_response(200, MATCHES.stats())
+    if path in ("/api/persistence", "/api/history"):
+        store = MATCHES.acquire(match)
+        try:
+            if path == "/api/persistence":
+                return _json_response(200, dict(store.writer.stats(), deduplicated=store.deduplicated))
+            return _json_response(200, store.history())
+        finally:
+            MATCHES.release(store)
+    if path.startswith("/api/blobs/"):
+        return _blob_response(path[len("/api/blobs/"):], request_headers)
+    if path.startswith("/overlay/"):
+        return _overlay_response(path[len("/overlay/"):], query or {}, match, request_headers)
+    if path in LEGACY_OVERLAY_PAGES:
+        team, role = LEGACY_OVERLAY_PAGES[path]
+        params = [("team", team[-1]), ("role", role)]
+        params += [(name, value) for name, values in (query or {}).items() if name not in ("team", "role") for value in values]
+        return _redirect_response(f"/overlay/scoreboard?{urlencode(params)}")
+    return None
+
+
+def _post_response(path: str, request_headers: Any, raw: bytes, match: str = DEFAULT_MATCH) -> tuple[int, list[tuple[str, str]], bytes]:
+    if path == "/api/blobs":
+        content_type = str(request_headers.get("Content-Type", "") or "").split(";")[0].strip().lower()
+        if content_type not in BLOB_CONTENT_TYPES:
+            return _json_response(415, {"error": "Blobs must be PNG, JPEG, GIF, WebP or SVG images"})
+        if not raw or len(raw) > BLOB_MAX_BYTES:
+            return _json_response(413, {"error": f"Blobs must be between 1 and {BLOB_MAX_BYTES} bytes"})
+        try:
+            digest = BLOB_STORE.put(raw, content_type)
+        except OSError:
+            return _json_response(500, {"error": "Unable to store blob"})
+        return _json_response(201, {"ref": f"blob:{digest}", "hash": digest, "size": len(raw), "contentType": content_type})
+
+    if path not in ("/api/undo", "/api/redo", "/api/state", "/api/commands", "/api/signals"):
+        return _json_response(404, {"error": "Not found"})
+    if path in ("/api/undo", "/api/redo"):
+        payload = None
+    else:
+        try:
+            payload = json.loads(raw.decode("utf-8")) if raw else {}
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return _json_response(400, {"error": "Invalid JSON"})
+    if path == "/api/signals":
+        if not isinstance(payload, dict):
+            return _json_response(400, {"error": "Expected a signal object"})
+        try:
+            signal_id = SIGNAL_BUS.publish(payload.get("topic"), payload.get("name"), payload.get("ttl"), match)
+        except ValueError as exc:
+            return _json_response(400, {"error": str(exc)})
+        return _json_response(202, {"id": signal_id})
+
+    store = MATCHES.acquire(match)
+    try:
+        return _commit_response(store, path, payload)
+    finally:
+        MATCHES.release(store)
+
+
+def _commit_response(store: SharedState, path: str, payload: Any) -> tuple[int, list[tuple[str, str]], bytes]:
+    if path in ("/api/undo", "/api/redo"):
+        snapshot = store.undo() if path == "/api/undo" else store.redo()
+        if snapshot is None:
+            return _json_response(409, {"error": f"Nothing to {path[len('/api/'):]}"})
+        return _snapshot_response(snapshot, {}, conditional=False)
+    if path == "/api/state":
+        return _snapshot_response(store.set(payload), {}, conditional=False)
+
+    # One command object, or a list of them committed as one atomic batch.
+    commands = payload if isinstance(payload, list) else [payload]
+    if not commands or len(commands) > COMMAND_BATCH_LIMIT:
+        return _json_response(400, {"error": f"Send between 1 and {COMMAND_BATCH_LIMIT} commands"})
+    try:
+        snapshot = store.apply(commands)
+    except CommandError as exc:
+        return _json_response(400, {"error": str(exc), "index": exc.index})
+    return _json_response(200, {"version": snapshot.version})
 
 
 class BridgeHandler(SimpleHTTPRequestHandler):
@@ -298,54 +2809,1197 @@ class BridgeHandler(SimpleHTTPRequestHandler):
 
         return
 
-    def _write_json(self, status: int, payload: dict[str, Any]) -> None:
-        body = json.dumps(payload).encode("utf-8")
+    def _send(self, response: tuple[int, list[tuple[str, str]], bytes | StaticFile]) -> None:
+        status, headers, body = response
         self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-store")
-        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in headers:
+            self.send_header(name, value)
+        if status not in (204, 304) and not any(name == "Content-Length" for name, _value in headers):
+            self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(body)
+        if isinstance(body, StaticFile):
+            self._send_file(body)
+        else:
+            self.wfile.write(body)
 
-    def do_OPTIONS(self) -> None:  # noqa: N802
-        self.send_response(204)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+    def _send_file(self, static_file: StaticFile) -> None:
+        try:
+            with static_file.path.open("rb") as handle:
+                sent = self.connection.sendfile(handle, 0, static_file.size)
+        except OSError:
+            sent = 0
+        if sent < static_file.size:
+            # The file shrank or went away after its Content-Length was sent.
+            self.close_connection = True
+
+    def _write_json(self, status: int, payload: dict[str, Any]) -> None:
+        self._send(_json_response(status, payload))
+
+    def _stream_events(self, store: SharedState, section: str | None) -> None:
+        signal_cursor = SIGNAL_BUS.last_id
+        subscription = store.subscribe(section)
+        SIGNAL_BUS.add_listener(subscription.wake)
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(f"retry: {SSE_RETRY_MS}\n\n".encode("ascii"))
+            last_event_id = str(self.headers.get("Last-Event-ID", "") or "").strip()
+            while not subscription.closed:
+                snapshot = subscription.next(SSE_HEARTBEAT_SECONDS)
+                if subscription.closed:
+                    break
+                signal_cursor, signals = SIGNAL_BUS.since(signal_cursor, section, store.match)
+                if snapshot is None and not signals:
+                    self.wfile.write(b": keep-alive\n\n")
+                    continue
+                if snapshot is not None and str(snapshot.version) != last_event_id:
+                    last_event_id = ""
+                    self.wfile.write(f"event: state\nid: {snapshot.version}\ndata: ".encode("ascii") + snapshot.body + b"\n\n")
+                # Signals carry no id, so Last-Event-ID keeps tracking the state version.
+                for body in signals:
+                    self.wfile.write(b"event: signal\ndata: " + body + b"\n\n")
+        except OSError:
+            # Client went away (tab closed, source hidden); nothing to clean up beyond the subscription.
+            pass
+        finally:
+            SIGNAL_BUS.remove_listener(subscription.wake)
+            store.unsubscribe(subscription)
+
+    def _handle_websocket(self, store: SharedState) -> None:
+        key = str(self.headers.get("Sec-WebSocket-Key", "") or "").strip()
+        if "websocket" not in str(self.headers.get("Upgrade", "") or "").lower() or not key:
+            self._write_json(400, {"error": "Expected a WebSocket upgrade"})
+            return
+
+        # Browsers reject a 101 sent with the default HTTP/1.0 status line.
+        self.protocol_version = "HTTP/1.1"
+        self.close_connection = True
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", _ws_accept_key(key))
         self.end_headers()
+        ControllerSocketSession(self.rfile, self.wfile, store).run()
+
+    def do_OPTIONS(self) -> None:  # noqa: N802
+        self._send(_options_response())
+
+    def _read_state(self, store: SharedState, section: str | None, query: dict[str, list[str]]) -> None:
+        since = _query_int(query, "since")
+        if since is None:
+            snapshot = store.snapshot(section)
+        else:
+            timeout = _query_float(query, "timeout", LONG_POLL_DEFAULT_SECONDS)
+            deadline = time.monotonic() + min(max(timeout, 0.0), LONG_POLL_MAX_SECONDS)
+            # Waited in slices: an overlay whose event stream connected aborts its
+            # poll, and that must free this stream worker instead of pinning it.
+            while True:
+                snapshot = store.wait_for_change(since, min(LONG_POLL_CHECK_SECONDS, max(deadline - time.monotonic(), 0.0)), section)
+                if snapshot.version != since or time.monotonic() >= deadline:
+                    break
+                if self._client_gone():
+                    self.close_connection = True
+                    return
+        self._send(_state_response(snapshot, query, self.headers))
+
+    def _client_gone(self) -> bool:
+        """Whether the client hung up; a waiting long-poll client sends nothing until it is answered."""
+        try:
+            readable, _writable, _failed = select.select([self.connection], [], [], 0)
+            return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+        except OSError:
+            return True
 
     def do_GET(self) -> None:  # noqa: N802
         parsed = urlparse(self.path)
-        if parsed.path == "/api/state":
-            self._write_json(200, SHARED_STATE.get())
+        query = parse_qs(parsed.query)
+        match, path = _match_route(parsed.path, query)
+        if match is None:
+            self._write_json(404, {"error": "Invalid match id"})
+            return
+        route = _state_route(path)
+        if route is not None and route[1] is not None and route[1] not in STATE_SECTIONS:
+            self._write_json(404, {"error": f"Unknown state section: {route[1]}"})
+            return
+        if route is not None or path == "/api/ws":
+            store = MATCHES.acquire(match)
+            try:
+                if route is None:
+                    self._handle_websocket(store)
+                elif route[0] == "/api/state":
+                    self._read_state(store, route[1], query)
+                else:
+                    self._stream_events(store, route[1])
+            finally:
+                MATCHES.release(store)
+            return
+        if path == "/api/pool":
+            self._write_json(200, self.server.pool.stats())
             return
-        if parsed.path == "/api/fonts":
-            self._write_json(200, {"fonts": _list_font_entries()})
+        response = _get_response(path, self.headers, match, query)
+        if response is not None:
+            self._send(response)
             return
-        super().do_GET()
+        self._send(_static_response("GET", path, self.headers))
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self._send(_static_response("HEAD", urlparse(self.path).path, self.headers))
 
     def do_POST(self) -> None:  # noqa: N802
         parsed = urlparse(self.path)
-        if parsed.path != "/api/state":
-            self._write_json(404, {"error": "Not found"})
-            return
-
+        match, path = _match_route(parsed.path, parse_qs(parsed.query))
         content_length = int(self.headers.get("Content-Length", "0"))
+        if path == "/api/blobs" and content_length > BLOB_MAX_BYTES:
+            self.close_connection = True
+            self._write_json(413, {"error": f"Blobs must be between 1 and {BLOB_MAX_BYTES} bytes"})
+            return
         raw = self.rfile.read(content_length)
-        try:
-            payload = json.loads(raw.decode("utf-8")) if raw else {}
-        except json.JSONDecodeError:
-            self._write_json(400, {"error": "Invalid JSON"})
+        if match is None:
+            self._write_json(404, {"error": "Invalid match id"})
             return
+        self._send(_post_response(path, self.headers, raw, match))
 
-        updated = SHARED_STATE.set(payload)
-        self._write_json(200, updated)
 
+def _request_lane(request_head: bytes) -> str:
+    """Pick the worker lane for a request from the start of its request line.
+
+    ``stream`` holds connections that stay open (event streams, WebSockets and
+    long-polls), ``api`` serves the short API requests, and everything else is
+    a static file transfer.
+    """
+    try:
+        target = request_head.split(b"\r\n", 1)[0].split(b" ")[1].decode("latin-1")
+    except (IndexError, UnicodeDecodeError):
+        return "static"
+    parsed = urlparse(target)
+    query = parse_qs(parsed.query)
+    _match, path = _match_route(parsed.path, query)
+    route = _state_route(path)
+    if path == "/api/ws" or (route is not None and (route[0] == "/api/events" or "since" in query)):
+        return "stream"
+    return "api" if path.startswith("/api/") else "static"
+
+
+class LaneFullError(RuntimeError):
+    """Raised by ``WorkerLane.submit`` when a lane with a queue limit has no room."""
+
+
+class WorkerLane:
+    """Fixed-size set of worker threads draining one FIFO queue.
+
+    Threads are started on demand up to ``workers`` and then kept, so a burst
+    of requests never creates more threads than the lane allows. With a
+    ``queue_limit``, a request that would wait behind more than that many
+    others for a worker is refused instead of queued: a stream lane's workers
+    are held for as long as their connections stay open, so a queued stream
+    might never start.
+    """
+
+    def __init__(self, name: str, workers: int, queue_limit: int | None = None) -> None:
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.queue_limit = queue_limit
+        self._rejected = 0
+        self._queue: deque[tuple[Future[Any], Callable[..., Any], tuple[Any, ...], float]] = deque()
+        self._ready = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+        self._busy = 0
+        self._closed = False
+        self._served = 0
+        self._max_queued = 0
+        self._max_wait = 0.0
+        self._recent_waits: deque[float] = deque(maxlen=LANE_WAIT_WINDOW)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future[Any]:
+        future: Future[Any] = Future()
+        with self._ready:
+            if self._closed:
+                raise RuntimeError(f"Worker lane {self.name} is shut down")
+            free = self._idle + self.workers - len(self._threads)
+            if self.queue_limit is not None and len(self._queue) >= free + self.queue_limit:
+                self._rejected += 1
+                raise LaneFullError(f"Worker lane {self.name} is full")
+            self._queue.append((future, fn, args, time.perf_counter()))
+            self._max_queued = max(self._max_queued, len(self._queue))
+            if self._idle < len(self._queue) and len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"bridge-{self.name}-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._ready.notify()
+        return future
+
+    def shutdown(self) -> None:
+        with self._ready:
+            self._closed = True
+            pending = list(self._queue)
+            self._queue.clear()
+            self._ready.notify_all()
+        for future, *_ in pending:
+            future.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        with self._ready:
+            waits = sorted(self._recent_waits)
+            return {
+                "workers": self.workers,
+                "threads": len(self._threads),
+                "busy": self._busy,
+                "queued": len(self._queue),
+                "maxQueued": self._max_queued,
+                "served": self._served,
+                "rejected": self._rejected,
+                "waitMs": {
+                    "avg": round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+                    "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else 0.0,
+                    "max": round(self._max_wait * 1000, 3),
+                },
+            }
+
+    def _work(self) -> None:
+        while True:
+            with self._ready:
+                self._idle += 1
+                while not self._queue and not self._closed:
+                    self._ready.wait()
+                self._idle -= 1
+                if self._closed:
+                    return
+                future, fn, args, queued_at = self._queue.popleft()
+                wait = time.perf_counter() - queued_at
+                self._recent_waits.append(wait)
+                self._max_wait = max(self._max_wait, wait)
+                self._busy += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as exc:
+                        future.set_exception(exc)
+            finally:
+                with self._ready:
+                    self._busy -= 1
+                    self._served += 1
+
+
+class WorkerPool:
+    """Bounded bridge worker pool split into independent priority lanes.
+
+    Each lane has its own threads and queue, so API reads and controller
+    commits never wait behind static file transfers during a scene load.
+    """
+
+    def __init__(self, lane_workers: dict[str, int]) -> None:
+        self.lanes = {name: WorkerLane(name, workers, LANE_QUEUE_LIMITS.get(name)) for name, workers in lane_workers.items()}
+
+    def submit(self, lane: str, fn: Callable[..., Any], *args: Any) -> Future[Any]:
+        return self.lanes[lane].submit(fn, *args)
+
+    def shutdown(self) -> None:
+        for lane in self.lanes.values():
+            lane.shutdown()
+
+    def stats(self) -> dict[str, Any]:
+        return {"lanes": {name: lane.stats() for name, lane in self.lanes.items()}}
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP server handing each connection to a ``WorkerPool`` lane.
+
+    A dispatcher thread waits until an accepted connection has sent its
+    request line, peeks at it to choose the lane, and only then queues the
+    connection, so the accept loop never blocks on slow or idle clients.
+    """
 
-class ReusableThreadingHTTPServer(ThreadingHTTPServer):
     allow_reuse_address = True
 
+    def __init__(self, server_address: tuple[str, int], handler: type[BridgeHandler], lane_workers: dict[str, int] | None = None) -> None:
+        # Build the pool and dispatcher before binding: socketserver calls
+        # server_close() when the bind fails, and that must not mask the OSError.
+        self.pool = WorkerPool(lane_workers or DEFAULT_LANE_WORKERS)
+        self._pending = selectors.DefaultSelector()
+        self._pending_lock = threading.Lock()
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._pending.register(self._wake_recv, selectors.EVENT_READ)
+        self._dispatching = True
+        self._dispatcher = threading.Thread(target=self._dispatch_pending, name="bridge-dispatcher", daemon=True)
+        self._dispatcher.start()
+        super().__init__(server_address, handler)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        with self._pending_lock:
+            self._pending.register(request, selectors.EVENT_READ, (client_address, time.monotonic()))
+        self._wake_send.send(b"\0")
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._dispatching = False
+        self._wake_send.send(b"\0")
+        self._dispatcher.join()
+        with self._pending_lock:
+            for key in list(self._pending.get_map().values()):
+                if key.fileobj is not self._wake_recv:
+                    self.shutdown_request(key.fileobj)
+            self._pending.close()
+        self._wake_recv.close()
+        self._wake_send.close()
+        self.pool.shutdown()
+
+    def _dispatch_pending(self) -> None:
+        while self._dispatching:
+            events = self._pending.select(timeout=1.0)
+            for key, _ in events:
+                if key.fileobj is self._wake_recv:
+                    try:
+                        self._wake_recv.recv(512)
+                    except BlockingIOError:
+                        pass
+                    continue
+                client_address, _ = key.data
+                with self._pending_lock:
+                    self._pending.unregister(key.fileobj)
+                try:
+                    head = key.fileobj.recv(LANE_PEEK_BYTES, socket.MSG_PEEK)
+                except OSError:
+                    head = b""
+                if not head:
+                    self.shutdown_request(key.fileobj)
+                    continue
+                try:
+                    self.pool.submit(_request_lane(head), self._process_in_worker, key.fileobj, client_address)
+                except LaneFullError as exc:
+                    self._refuse(key.fileobj, str(exc))
+                except RuntimeError:
+                    self.shutdown_request(key.fileobj)
+            self._drop_idle_pending()
+
+    def _refuse(self, request: Any, reason: str) -> None:
+        """Answer 503 with ``Retry-After`` so the client backs off or falls back to a short request."""
+        body = json.dumps({"error": reason}).encode("utf-8")
+        head = (
+            "HTTP/1.1 503 Service Unavailable\r\n"
+            f"Retry-After: {LANE_RETRY_AFTER_SECONDS}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        try:
+            # Consume the peeked request first; closing with unread bytes would reset the connection.
+            request.recv(LANE_PEEK_BYTES)
+            request.sendall(head.encode("latin-1") + body)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _drop_idle_pending(self) -> None:
+        # Browsers preconnect sockets they may never use; do not hold them forever.
+        deadline = time.monotonic() - LANE_CLASSIFY_TIMEOUT_SECONDS
+        with self._pending_lock:
+            stale = [key.fileobj for key in self._pending.get_map().values() if key.data is not None and key.data[1] < deadline]
+            for request in stale:
+                self._pending.unregister(request)
+        for request in stale:
+            self.shutdown_request(request)
+
+    def _process_in_worker(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # A client closing its connection before the answer is written is routine, not a traceback.
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StaticFile:
+    """One static file as last seen on disk, with its validators.
+
+    ``body`` (and ``gzip_body`` for text) hold the bytes of files below
+    ``STATIC_SENDFILE_MIN_BYTES``; larger files keep ``body`` ``None`` and are
+    streamed from ``path``. ``tag`` tells apart bodies derived from the same
+    file, such as a page rewritten for the bundle manifest; bodies that do not
+    follow the file's mtime blank ``last_modified``.
+    """
+
+    def __init__(self, path: Path, file_stat: os.stat_result, body: bytes | None, tag: str = "") -> None:
+        self.path = path
+        self.file_stat = file_stat
+        self.size = file_stat.st_size
+        self.mtime_ns = file_stat.st_mtime_ns
+        self.content_type = mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+        self.etag = f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}{tag}"'
+        # Each encoding is its own representation and needs its own validator.
+        self.gzip_etag = f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}{tag}-gz"'
+        self.last_modified = formatdate(file_stat.st_mtime, usegmt=True)
+        self.body = body
+        self.gzip_body: bytes | None = None
+        if body is not None and len(body) >= GZIP_MIN_BYTES and self.content_type.startswith(STATIC_GZIP_TYPES):
+            compressed = gzip.compress(body, compresslevel=9)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+
+    @property
+    def cost(self) -> int:
+        return len(self.body or b"") + len(self.gzip_body or b"")
+
+
+class StaticFileCache:
+    """Static files kept in memory, keyed by path and checked against mtime and size.
+
+    Every request still costs one ``stat``, so an edited file is served at
+    once, but a hit skips the open and read (and the compression). Large files
+    only have their validators cached. Beyond ``max_bytes`` the least recently
+    used files are dropped.
+    """
+
+    def __init__(self, max_bytes: int = STATIC_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files: OrderedDict[Path, StaticFile] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._loads = 0
+
+    def get(self, path: Path) -> StaticFile | None:
+        """The current ``StaticFile`` at ``path``; ``None`` if there is no regular file."""
+        try:
+            file_stat = path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached.mtime_ns == file_stat.st_mtime_ns and cached.size == file_stat.st_size:
+                self._files.move_to_end(path)
+                self._hits += 1
+                return cached
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+        try:
+            with path.open("rb") as handle:
+                # Validators and bytes from the same open file, so they always agree.
+                file_stat = os.fstat(handle.fileno())
+                body = handle.read() if file_stat.st_size < STATIC_SENDFILE_MIN_BYTES else None
+        except OSError:
+            return None
+        static_file = StaticFile(path, file_stat, body)
+        with self._lock:
+            replaced = self._files.pop(path, None)
+            if replaced is not None:
+                self._bytes -= replaced.cost
+            self._files[path] = static_file
+            self._bytes += static_file.cost
+            self._loads += 1
+            while self._bytes > self.max_bytes and len(self._files) > 1:
+                _path, evicted = self._files.popitem(last=False)
+                self._bytes -= evicted.cost
+        return static_file
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"files": len(self._files), "bytes": self._bytes, "maxBytes": self.max_bytes, "hits": self._hits, "loads": self._loads}
+
+
+STATIC_CACHE = StaticFileCache()
+
+
+class AssetManifest:
+    """The bundle manifest written by ``scripts/build_assets.py``.
+
+    Pages name the unbundled sources (``./js/app.js``, ``./css/styles.css``);
+    ``rewrite`` swaps those tags for the page's content-hashed bundles. Every
+    call stats the manifest and the sources it was built from and reloads on a
+    change; while any source differs from what was built the manifest is not
+    used, so an edit is never hidden behind a stale bundle.
+    """
+
+    def __init__(self, path: Path = ASSET_MANIFEST_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature: tuple[tuple[int, int], ...] | None = None
+        self._sources: list[Path] = []
+        self._pages: dict[str, dict[str, list[str]]] = {}
+        self._build = ""
+        self._status = "missing"
+        self._rewritten: dict[Path, tuple[StaticFile, str, StaticFile]] = {}
+
+    def _stat_signature(self) -> tuple[tuple[int, int], ...]:
+        signature = []
+        for path in (self.path, *self._sources):
+            try:
+                file_stat = path.stat()
+            except OSError:
+                signature.append((-1, -1))
+            else:
+                signature.append((file_stat.st_mtime_ns, file_stat.st_size))
+        return tuple(signature)
+
+    def _load(self) -> None:
+        self._sources, self._pages, self._build = [], {}, ""
+        try:
+            content = self.path.read_bytes()
+        except OSError:
+            self._status = "missing"
+            return
+        try:
+            manifest = json.loads(content)
+            sources = {ROOT_DIR.joinpath(*name.split("/")): digest for name, digest in manifest["sources"].items()}
+            pages = {page: {ref: [str(target) for target in targets] for ref, targets in refs.items()} for page, refs in manifest["pages"].items()}
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            self._status = f"invalid: {exc}"
+            return
+        self._sources = list(sources)
+        for source, digest in sources.items():
+            try:
+                if hashlib.sha256(source.read_bytes()).hexdigest() != digest:
+                    self._status = f"stale: {source.relative_to(ROOT_DIR).as_posix()} changed since the build"
+                    return
+            except OSError:
+                self._status = f"stale: {source.relative_to(ROOT_DIR).as_posix()} is missing"
+                return
+        self._pages = pages
+        self._build = hashlib.sha256(content).hexdigest()[:12]
+        self._status = "ok"
+
+    def _current(self) -> tuple[str, dict[str, dict[str, list[str]]]]:
+        with self._lock:
+            signature = self._stat_signature()
+            if signature != self._signature:
+                self._load()
+                # Signed after loading so the sources the new manifest names are included.
+                self._signature = self._stat_signature()
+            return self._build, self._pages
+
+    def rewrite(self, page: str, static_file: StaticFile) -> StaticFile:
+        """``static_file`` (the page at ``page``) pointing at its bundles, or unchanged without a usable build."""
+        build, pages = self._current()
+        refs = pages.get(page)
+        if not refs or static_file.body is None:
+            return static_file
+        with self._lock:
+            cached = self._rewritten.get(static_file.path)
+            if cached is not None and cached[0] is static_file and cached[1] == build:
+                return cached[2]
+        try:
+            text = static_file.body.decode("utf-8")
+        except UnicodeDecodeError:
+            return static_file
+
+        def replace(match: re.Match[str]) -> str:
+            targets = refs.get(match.group("ref"))
+            if targets is None:
+                return match.group(0)
+            if not targets:
+                return "\0"
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            indent = text[line_start : match.start()]
+            before = text[match.start() : match.start("ref")]
+            after = text[match.end("ref") : match.end()]
+            return f"\n{indent if not indent.strip() else ''}".join(f"{before}{target}{after}" for target in targets)
+
+        # A dropped tag takes its line with it.
+        body = re.sub(r"\n[ \t]*\0[ \t]*(?=\n)", "", ASSET_TAG_RE.sub(replace, text)).replace("\0", "").encode("utf-8")
+        rewritten = StaticFile(static_file.path, static_file.file_stat, body, tag=f"-{build}")
+        with self._lock:
+            self._rewritten[static_file.path] = (static_file, build, rewritten)
+        return rewritten
+
+    def stats(self) -> dict[str, Any]:
+        self._current()
+        with self._lock:
+            return {"status": self._status, "build": self._build, "pages": len(self._pages)}
+
+
+ASSET_MANIFEST = AssetManifest()
+
+
+def _static_response(method: str, path: str, request_headers: Any) -> tuple[int, list[tuple[str, str]], bytes | StaticFile]:
+    """Serve a file under ``ROOT_DIR`` from ``STATIC_CACHE``.
+
+    The body is a ``StaticFile`` to stream when its bytes are not in memory;
+    whenever the body is not the full content, the headers carry its
+    Content-Length.
+    """
+    parts = [part for part in unquote(path).split("/") if part and part not in (".", "..")]
+    file_path = ROOT_DIR.joinpath(*parts)
+    if file_path.is_dir():
+        file_path = file_path / "index.html"
+    static_file = STATIC_CACHE.get(file_path)
+    if static_file is None:
+        return _json_response(404, {"error": "Not found"})
+    if file_path.suffix == ".html":
+        static_file = ASSET_MANIFEST.rewrite(file_path.relative_to(ROOT_DIR).as_posix(), static_file)
+    immutable = file_path.parent == BUNDLES_DIR and HASHED_ASSET_RE.match(file_path.name) is not None
+    return _static_file_response(method, static_file, request_headers, immutable)
+
+
+def _static_file_response(
+    method: str, static_file: StaticFile, request_headers: Any, immutable: bool = False
+) -> tuple[int, list[tuple[str, str]], bytes | StaticFile]:
+    use_gzip = static_file.gzip_body is not None and "gzip" in str(request_headers.get("Accept-Encoding", "") or "").lower()
+    etag = static_file.gzip_etag if use_gzip else static_file.etag
+    headers = [
+        ("Content-Type", static_file.content_type),
+        ("ETag", etag),
+        # Browser sources revalidate on every load, so edits show up, but a 304 skips the transfer.
+        ("Cache-Control", IMMUTABLE_CACHE_CONTROL if immutable else "no-cache"),
+    ]
+    if static_file.last_modified:
+        headers.append(("Last-Modified", static_file.last_modified))
+    if static_file.gzip_body is not None:
+        headers.append(("Vary", "Accept-Encoding"))
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match:
+        if _etag_matches(if_none_match, etag):
+            return 304, headers, b""
+    elif static_file.last_modified and request_headers.get("If-Modified-Since"):
+        try:
+            if static_file.mtime_ns // 1_000_000_000 <= parsedate_to_datetime(request_headers.get("If-Modified-Since")).timestamp():
+                return 304, headers, b""
+        except (TypeError, ValueError, IndexError, OverflowError):
+            pass
+    body = static_file.body
+    if use_gzip:
+        body = static_file.gzip_body
+        headers.append(("Content-Encoding", "gzip"))
+    if method == "HEAD" or body is None:
+        headers.append(("Content-Length", str(static_file.size if body is None else len(body))))
+        return 200, headers, b"" if method == "HEAD" else static_file
+    return 200, headers, body
+
+
+def _overlay_asset_url(value: str) -> str:
+    """``resolveAssetUrl`` of ``js/app.js``, relative to the bridge that renders the page."""
+    blob = BLOB_REF_RE.match(value)
+    return f"/api/blobs/{blob.group(1)}" if blob else value
+
+
+class OverlayPages:
+    """The ``/overlay/<kind>`` routes, rendered from ``templates/`` with the current state.
+
+    A browser source gets a page that is already painted, with the state
+    section it was painted from embedded for ``js/app.js``, so its first frame
+    needs no further request. A rendered page is kept per URL until its
+    template (or the bundle build), the hero catalog or the version of its
+    state section changes.
+    """
+
+    def __init__(self, max_pages: int = OVERLAY_CACHE_SIZE) -> None:
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._pages: OrderedDict[tuple[str, ...], tuple[tuple[Any, ...], StaticFile]] = OrderedDict()
+        self._heroes: tuple[StaticFile | None, dict[str, Mapping[str, Any]]] = (None, {})
+        self._hits = 0
+        self._renders = 0
+
+    def _hero_catalog(self) -> tuple[str, dict[str, Mapping[str, Any]]]:
+        """``data/heroes.json`` keyed like ``heroesByName`` in ``js/app.js``, with its ETag."""
+        heroes_file = STATIC_CACHE.get(HEROES_JSON)
+        if heroes_file is None or heroes_file.body is None:
+            return "", {}
+        with self._lock:
+            if self._heroes[0] is heroes_file:
+                return heroes_file.etag, self._heroes[1]
+        try:
+            heroes = json.loads(heroes_file.body)["heroes"]
+            catalog = {str(hero["name"]).strip().lower(): hero for hero in heroes if isinstance(hero, dict) and hero.get("name")}
+        except (ValueError, KeyError, TypeError):
+            catalog = {}
+        with self._lock:
+            self._heroes = (heroes_file, catalog)
+        return heroes_file.etag, catalog
+
+    def page(self, kind: str, team: str, role: str, hero: str, match: str) -> StaticFile | None:
+        """The rendered ``/overlay/<kind>`` page; ``None`` if its template is missing."""
+        template_name = f"templates/overlay-{kind}.html"
+        template = STATIC_CACHE.get(ROOT_DIR / template_name)
+        if template is None or template.body is None:
+            return None
+        template = ASSET_MANIFEST.rewrite(template_name, template)
+        heroes_etag, heroes = self._hero_catalog() if kind == "hero-ban" else ("", {})
+        section = f"heroBans/{team}" if kind == "hero-ban" else f"scoreboard/{team}"
+        store = MATCHES.acquire(match)
+        try:
+            snapshot = store.snapshot(section)
+        finally:
+            MATCHES.release(store)
+
+        key = (kind, team, role, hero, match)
+        depends_on = (template.etag, heroes_etag, snapshot.version)
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] == depends_on:
+                self._pages.move_to_end(key)
+                self._hits += 1
+                return cached[1]
+
+        label = f"Team {team[-1]}"
+        if kind == "hero-ban":
+            fields = self._hero_ban_fields(snapshot.state.get(team, {}), hero, heroes, label)
+        else:
+            fields = self._scoreboard_fields(snapshot.state.get("scoreboard", {}).get(team, {}), role, label)
+        # `</` would end the script element early; JSON allows escaping the slash.
+        state_json = snapshot.body.decode("utf-8").replace("</", "<\\/")
+        fields.update(
+            team=team,
+            role=role,
+            initial_state=(
+                f'<script type="application/json" id="bridge-initial-state" data-section="{section}" '
+                f'data-version="{snapshot.version}">{state_json}</script>'
+            ),
+        )
+        body = Template(template.body.decode("utf-8")).safe_substitute(fields).encode("utf-8")
+        tag = hashlib.sha256(repr(depends_on).encode("utf-8")).hexdigest()[:12]
+        page = StaticFile(template.path, template.file_stat, body, tag=f"-{tag}")
+        # The page changes with the state, not with the template's mtime, so only the ETag validates it.
+        page.last_modified = ""
+        with self._lock:
+            self._pages[key] = (depends_on, page)
+            self._pages.move_to_end(key)
+            self._renders += 1
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return page
+
+    @staticmethod
+    def _hero_ban_fields(team_state: Mapping[str, Any], hero: str, heroes: dict[str, Mapping[str, Any]], label: str) -> dict[str, str]:
+        """What ``paintOverlay`` in ``js/app.js`` would show; ``?hero=`` overrides the state like there."""
+        selected = (hero or str(team_state.get("ban", "")) or "").strip()
+        record = heroes.get(selected.lower())
+        image = str(record.get("image", "")) if record else ""
+        if image:
+            source = "./assets/" + re.sub(r"^\.\./", "", image).replace("%", "%25")
+            image_attributes = f'src="{html.escape(source)}" style="display: block" '
+        else:
+            image_attributes = 'style="display: none" '
+        return {
+            "title": f"{label} Ban Overlay",
+            "hero_name": html.escape(selected or "NO BAN"),
+            "image_attributes": image_attributes,
+            "placeholder_display": "none" if image else "grid",
+        }
+
+    @staticmethod
+    def _scoreboard_fields(team_state: Mapping[str, Any], role: str, label: str) -> dict[str, str]:
+        """The stage ``paint`` in ``renderScoreboardOverlay`` would build for ``role``."""
+        if role == "score":
+            stage = f'    <h1 class="scoreboard-score" data-scoreboard-value>{int(team_state.get("score", 0))}</h1>'
+        elif role == "logo":
+            size = 100 + int(team_state.get("logoScale", 0))
+            logo = str(team_state.get("logo", ""))
+            source = f'src="{html.escape(_overlay_asset_url(logo))}" ' if logo else ""
+            display = "block" if logo else "none"
+            stage = (
+                f'    <img class="scoreboard-logo" data-scoreboard-value alt="{label} Logo" {source}'
+                f'style="width: {size}%; height: {size}%; display: {display}" />'
+            )
+        else:
+            name_png = str(team_state.get("namePng", "")).strip()
+            use_png = bool(team_state.get("nameUsePng")) and bool(name_png)
+            font = str(team_state.get("nameFont", "varsity"))
+            text_style = (
+                f"--scoreboard-name-color: {team_state.get('nameColor', '#e9eefc')}; "
+                f"--scoreboard-name-bevel-color: {team_state.get('bevelColor', '#7dd3fc')};"
+            )
+            font_face = ""
+            if font.startswith("file:"):
+                path = font[len("file:"):].lstrip("/")
+                font_url = json.dumps(path if path.startswith(".") else f"./{path}")
+                font_face = f'    <style>@font-face {{ font-family: "OW2ServerFont"; src: url({font_url}); }}</style>\n'
+                font_class = "is-font-custom"
+                text_style += ' --scoreboard-custom-font-family: "OW2ServerFont", "Impact", "Arial Black", sans-serif;'
+            else:
+                font_class = f"is-font-{font}"
+            if use_png:
+                text_style += " display: none;"
+            size = 100 + int(team_state.get("namePngScale", 0))
+            source = f'src="{html.escape(_overlay_asset_url(name_png))}" ' if use_png else ""
+            stage = (
+                f"{font_face}"
+                f'    <h1 class="scoreboard-name {font_class}" data-scoreboard-value data-scoreboard-name-text="true" '
+                f'style="{html.escape(text_style)}">{html.escape(str(team_state.get("name", "")) or "TEAM")}</h1>\n'
+                f'    <img class="scoreboard-name-image" data-scoreboard-name-image alt="" {source}'
+                f'style="width: {size}%; height: {size}%; display: {"block" if use_png else "none"}" />'
+            )
+        return {"title": f"{label} {role.capitalize()} Overlay", "stage": stage}
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"pages": len(self._pages), "maxPages": self.max_pages, "hits": self._hits, "renders": self._renders}
+
+
+OVERLAY_PAGES = OverlayPages()
+
+
+def _overlay_response(kind: str, query: dict[str, list[str]], match: str, request_headers: Any) -> tuple[int, list[tuple[str, str]], bytes]:
+    """Serve ``/overlay/hero-ban?team=1`` and ``/overlay/scoreboard?team=2&role=score`` from ``OVERLAY_PAGES``."""
+    if kind not in ("hero-ban", "scoreboard"):
+        return _json_response(404, {"error": f"Unknown overlay: {kind}"})
+    team = query.get("team", [""])[-1]
+    team = f"team{team}" if team in ("1", "2") else team
+    if team not in STATE_TEAMS:
+        return _json_response(404, {"error": "team must be 1 or 2"})
+    role = query.get("role", ["score"])[-1] if kind == "scoreboard" else ""
+    if kind == "scoreboard" and role not in SCOREBOARD_ROLES:
+        return _json_response(404, {"error": f"role must be one of {', '.join(SCOREBOARD_ROLES)}"})
+    hero = query.get("hero", [""])[-1] if kind == "hero-ban" else ""
+    page = OVERLAY_PAGES.page(kind, team, role, hero, match)
+    if page is None:
+        return _json_response(404, {"error": "Not found"})
+    return _static_file_response("GET", page, request_headers)
+
+
+class BootstrapCache:
+    """The ``/api/bootstrap`` document: everything the controller reads before its first paint.
+
+    It carries the hero catalog, the Valorant map catalog, the font list and
+    the match state in one response. Each part is cached with the validator it
+    was loaded under (file ETags, the fonts directory mtimes, the state
+    version) and only that part is reloaded when its validator moves; the
+    serialized document is kept per match until any of them does.
+    """
+
+    def __init__(self, max_matches: int = BOOTSTRAP_CACHE_SIZE) -> None:
+        self.max_matches = max_matches
+        self._lock = threading.Lock()
+        self._parts: dict[str, tuple[Any, Any]] = {}
+        self._documents: OrderedDict[str, tuple[tuple[Any, ...], StateSnapshot]] = OrderedDict()
+        # Seeded from the wall clock like state versions, so ETags keep increasing across restarts.
+        self._version = int(time.time() * 1000)
+        self._hits = 0
+        self._builds = 0
+        self._loads = 0
+
+    def _part(self, name: str, validator: Any, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            cached = self._parts.get(name)
+            if cached is not None and cached[0] == validator:
+                return cached[1]
+        value = load()
+        with self._lock:
+            self._parts[name] = (validator, value)
+            self._loads += 1
+        return value
+
+    @staticmethod
+    def _json_file(static_file: StaticFile | None) -> Any:
+        if static_file is None:
+            return None
+        try:
+            return json.loads(static_file.body if static_file.body is not None else static_file.path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def snapshot(self, match: str) -> StateSnapshot:
+        heroes_file = STATIC_CACHE.get(HEROES_JSON)
+        maps_file = STATIC_CACHE.get(VALORANT_MAPS_JSON)
+        fonts_signature = _fonts_signature()
+        store = MATCHES.acquire(match)
+        try:
+            state = store.snapshot()
+        finally:
+            MATCHES.release(store)
+        validators = (heroes_file and heroes_file.etag, maps_file and maps_file.etag, fonts_signature, state.version)
+        with self._lock:
+            cached = self._documents.get(match)
+            if cached is not None and cached[0] == validators:
+                self._documents.move_to_end(match)
+                self._hits += 1
+                return cached[1]
+
+        document = {
+            "heroes": self._part("heroes", validators[0], lambda: self._json_file(heroes_file)),
+            "maps": self._part("maps", validators[1], lambda: self._json_file(maps_file)),
+            "fonts": self._part("fonts", fonts_signature, lambda: {"fonts": _list_font_entries()}),
+            "state": {"version": state.version, "document": state.state},
+        }
+        with self._lock:
+            self._version += 1
+            snapshot = StateSnapshot(self._version, document)
+            self._documents[match] = (validators, snapshot)
+            self._documents.move_to_end(match)
+            self._builds += 1
+            while len(self._documents) > self.max_matches:
+                self._documents.popitem(last=False)
+        return snapshot
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"documents": len(self._documents), "hits": self._hits, "builds": self._builds, "partLoads": self._loads}
+
+
+BOOTSTRAP = BootstrapCache()
+
+
+def _redirect_response(location: str) -> tuple[int, list[tuple[str, str]], bytes]:
+    return 301, [("Location", location), ("Cache-Control", "no-cache")], b""
+
+
+class AsyncBridgeServer:
+    """Bridge engine running every connection on one asyncio event loop.
+
+    Serves the same routes as ``BridgeHandler`` over HTTP/1.1 keep-alive, so an
+    overlay reuses one connection for all of its polls. Long-polls and
+    ``/api/events`` streams wait on the loop; only disk work (state commits,
+    fonts, blobs, static files) runs on the api and static lanes of a
+    ``WorkerPool``. ``/api/ws`` is not
+    offered, and controllers fall back to POSTing ``/api/state``.
+
+    Mirrors the ``serve_forever``/``shutdown``/``server_close`` surface of the
+    socketserver engine so callers can switch between them.
+    """
+
+    def __init__(self, server_address: tuple[str, int], lane_workers: dict[str, int] | None = None) -> None:
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.socket.bind(server_address)
+            self.socket.listen(socket.SOMAXCONN)
+        except OSError:
+            self.socket.close()
+            raise
+        self.server_address = self.socket.getsockname()[:2]
+        self._loop = asyncio.new_event_loop()
+        # Streams wait on the loop itself, so only the disk lanes need threads.
+        lane_workers = lane_workers or DEFAULT_LANE_WORKERS
+        self.pool = WorkerPool({lane: lane_workers[lane] for lane in ("api", "static")})
+        self._server: asyncio.AbstractServer | None = None
+        self._commit_event: asyncio.Event | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._stopped = threading.Event()
+
+    def serve_forever(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._commit_event = asyncio.Event()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_client, sock=self.socket, limit=ASYNC_MAX_HEADER_BYTES)
+        )
+        MATCHES.add_listener(self._on_commit)
+        # Signals wake the same waiters; streams pick them up with their own cursor.
+        SIGNAL_BUS.add_listener(self._on_commit)
+        try:
+            self._loop.run_forever()
+        finally:
+            SIGNAL_BUS.remove_listener(self._on_commit)
+            MATCHES.remove_listener(self._on_commit)
+            self._loop.close()
+            self._stopped.set()
+
+    def shutdown(self) -> None:
+        if self._server is None or self._stopped.is_set():
+            return
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._stopped.wait()
+
+    def server_close(self) -> None:
+        self.socket.close()
+        self.pool.shutdown()
+
+    async def _close(self) -> None:
+        assert self._server is not None
+        self._server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def _on_commit(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wake_waiters)
+        except RuntimeError:
+            # Loop already closed; nothing is waiting any more.
+            return
+
+    def _wake_waiters(self) -> None:
+        assert self._commit_event is not None
+        self._commit_event.set()
+        self._commit_event = asyncio.Event()
+
+    async def _wait_for_commit(self, timeout: float) -> bool:
+        assert self._commit_event is not None
+        try:
+            await asyncio.wait_for(self._commit_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _write(self, writer: asyncio.StreamWriter, response: tuple[int, list[tuple[str, str]], bytes], keep_alive: bool, head_only: bool = False) -> None:
+        status, headers, body = response
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        if status not in (204, 304) and not head_only:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        # One write per response: separate header and body segments stall on Nagle + delayed ACK.
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (b"" if head_only else body))
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._tasks.add(task)
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), ASYNC_IDLE_TIMEOUT_SECONDS)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+                request_line, _, header_block = head.partition(b"\r\n")
+                try:
+                    method, target, version = request_line.decode("latin-1").split(" ", 2)
+                    headers = http.client.parse_headers(io.BytesIO(header_block))
+                    content_length = int(headers.get("Content-Length", "0") or 0)
+                except (ValueError, http.client.HTTPException):
+                    self._write(writer, _json_response(400, {"error": "Bad request"}), keep_alive=False)
+                    break
+
+                connection = str(headers.get("Connection", "") or "").lower()
+                keep_alive = "close" not in connection if version == "HTTP/1.1" else "keep-alive" in connection
+                if content_length > ASYNC_MAX_BODY_BYTES or (urlparse(target).path == "/api/blobs" and content_length > BLOB_MAX_BYTES):
+                    self._write(writer, _json_response(413, {"error": "Request body too large"}), keep_alive=False)
+                    break
+                body = await reader.readexactly(content_length) if content_length > 0 else b""
+                keep_alive = await self._dispatch(method, target, headers, body, writer, keep_alive)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._tasks.discard(task)
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, headers: Any, body: bytes, writer: asyncio.StreamWriter, keep_alive: bool) -> bool:
+        """Answer one request and return whether the connection may be reused."""
+        parsed = urlparse(target)
+        if method == "OPTIONS":
+            self._write(writer, _options_response(), keep_alive)
+            return keep_alive
+        if method not in ("GET", "HEAD", "POST"):
+            self._write(writer, _json_response(405, {"error": "Method not allowed"}), keep_alive)
+            return keep_alive
+
+        query = parse_qs(parsed.query)
+        match, path = _match_route(parsed.path, query)
+        if match is None:
+            self._write(writer, _json_response(404, {"error": "Invalid match id"}), keep_alive)
+            return keep_alive
+        route = _state_route(path)
+        if method != "POST" and route is not None:
+            prefix, section = route
+            if section is not None and section not in STATE_SECTIONS:
+                self._write(writer, _json_response(404, {"error": f"Unknown state section: {section}"}), keep_alive)
+                return keep_alive
+            # Loading an evicted match reads its journal, so that happens on the api lane.
+            store = MATCHES.try_acquire(match) or await asyncio.wrap_future(self.pool.submit("api", MATCHES.acquire, match), loop=self._loop)
+            try:
+                if prefix == "/api/state":
+                    self._write(writer, await self._read_state(store, section, query, headers), keep_alive, method == "HEAD")
+                else:
+                    await self._stream_events(store, section, headers, writer)
+                    return False
+            finally:
+                MATCHES.release(store)
+            return keep_alive
+        if path == "/api/ws":
+            self._write(writer, _json_response(501, {"error": "WebSocket sync needs the threaded bridge engine"}), keep_alive)
+            return keep_alive
+        if path == "/api/pool":
+            self._write(writer, _json_response(200, self.pool.stats()), keep_alive, method == "HEAD")
+            return keep_alive
+
+        if method == "POST" and path == "/api/signals":
+            # Never touches disk, so it is answered on the loop without a lane hop.
+            self._write(writer, _post_response(path, headers, body, match), keep_alive)
+            return keep_alive
+        if path == "/api/aggregates":
+            # A published snapshot, so no lane hop either.
+            self._write(writer, _state_response(AGGREGATES.snapshot(), query, headers), keep_alive, method == "HEAD")
+            return keep_alive
+
+        lane = "api" if path.startswith("/api/") else "static"
+        if method == "POST":
+            future = self.pool.submit(lane, _post_response, path, headers, body, match)
+        else:
+            future = self.pool.submit(lane, self._disk_get, method, path, headers, match, query)
+        response = await asyncio.wrap_future(future, loop=self._loop)
+        if isinstance(response[2], StaticFile):
+            return await self._send_file(writer, response, keep_alive)
+        self._write(writer, response, keep_alive, method == "HEAD")
+        return keep_alive
+
+    async def _send_file(self, writer: asyncio.StreamWriter, response: tuple[int, list[tuple[str, str]], StaticFile], keep_alive: bool) -> bool:
+        status, headers, static_file = response
+        self._write(writer, (status, headers, b""), keep_alive, head_only=True)
+        await writer.drain()
+        try:
+            # The kernel copies straight from the page cache; the loop only waits for the socket.
+            with static_file.path.open("rb") as handle:
+                sent = await self._loop.sendfile(writer.transport, handle, 0, static_file.size)
+        except OSError:
+            sent = 0
+        # A short file leaves the announced Content-Length unmet; only closing recovers.
+        return keep_alive and sent == static_file.size
+
+    @staticmethod
+    def _disk_get(method: str, path: str, headers: Any, match: str, query: dict[str, list[str]]) -> tuple[int, list[tuple[str, str]], bytes | StaticFile]:
+        return _get_response(path, headers, match, query) or _static_response(method, path, headers)
+
+    async def _read_state(self, store: SharedState, section: str | None, query: dict[str, list[str]], headers: Any) -> tuple[int, list[tuple[str, str]], bytes]:
+        snapshot = store.snapshot(section)
+        since = _query_int(query, "since")
+        if since is not None:
+            timeout = min(max(_query_float(query, "timeout", LONG_POLL_DEFAULT_SECONDS), 0.0), LONG_POLL_MAX_SECONDS)
+            deadline = time.monotonic() + timeout
+            while snapshot.version == since:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await self._wait_for_commit(remaining)
+                snapshot = store.snapshot(section)
+        return _state_response(snapshot, query, headers)
+
+    async def _stream_events(self, store: SharedState, section: str | None, headers: Any, writer: asyncio.StreamWriter) -> None:
+        self._write(writer, (200, [
+            ("Content-Type", "text/event-stream; charset=utf-8"),
+            ("Cache-Control", "no-store"),
+            ("Access-Control-Allow-Origin", "*"),
+        ], b""), keep_alive=False, head_only=True)
+        writer.write(f"retry: {SSE_RETRY_MS}\n\n".encode("ascii"))
+        last_event_id = str(headers.get("Last-Event-ID", "") or "").strip()
+        sent_version: int | None = None
+        signal_cursor = SIGNAL_BUS.last_id
+        while True:
+            # Drain first: nothing may yield between reading the state and waiting
+            # for the next wake-up, or a commit or signal in between would be missed.
+            await writer.drain()
+            snapshot = store.snapshot(section)
+            signal_cursor, signals = SIGNAL_BUS.since(signal_cursor, section, store.match)
+            if snapshot.version != sent_version:
+                sent_version = snapshot.version
+                if str(snapshot.version) != last_event_id:
+                    writer.write(f"event: state\nid: {snapshot.version}\ndata: ".encode("ascii") + snapshot.body + b"\n\n")
+                last_event_id = ""
+            for body in signals:
+                writer.write(b"event: signal\ndata: " + body + b"\n\n")
+            if not await self._wait_for_commit(SSE_HEARTBEAT_SECONDS):
+                writer.write(b": keep-alive\n\n")
+
+
+def create_bridge_server(host: str, port: int, engine: str = "threaded", lane_workers: dict[str, int] | None = None) -> PooledHTTPServer | AsyncBridgeServer:
+    if engine == "asyncio":
+        return AsyncBridgeServer((host, port), lane_workers)
+    return PooledHTTPServer((host, port), BridgeHandler, lane_workers)
+
 
 def normalize(value: str) -> str:
     return value.strip().lower()
@@ -413,13 +4067,13 @@ class HeroSuggest(tk.Frame):
         self,
         parent: tk.Misc,
         heroes: list[Hero],
-        icon_map: dict[str, ImageTk.PhotoImage],
+        icons: HeroIconCache,
         on_select: Callable[[str], None],
     ) -> None:
         super().__init__(parent, bg=BG_CARD)
         self.heroes = heroes
         self.hero_names = {h.name for h in heroes}
-        self.icon_map = icon_map
+        self.icons = icons
         self.on_select = on_select
 
         self.query_var = tk.StringVar()
@@ -557,7 +4211,7 @@ class HeroSuggest(tk.Frame):
             self.tree.delete(item)
 
         for hero in items:
-            self.tree.insert("", "end", text=hero.name, image=self.icon_map.get(hero.name, ""))
+            self.tree.insert("", "end", text=hero.name, image=self.icons.get(hero.name) or "")
 
         x = self.winfo_rootx()
         y = self.winfo_rooty() + self.winfo_height() + 1
@@ -589,11 +4243,11 @@ class HeroSuggest(tk.Frame):
 
 
 class ControlGui:
-    def __init__(self, root: tk.Tk, heroes: list[Hero], icon_map: dict[str, ImageTk.PhotoImage]) -> None:
+    def __init__(self, root: tk.Tk, heroes: list[Hero], icons: HeroIconCache) -> None:
         self.root = root
         self.heroes = heroes
         self.hero_names = {h.name for h in heroes}
-        self.icon_map = icon_map
+        self.icons = icons
         state = SHARED_STATE.get()
 
         root.title("OW2 Hero Bans GUI")
@@ -661,7 +4315,7 @@ class ControlGui:
         panel.pack(fill="x", pady=(0, 6))
 
         tk.Label(panel.inner, text=f"{title} Ban", bg=BG_CARD, fg=TXT_PRIMARY, font=("Segoe UI", 10, "bold")).pack(anchor="w")
-        selector = HeroSuggest(panel.inner, self.heroes, self.icon_map, lambda value, v=target_var: v.set(value))
+        selector = HeroSuggest(panel.inner, self.heroes, self.icons, lambda value, v=target_var: v.set(value))
         selector.pack(fill="x", pady=(3, 5))
 
         row = tk.Frame(panel.inner, bg=BG_CARD)
@@ -718,7 +4372,7 @@ class ControlGui:
             value = self.team1_var.get().strip()
             if value not in self.hero_names:
                 value = ""
-            icon = self.icon_map.get(value)
+            icon = self.icons.get(value)
             self.team1_name.configure(text=value or "None")
             self.team1_icon.configure(image=icon)
             self.team1_icon.image = icon
@@ -727,7 +4381,7 @@ class ControlGui:
         value = self.team2_var.get().strip()
         if value not in self.hero_names:
             value = ""
-        icon = self.icon_map.get(value)
+        icon = self.icons.get(value)
         self.team2_name.configure(text=value or "None")
         self.team2_icon.configure(image=icon)
         self.team2_icon.image = icon
@@ -776,32 +4430,109 @@ def load_heroes() -> list[Hero]:
     return heroes
 
 
-def load_icon_map(heroes: list[Hero]) -> dict[str, ImageTk.PhotoImage]:
-    icon_map: dict[str, ImageTk.PhotoImage] = {}
-    for hero in heroes:
-        if not hero.image_path:
-            continue
-        image = Image.open(hero.image_path).convert("RGBA")
-        image.thumbnail((24, 24), Image.Resampling.LANCZOS)
-        icon_map[hero.name] = ImageTk.PhotoImage(image)
-    return icon_map
+class HeroIconCache:
+    """Hero icons for the suggestion list and previews, decoded off the Tk thread.
+
+    Each thumbnail is kept as a PNG under ``cache_dir``, named after the source
+    path, its mtime and the target size, so a later start only reads small
+    files and an edited or resized icon gets a fresh entry. Thumbnails are
+    prepared on a thread pool as soon as the cache is created; the
+    ``PhotoImage`` is made on the Tk thread the first time ``get`` asks for it.
+    """
 
+    def __init__(self, heroes: list[Hero], size: int = ICON_SIZE, cache_dir: Path = ICON_CACHE_DIR, workers: int = ICON_DECODE_WORKERS) -> None:
+        self.size = size
+        self.cache_dir = cache_dir
+        self._photos: dict[str, ImageTk.PhotoImage | None] = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="hero-icons")
+        self._pending: dict[str, Future] = {
+            hero.name: executor.submit(self._thumbnail, hero.image_path) for hero in heroes if hero.image_path
+        }
+        # The queued decodes still run; nothing else is ever submitted.
+        executor.shutdown(wait=False)
+
+    def _cache_path(self, source: Path, file_stat: os.stat_result) -> Path:
+        key = f"{source.resolve()}\0{file_stat.st_mtime_ns}\0{self.size}"
+        return self.cache_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.png"
 
-def start_server(port: int = APP_PORT) -> ThreadingHTTPServer:
-    server = ReusableThreadingHTTPServer((APP_HOST, port), BridgeHandler)
+    def _thumbnail(self, source: Path) -> Image.Image | None:
+        try:
+            cache_path = self._cache_path(source, source.stat())
+        except OSError:
+            return None
+        try:
+            with Image.open(cache_path) as cached:
+                cached.load()
+                return cached.copy()
+        except (OSError, ValueError):
+            pass
+        try:
+            with Image.open(source) as decoded:
+                image = decoded.convert("RGBA")
+        except (OSError, ValueError):
+            return None
+        image.thumbnail((self.size, self.size), Image.Resampling.LANCZOS)
+        encoded = io.BytesIO()
+        image.save(encoded, format="PNG")
+        temp_path = cache_path.with_name(f".{cache_path.name}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(encoded.getvalue())
+            os.replace(temp_path, cache_path)
+        except OSError:
+            # A read-only install still shows icons; it only decodes them again next start.
+            pass
+        return image
+
+    def get(self, name: str) -> ImageTk.PhotoImage | None:
+        """The icon of hero ``name``, waiting for its thumbnail if it is still being decoded; call on the Tk thread."""
+        if name in self._photos:
+            return self._photos[name]
+        future = self._pending.pop(name, None)
+        image = future.result() if future is not None else None
+        photo = ImageTk.PhotoImage(image) if image is not None else None
+        self._photos[name] = photo
+        return photo
+
+
+def start_server(port: int = APP_PORT, engine: str = "threaded", lane_workers: dict[str, int] | None = None) -> PooledHTTPServer | AsyncBridgeServer:
+    server = create_bridge_server(APP_HOST, port, engine, lane_workers)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
     return server
 
 
 def main() -> None:
-    start_server()
+    parser = argparse.ArgumentParser(description="OW2 Hero Bans controller and local bridge server.")
+    parser.add_argument("--engine", choices=BRIDGE_ENGINES, default="threaded", help="bridge server engine (default: threaded)")
+    for lane, workers in DEFAULT_LANE_WORKERS.items():
+        parser.add_argument(f"--{lane}-workers", type=int, default=workers, help=f"bridge worker threads for {lane} requests (default: {workers})")
+    parser.add_argument(
+        "--unix-socket",
+        default=_default_unix_socket_path() if hasattr(socket, "AF_UNIX") else "",
+        help="Unix domain socket for in-host tools; pass an empty string to disable",
+    )
+    parser.add_argument("--cache-interval", type=float, default=CACHE_WRITE_INTERVAL_SECONDS, help="seconds to coalesce state cache writes (default: %(default)s)")
+    parser.add_argument("--cache-fsync", choices=CACHE_FSYNC_POLICIES, default="always", help="when to fsync the state cache (default: always)")
+    parser.add_argument("--match-cache", type=int, default=MATCH_CACHE_LIMIT, help="matches kept in memory besides the default one (default: %(default)s)")
+    parser.add_argument("--history-db", default=str(HISTORY_DB_PATH), help="SQLite file recording bans, vetoes and game scores; pass an empty string to disable")
+    args = parser.parse_args()
+    CACHE_WRITER.interval = max(0.0, args.cache_interval)
+    CACHE_WRITER.fsync = args.cache_fsync
+    MATCHES.limit = max(1, args.match_cache)
+    if args.history_db and HISTORY_DB.open(Path(args.history_db)):
+        AGGREGATES.load(HISTORY_DB)
+    start_server(engine=args.engine, lane_workers={lane: getattr(args, f"{lane}_workers") for lane in DEFAULT_LANE_WORKERS})
+    start_local_socket_server(args.unix_socket)
     root = tk.Tk()
     heroes = load_heroes()
-    icon_map = load_icon_map(heroes)
-    gui = ControlGui(root, heroes, icon_map)
+    gui = ControlGui(root, heroes, HeroIconCache(heroes))
     gui.apply_update()
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        MATCHES.close()
+        HISTORY_DB.close()
 
 
 if __name__ == "__main__":
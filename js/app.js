@@ -1,11 +1,29 @@
 (() => {
-  const STATE_KEY = 'ow2_bans_state';
+  // Every page of one match passes ?match=<id>; without it the default match is used.
+  const BRIDGE_MATCH = (() => {
+    const match = new URLSearchParams(window.location.search).get('match') || '';
+    return /^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$/.test(match) && match !== 'default' ? match : '';
+  })();
+  const STATE_KEY = BRIDGE_MATCH ? `ow2_bans_state:${BRIDGE_MATCH}` : 'ow2_bans_state';
   const HEROES_PATH = './data/heroes.json';
   const HERO_IMAGE_BASE = './assets/';
   const OVERLAY_POLL_MS = 500;
+  const LONG_POLL_TIMEOUT_S = 25;
   const FADE_TRANSITION_MS = 260;
-  const BRIDGE_STATE_URL = 'http://127.0.0.1:8765/api/state';
-  const BRIDGE_FONTS_URL = 'http://127.0.0.1:8765/api/fonts';
+  const BRIDGE_HOST = '127.0.0.1:8765';
+  const BRIDGE_API = BRIDGE_MATCH ? `/api/matches/${BRIDGE_MATCH}` : '/api';
+  const BRIDGE_STATE_URL = `http://${BRIDGE_HOST}${BRIDGE_API}/state`;
+  const BRIDGE_FONTS_URL = `http://${BRIDGE_HOST}/api/fonts`;
+  const BRIDGE_BOOTSTRAP_URL = `http://${BRIDGE_HOST}${BRIDGE_API}/bootstrap`;
+  const BRIDGE_EVENTS_URL = `http://${BRIDGE_HOST}${BRIDGE_API}/events`;
+  const BRIDGE_WS_URL = `ws://${BRIDGE_HOST}${BRIDGE_API}/ws`;
+  const BRIDGE_BLOBS_URL = `http://${BRIDGE_HOST}/api/blobs`;
+  const BRIDGE_UNDO_URL = `http://${BRIDGE_HOST}${BRIDGE_API}/undo`;
+  const BRIDGE_REDO_URL = `http://${BRIDGE_HOST}${BRIDGE_API}/redo`;
+  const BRIDGE_COMMANDS_URL = `http://${BRIDGE_HOST}${BRIDGE_API}/commands`;
+  const BRIDGE_SIGNALS_URL = `http://${BRIDGE_HOST}${BRIDGE_API}/signals`;
+  const BLOB_REF_PATTERN = /^blob:([0-9a-f]{64})$/;
+  const CONTROLLER_SOCKET_RETRY_MS = 2000;
   const BUILTIN_NAME_FONTS = [
     { value: 'varsity', label: 'Varsity / Jersey' },
     { value: 'block', label: 'Block Bold' },
@@ -19,6 +37,7 @@
   const PARTICLE_LOGO_MAX_LEN = 4 * 1024 * 1024;
   const PARTICLE_COMMAND_TYPES = new Set(['start-sequence', 'burst']);
 
+  let bridgeBootstrap = null;
   let heroList = [];
   let heroesByName = new Map();
   let valorantMaps = [];
@@ -26,6 +45,11 @@
   let valorantMapUuidByName = new Map();
   let refreshValorantMapPoolOptions = null;
   let syncLogoParticleControls = () => {};
+  const bridgeStateCache = new Map();
+  let controllerSocket = null;
+  let controllerSocketSeq = 0;
+  let controllerSocketAckedVersion = 0;
+  const controllerSocketPending = new Map();
 
   const clampRange = (value, min, max, fallback) => {
     const numeric = Number(value);
@@ -36,11 +60,19 @@
   const sanitizeParticleLogoSource = (value) => {
     const raw = String(value || '');
     if (!raw) return '';
+    if (BLOB_REF_PATTERN.test(raw)) return raw;
     if (!raw.startsWith('data:image/')) return '';
     if (raw.length > PARTICLE_LOGO_MAX_LEN) return '';
     return raw;
   };
 
+  // `blob:<sha256>` refs point at images uploaded to the bridge; anything else
+  // (paths, URLs, data URLs) is used as-is.
+  const resolveAssetUrl = (value) => {
+    const match = BLOB_REF_PATTERN.exec(String(value || ''));
+    return match ? `${BRIDGE_BLOBS_URL}/${match[1]}` : value;
+  };
+
   const sanitizeParticleCommand = (value) => {
     if (!value || typeof value !== 'object') return null;
     const type = String(value.type || '').trim();
@@ -54,76 +86,9 @@
     };
   };
 
-  const defaultLogoParticleState = () => ({
-    density: 6,
-    size: 2,
-    speed: 0.08,
-    depth: 0.55,
-    startAngle: 10,
-    team1Reset: true,
-    holdTime: 6,
-    burstForce: 1,
-    cameraDistance: 700,
-    activeLogoIndex: 0,
-    logoSources: ['', ''],
-    command: null
-  });
+  const defaultLogoParticleState = () => sanitizeLogoParticleState({});
 
-  const sanitizeLogoParticleState = (value) => {
-    const fallback = defaultLogoParticleState();
-    const source = value && typeof value === 'object' ? value : {};
-    const rawLogos = Array.isArray(source.logoSources) ? source.logoSources : fallback.logoSources;
-    const logoSources = [
-      sanitizeParticleLogoSource(rawLogos[0]),
-      sanitizeParticleLogoSource(rawLogos[1])
-    ];
-
-    return {
-      density: Math.round(clampRange(source.density, 3, 12, fallback.density)),
-      size: clampRange(source.size, 1, 5, fallback.size),
-      speed: clampRange(source.speed, 0.03, 0.2, fallback.speed),
-      depth: clampRange(source.depth, 0, 1, fallback.depth),
-      startAngle: Math.round(clampRange(source.startAngle, 0, 359, fallback.startAngle)),
-      team1Reset: typeof source.team1Reset === 'boolean' ? source.team1Reset : fallback.team1Reset,
-      holdTime: Math.round(clampRange(source.holdTime, 2, 15, fallback.holdTime)),
-      burstForce: clampRange(source.burstForce, 0, 2, fallback.burstForce),
-      cameraDistance: Math.round(clampRange(source.cameraDistance, 420, 1100, fallback.cameraDistance)),
-      activeLogoIndex: clampRange(source.activeLogoIndex, 0, 1, fallback.activeLogoIndex),
-      logoSources,
-      command: sanitizeParticleCommand(source.command)
-    };
-  };
-
-  const defaultState = () => ({
-    team1: { ban: '' },
-    team2: { ban: '' },
-    scoreboard: {
-      team1: { name: '', nameUsePng: false, namePng: '', namePngScale: 0, logo: '', logoScale: 0, score: 0, nameColor: '#e9eefc', bevelColor: '#7dd3fc', nameFont: 'varsity' },
-      team2: { name: '', nameUsePng: false, namePng: '', namePngScale: 0, logo: '', logoScale: 0, score: 0, nameColor: '#e9eefc', bevelColor: '#7dd3fc', nameFont: 'varsity' }
-    },
-    valorantMapVeto: {
-      ban1: '',
-      ban2: '',
-      pick1: '',
-      pick2: '',
-      ban3: '',
-      ban4: '',
-      pick3: ''
-    },
-    valorantPickSides: {
-      pick1: { defenders: 'team1', attackers: 'team2' },
-      pick2: { defenders: 'team1', attackers: 'team2' },
-      pick3: { defenders: 'team1', attackers: 'team2' }
-    },
-    valorantGameScore: {
-      pick1: { winner: '', team1Score: 0, team2Score: 0 },
-      pick2: { winner: '', team1Score: 0, team2Score: 0 },
-      pick3: { winner: '', team1Score: 0, team2Score: 0 }
-    },
-    valorantMapPool: valorantMaps.map((map) => map.uuid),
-    logoParticle: defaultLogoParticleState(),
-    updatedAt: Date.now()
-  });
+  const defaultState = () => sanitizeState({});
 
   const normalize = (value) => (value || '').trim().toLowerCase();
 
@@ -231,11 +196,32 @@
     return stem.replace(/[_-]+/g, ' ').replace(/\s+/g, ' ').trim() || 'Custom Font';
   };
 
+  // The controller's hero and map catalogs, fonts and state in one bridge
+  // request. Each part is used once, by the loader that would otherwise fetch
+  // it; without a bridge (file mode) every loader fetches as before.
+  async function loadBridgeBootstrap() {
+    try {
+      const response = await fetch(BRIDGE_BOOTSTRAP_URL, { cache: 'no-cache' });
+      if (response.ok) bridgeBootstrap = await response.json();
+    } catch {
+      bridgeBootstrap = null;
+    }
+  }
+
+  function takeBootstrapPart(name) {
+    const part = bridgeBootstrap?.[name] ?? null;
+    if (bridgeBootstrap) delete bridgeBootstrap[name];
+    return part;
+  }
+
   async function readBridgeFonts() {
     try {
-      const response = await fetch(BRIDGE_FONTS_URL, { cache: 'no-store' });
-      if (!response.ok) return [];
-      const payload = await response.json();
+      let payload = takeBootstrapPart('fonts');
+      if (!payload) {
+        const response = await fetch(BRIDGE_FONTS_URL, { cache: 'no-store' });
+        if (!response.ok) return [];
+        payload = await response.json();
+      }
       const fonts = Array.isArray(payload?.fonts) ? payload.fonts : [];
       return fonts
         .map((font) => {
@@ -311,61 +297,177 @@
     });
   }
 
+  // BEGIN GENERATED STATE SANITIZER (scripts/state_schema.py; do not edit by hand)
+  function schemaObject(value) {
+    return value && typeof value === 'object' && !Array.isArray(value) ? value : {};
+  }
+
+  function schemaList(value) {
+    return Array.isArray(value) ? value : [];
+  }
+
+  function schemaNumber(value) {
+    if (typeof value === 'number') return Number.isFinite(value) ? value : null;
+    if (typeof value !== 'string' || !value.trim()) return null;
+    const numeric = Number(value);
+    return Number.isFinite(numeric) ? numeric : null;
+  }
+
+  function schemaClamp(numeric, min, max) {
+    if (min !== null && numeric < min) return min;
+    if (max !== null && numeric > max) return max;
+    return numeric;
+  }
+
+  function schemaFloat(value, fallback, min, max) {
+    const numeric = schemaNumber(value);
+    return numeric === null ? fallback : schemaClamp(numeric, min, max);
+  }
+
+  function schemaInt(value, fallback, min, max) {
+    const numeric = schemaNumber(value);
+    return numeric === null ? fallback : schemaClamp(Math.floor(numeric + 0.5), min, max);
+  }
+
+  function schemaFloor(value, fallback, min, max) {
+    const numeric = schemaNumber(value);
+    return numeric === null ? fallback : schemaClamp(Math.floor(numeric), min, max);
+  }
+
+  function schemaText(value, fallback) {
+    return typeof value === 'string' && value ? value : fallback;
+  }
+
+  function schemaToggle(value, fallback) {
+    if (typeof value === 'boolean') return value;
+    if (typeof value === 'string') return ['1', 'true', 'yes', 'on'].includes(value.trim().toLowerCase());
+    if (typeof value === 'number') return value !== 0;
+    return fallback;
+  }
+
+  function schemaFlag(value, fallback) {
+    return typeof value === 'boolean' ? value : fallback;
+  }
+
+  function schemaColor(value, fallback) {
+    const raw = typeof value === 'string' ? value.trim() : '';
+    return /^#[0-9a-fA-F]{6}$/.test(raw) ? raw : fallback;
+  }
+
+  function schemaFont(value, fallback) {
+    const raw = typeof value === 'string' ? value.trim() : '';
+    if (raw === 'varsity' || raw === 'block' || raw === 'classic') return raw;
+    return /^file:[a-zA-Z0-9_./ %\\-]+\.(ttf|otf|woff2?)$/i.test(raw) ? raw : fallback;
+  }
+
+  function schemaChoice(value, options, fallback) {
+    const raw = typeof value === 'string' ? value.trim() : '';
+    return options.includes(raw) ? raw : fallback;
+  }
+
   function sanitizeState(payload) {
+    const source = schemaObject(payload);
+    const team1 = schemaObject(source.team1);
+    const team2 = schemaObject(source.team2);
+    const scoreboard = schemaObject(source.scoreboard);
+    const scoreboardTeam1 = schemaObject(scoreboard.team1);
+    const scoreboardTeam2 = schemaObject(scoreboard.team2);
+    const valorantMapVeto = schemaObject(source.valorantMapVeto);
+    const valorantPickSides = schemaObject(source.valorantPickSides);
+    const valorantGameScore = schemaObject(source.valorantGameScore);
+    const valorantGameScorePick1 = schemaObject(valorantGameScore.pick1);
+    const valorantGameScorePick2 = schemaObject(valorantGameScore.pick2);
+    const valorantGameScorePick3 = schemaObject(valorantGameScore.pick3);
     return {
-      team1: { ban: payload?.team1?.ban || '' },
-      team2: { ban: payload?.team2?.ban || '' },
+      team1: {
+        ban: schemaText(team1.ban, '')
+      },
+      team2: {
+        ban: schemaText(team2.ban, '')
+      },
       scoreboard: {
         team1: {
-          name: payload?.scoreboard?.team1?.name || '',
-          nameUsePng: sanitizeNamePngToggle(payload?.scoreboard?.team1?.nameUsePng),
-          namePng: payload?.scoreboard?.team1?.namePng || '',
-          namePngScale: sanitizeNamePngScale(payload?.scoreboard?.team1?.namePngScale),
-          logo: payload?.scoreboard?.team1?.logo || '',
-          logoScale: sanitizeLogoScale(payload?.scoreboard?.team1?.logoScale),
-          score: sanitizeScore(payload?.scoreboard?.team1?.score),
-          nameColor: sanitizeNameColor(payload?.scoreboard?.team1?.nameColor),
-          bevelColor: sanitizeBevelColor(payload?.scoreboard?.team1?.bevelColor),
-          nameFont: sanitizeNameFont(payload?.scoreboard?.team1?.nameFont)
+          name: schemaText(scoreboardTeam1.name, ''),
+          nameUsePng: schemaToggle(scoreboardTeam1.nameUsePng, false),
+          namePng: schemaText(scoreboardTeam1.namePng, ''),
+          namePngScale: schemaInt(scoreboardTeam1.namePngScale, 0, -50, 50),
+          logo: schemaText(scoreboardTeam1.logo, ''),
+          logoScale: schemaInt(scoreboardTeam1.logoScale, 0, -50, 50),
+          score: schemaFloor(scoreboardTeam1.score, 0, 0, null),
+          nameColor: schemaColor(scoreboardTeam1.nameColor, '#e9eefc'),
+          bevelColor: schemaColor(scoreboardTeam1.bevelColor, '#7dd3fc'),
+          nameFont: schemaFont(scoreboardTeam1.nameFont, 'varsity')
         },
         team2: {
-          name: payload?.scoreboard?.team2?.name || '',
-          nameUsePng: sanitizeNamePngToggle(payload?.scoreboard?.team2?.nameUsePng),
-          namePng: payload?.scoreboard?.team2?.namePng || '',
-          namePngScale: sanitizeNamePngScale(payload?.scoreboard?.team2?.namePngScale),
-          logo: payload?.scoreboard?.team2?.logo || '',
-          logoScale: sanitizeLogoScale(payload?.scoreboard?.team2?.logoScale),
-          score: sanitizeScore(payload?.scoreboard?.team2?.score),
-          nameColor: sanitizeNameColor(payload?.scoreboard?.team2?.nameColor),
-          bevelColor: sanitizeBevelColor(payload?.scoreboard?.team2?.bevelColor),
-          nameFont: sanitizeNameFont(payload?.scoreboard?.team2?.nameFont)
+          name: schemaText(scoreboardTeam2.name, ''),
+          nameUsePng: schemaToggle(scoreboardTeam2.nameUsePng, false),
+          namePng: schemaText(scoreboardTeam2.namePng, ''),
+          namePngScale: schemaInt(scoreboardTeam2.namePngScale, 0, -50, 50),
+          logo: schemaText(scoreboardTeam2.logo, ''),
+          logoScale: schemaInt(scoreboardTeam2.logoScale, 0, -50, 50),
+          score: schemaFloor(scoreboardTeam2.score, 0, 0, null),
+          nameColor: schemaColor(scoreboardTeam2.nameColor, '#e9eefc'),
+          bevelColor: schemaColor(scoreboardTeam2.bevelColor, '#7dd3fc'),
+          nameFont: schemaFont(scoreboardTeam2.nameFont, 'varsity')
         }
       },
       valorantMapVeto: {
-        ban1: sanitizeValorantMapSelection(payload?.valorantMapVeto?.ban1),
-        ban2: sanitizeValorantMapSelection(payload?.valorantMapVeto?.ban2),
-        pick1: sanitizeValorantMapSelection(payload?.valorantMapVeto?.pick1),
-        pick2: sanitizeValorantMapSelection(payload?.valorantMapVeto?.pick2),
-        ban3: sanitizeValorantMapSelection(payload?.valorantMapVeto?.ban3),
-        ban4: sanitizeValorantMapSelection(payload?.valorantMapVeto?.ban4),
-        pick3: sanitizeValorantMapSelection(payload?.valorantMapVeto?.pick3)
+        ban1: sanitizeValorantMapSelection(valorantMapVeto.ban1),
+        ban2: sanitizeValorantMapSelection(valorantMapVeto.ban2),
+        pick1: sanitizeValorantMapSelection(valorantMapVeto.pick1),
+        pick2: sanitizeValorantMapSelection(valorantMapVeto.pick2),
+        ban3: sanitizeValorantMapSelection(valorantMapVeto.ban3),
+        ban4: sanitizeValorantMapSelection(valorantMapVeto.ban4),
+        pick3: sanitizeValorantMapSelection(valorantMapVeto.pick3)
       },
-      valorantMapPool: sanitizeValorantMapPool(payload?.valorantMapPool),
+      valorantMapPool: sanitizeValorantMapPool(source.valorantMapPool),
       valorantPickSides: {
-        pick1: sanitizeValorantPickSides(payload?.valorantPickSides?.pick1),
-        pick2: sanitizeValorantPickSides(payload?.valorantPickSides?.pick2),
-        pick3: sanitizeValorantPickSides(payload?.valorantPickSides?.pick3)
+        pick1: sanitizeValorantPickSides(valorantPickSides.pick1),
+        pick2: sanitizeValorantPickSides(valorantPickSides.pick2),
+        pick3: sanitizeValorantPickSides(valorantPickSides.pick3)
       },
       valorantGameScore: {
-        pick1: sanitizeValorantGameScore(payload?.valorantGameScore?.pick1),
-        pick2: sanitizeValorantGameScore(payload?.valorantGameScore?.pick2),
-        pick3: sanitizeValorantGameScore(payload?.valorantGameScore?.pick3)
+        pick1: {
+          winner: schemaChoice(valorantGameScorePick1.winner, ['team1', 'team2'], ''),
+          team1Score: schemaFloor(valorantGameScorePick1.team1Score, 0, 0, null),
+          team2Score: schemaFloor(valorantGameScorePick1.team2Score, 0, 0, null)
+        },
+        pick2: {
+          winner: schemaChoice(valorantGameScorePick2.winner, ['team1', 'team2'], ''),
+          team1Score: schemaFloor(valorantGameScorePick2.team1Score, 0, 0, null),
+          team2Score: schemaFloor(valorantGameScorePick2.team2Score, 0, 0, null)
+        },
+        pick3: {
+          winner: schemaChoice(valorantGameScorePick3.winner, ['team1', 'team2'], ''),
+          team1Score: schemaFloor(valorantGameScorePick3.team1Score, 0, 0, null),
+          team2Score: schemaFloor(valorantGameScorePick3.team2Score, 0, 0, null)
+        }
       },
-      logoParticle: sanitizeLogoParticleState(payload?.logoParticle),
-      updatedAt: Number(payload?.updatedAt) || Date.now()
+      logoParticle: sanitizeLogoParticleState(source.logoParticle),
+      updatedAt: Number(source.updatedAt) || Date.now()
     };
   }
 
+  function sanitizeLogoParticleState(payload) {
+    const source = schemaObject(payload);
+    const logoSources = schemaList(source.logoSources);
+    return {
+      density: schemaInt(source.density, 6, 3, 12),
+      size: schemaFloat(source.size, 2, 1, 5),
+      speed: schemaFloat(source.speed, 0.08, 0.03, 0.2),
+      depth: schemaFloat(source.depth, 0.55, 0, 1),
+      startAngle: schemaInt(source.startAngle, 10, 0, 359),
+      team1Reset: schemaFlag(source.team1Reset, true),
+      holdTime: schemaInt(source.holdTime, 6, 2, 15),
+      burstForce: schemaFloat(source.burstForce, 1, 0, 2),
+      cameraDistance: schemaInt(source.cameraDistance, 700, 420, 1100),
+      activeLogoIndex: schemaInt(source.activeLogoIndex, 0, 0, 1),
+      logoSources: [sanitizeParticleLogoSource(logoSources[0]), sanitizeParticleLogoSource(logoSources[1])],
+      command: sanitizeParticleCommand(source.command)
+    };
+  }
+  // END GENERATED STATE SANITIZER
+
   function setHeroes(data) {
     heroList = Array.isArray(data?.heroes) ? data.heroes : [];
     heroesByName = new Map(heroList.map((hero) => [normalize(hero.name), hero]));
@@ -378,8 +480,14 @@
       return;
     }
 
+    const bootstrapped = takeBootstrapPart('heroes');
+    if (Array.isArray(bootstrapped?.heroes) && bootstrapped.heroes.length) {
+      setHeroes(bootstrapped);
+      return;
+    }
+
     try {
-      const response = await fetch(HEROES_PATH, { cache: 'no-store' });
+      const response = await fetch(HEROES_PATH, { cache: 'no-cache' });
       if (!response.ok) {
         throw new Error(`Failed to load heroes.json (${response.status})`);
       }
@@ -415,9 +523,12 @@
 
   async function loadValorantMaps() {
     try {
-      const response = await fetch(VALORANT_MAPS_PATH, { cache: 'no-store' });
-      if (!response.ok) throw new Error(`Failed to load maps.json (${response.status})`);
-      const payload = await response.json();
+      let payload = takeBootstrapPart('maps');
+      if (!payload) {
+        const response = await fetch(VALORANT_MAPS_PATH, { cache: 'no-cache' });
+        if (!response.ok) throw new Error(`Failed to load maps.json (${response.status})`);
+        payload = await response.json();
+      }
       const maps = Array.isArray(payload?.maps) ? payload.maps.map(normalizeValorantMap).filter(Boolean) : [];
       valorantMaps = maps;
       valorantMapsByUuid = new Map(maps.map((map) => [map.uuid, map]));
@@ -457,6 +568,10 @@
     }
   }
 
+  function bridgeHasHeroBan(payload, teamId) {
+    return Boolean(payload?.[teamId] && typeof payload[teamId] === 'object');
+  }
+
   function bridgeHasScoreboard(payload) {
     return Boolean(
       payload?.scoreboard &&
@@ -496,28 +611,76 @@
     return Boolean(particle && typeof particle === 'object');
   }
 
-  async function readBridgeState() {
+  function parseBridgeState(payload) {
+    return {
+      state: sanitizeState(payload),
+      hasTeam1Ban: bridgeHasHeroBan(payload, 'team1'),
+      hasTeam2Ban: bridgeHasHeroBan(payload, 'team2'),
+      hasScoreboard: bridgeHasScoreboard(payload),
+      hasValorantMapVeto: bridgeHasValorantMapVeto(payload),
+      hasValorantMapPool: bridgeHasValorantMapPool(payload),
+      hasValorantPickSides: bridgeHasValorantPickSides(payload),
+      hasValorantGameScore: bridgeHasValorantGameScore(payload),
+      hasLogoParticle: bridgeHasLogoParticle(payload)
+    };
+  }
+
+  // Each section ('' is the whole document) keeps its own ETag, which is also
+  // the version the bridge last changed that section at.
+  function bridgeStateVersion(section = '') {
+    const version = Number(String(bridgeStateCache.get(section)?.etag || '').replace(/"/g, ''));
+    return Number.isFinite(version) && version > 0 ? version : null;
+  }
+
+  async function readBridgeState(options = {}) {
+    const section = options.section || '';
+    const cached = bridgeStateCache.get(section);
     try {
-      const response = await fetch(BRIDGE_STATE_URL, { cache: 'no-store' });
+      const headers = cached?.etag ? { 'If-None-Match': cached.etag } : {};
+      const baseUrl = section ? `${BRIDGE_STATE_URL}/${section}` : BRIDGE_STATE_URL;
+      const url = options.since ? `${baseUrl}?since=${options.since}&timeout=${LONG_POLL_TIMEOUT_S}` : baseUrl;
+      const response = await fetch(url, { cache: 'no-store', headers, signal: options.signal });
+      if (response.status === 304 && cached?.parsed) return cached.parsed;
+      // Bridges from before per-section routes only serve the whole document.
+      if (response.status === 404 && section) return readBridgeState({ ...options, section: '', since: null });
+      // A bridge whose stream workers are all taken refuses long-polls; read
+      // the state without waiting instead, and let the caller's poll interval pace us.
+      if (response.status === 503 && options.since) return readBridgeState({ ...options, since: null });
       if (!response.ok) return null;
-      const payload = await response.json();
-      return {
-        state: sanitizeState(payload),
-        hasScoreboard: bridgeHasScoreboard(payload),
-        hasValorantMapVeto: bridgeHasValorantMapVeto(payload),
-        hasValorantMapPool: bridgeHasValorantMapPool(payload),
-        hasValorantPickSides: bridgeHasValorantPickSides(payload),
-        hasValorantGameScore: bridgeHasValorantGameScore(payload),
-        hasLogoParticle: bridgeHasLogoParticle(payload)
-      };
+      const parsed = parseBridgeState(await response.json());
+      bridgeStateCache.set(section, { etag: response.headers.get('ETag') || '', parsed });
+      return parsed;
     } catch {
       return null;
     }
   }
 
-  async function readSharedState() {
-    const localState = readLocalState();
-    const bridgePayload = await readBridgeState();
+  // Pages the bridge renders (/overlay/...) embed the state section they were
+  // painted from. Seeding the cache with it makes the first poll wait for the
+  // next change instead of fetching the same state again.
+  function readInitialState(section) {
+    const node = document.getElementById('bridge-initial-state');
+    if (!node || node.dataset.section !== section) return null;
+    try {
+      const parsed = parseBridgeState(JSON.parse(node.textContent));
+      bridgeStateCache.set(section, { etag: `"${node.dataset.version}"`, parsed });
+      return parsed;
+    } catch {
+      return null;
+    }
+  }
+
+  async function readSharedState(section = '') {
+    const bootstrapped = section ? null : takeBootstrapPart('state');
+    if (bootstrapped) {
+      const parsed = parseBridgeState(bootstrapped.document);
+      bridgeStateCache.set('', { etag: `"${bootstrapped.version}"`, parsed });
+      return mergeBridgeState(readLocalState(), parsed);
+    }
+    return mergeBridgeState(readLocalState(), await readBridgeState({ section }));
+  }
+
+  function mergeBridgeState(localState, bridgePayload) {
     if (!bridgePayload) return localState;
 
     const bridgeState = bridgePayload.state;
@@ -525,6 +688,8 @@
     return sanitizeState({
       ...localState,
       ...bridgeState,
+      team1: bridgePayload.hasTeam1Ban ? bridgeState.team1 : localState.team1,
+      team2: bridgePayload.hasTeam2Ban ? bridgeState.team2 : localState.team2,
       scoreboard: bridgePayload.hasScoreboard ? bridgeState.scoreboard : localState.scoreboard,
       valorantMapVeto: bridgePayload.hasValorantMapVeto ? bridgeState.valorantMapVeto : localState.valorantMapVeto,
       valorantMapPool: bridgePayload.hasValorantMapPool ? bridgeState.valorantMapPool : localState.valorantMapPool,
@@ -535,18 +700,208 @@
     });
   }
 
-  function writeState(nextState) {
-    const payload = sanitizeState({ ...nextState, updatedAt: Date.now() });
+  const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  // Push state to an overlay as soon as the bridge commits it. The /api/events
+  // stream is preferred; while it is down, overlays long-poll /api/state?since=
+  // and only fall back to the plain OVERLAY_POLL_MS cadence when the bridge
+  // answers immediately (bridge missing, or an older bridge without long-poll).
+  // With a section, only that slice is transferred and the overlay is only woken
+  // when the slice itself changes. `onSignal` receives the section's one-shot
+  // triggers (see sendBridgeSignal); they only travel on the event stream.
+  // On a server-rendered page, `onState` first gets the embedded state with
+  // `prerendered` set: the page already shows it, so only bookkeeping is due.
+  function watchSharedState(onState, section = '', onSignal = null) {
+    let streamOpen = false;
+    let fallbackRunning = false;
+    let fallbackAbort = null;
+
+    const initial = readInitialState(section);
+    if (initial) onState(mergeBridgeState(readLocalState(), initial), true);
+
+    const poll = async () => {
+      onState(await readSharedState(section));
+    };
 
-    localStorage.setItem(STATE_KEY, JSON.stringify(payload));
+    const runFallback = async () => {
+      if (fallbackRunning) return;
+      fallbackRunning = true;
+      while (!streamOpen) {
+        const startedAt = Date.now();
+        const previousEtag = bridgeStateCache.get(section)?.etag;
+        fallbackAbort = typeof AbortController === 'function' ? new AbortController() : null;
+        const bridgePayload = await readBridgeState({ section, since: bridgeStateVersion(section), signal: fallbackAbort?.signal });
+        fallbackAbort = null;
+        if (streamOpen) break;
+        onState(mergeBridgeState(readLocalState(), bridgePayload));
+        const currentEtag = bridgeStateCache.get(section)?.etag;
+        const advanced = Boolean(bridgePayload && currentEtag && currentEtag !== previousEtag);
+        const elapsed = Date.now() - startedAt;
+        if (!advanced && elapsed < OVERLAY_POLL_MS) await sleep(OVERLAY_POLL_MS - elapsed);
+      }
+      fallbackRunning = false;
+    };
+
+    const stopFallback = () => {
+      streamOpen = true;
+      if (fallbackAbort) fallbackAbort.abort();
+    };
+
+    // The fallback long-poll only starts once the stream fails: run beside a
+    // connecting stream it would hold a second stream worker for nothing.
+    if (typeof EventSource === 'function') {
+      const source = new EventSource(section ? `${BRIDGE_EVENTS_URL}/${section}` : BRIDGE_EVENTS_URL);
+      source.addEventListener('open', stopFallback);
+      source.addEventListener('state', (event) => {
+        stopFallback();
+        try {
+          const parsed = parseBridgeState(JSON.parse(event.data));
+          bridgeStateCache.set(section, { etag: event.lastEventId ? `"${event.lastEventId}"` : '', parsed });
+          onState(mergeBridgeState(readLocalState(), parsed));
+        } catch {
+          poll();
+        }
+      });
+      source.addEventListener('error', () => {
+        streamOpen = false;
+        runFallback();
+      });
+      if (onSignal) {
+        source.addEventListener('signal', (event) => {
+          try {
+            onSignal(JSON.parse(event.data));
+          } catch {
+            // A malformed trigger is dropped like an expired one.
+          }
+        });
+      }
+    } else {
+      runFallback();
+    }
 
-    fetch(BRIDGE_STATE_URL, {
+    window.addEventListener('storage', (event) => {
+      if (event.key === STATE_KEY) poll();
+    });
+  }
+
+  function postBridgeState(payload) {
+    return fetch(BRIDGE_STATE_URL, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(payload)
     }).catch(() => {
       // GUI bridge is optional; keep localStorage as the baseline transport.
     });
+  }
+
+  function postBridgeCommands(commands) {
+    return fetch(BRIDGE_COMMANDS_URL, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(commands)
+    }).catch(() => {
+      // GUI bridge is optional; keep localStorage as the baseline transport.
+    });
+  }
+
+  // Fire a one-shot trigger (SIGNAL_TYPES in gui_tool.py) at the overlays
+  // watching `topic`. Signals never touch the state, so they cost no version,
+  // no disk write and no state re-render. Resolves false when no bridge took
+  // it, so the caller can fall back to a state write.
+  async function sendBridgeSignal(topic, name) {
+    if (controllerSocket?.readyState === WebSocket.OPEN) {
+      controllerSocket.send(JSON.stringify({ type: 'signal', topic, name }));
+      return true;
+    }
+    try {
+      const response = await fetch(BRIDGE_SIGNALS_URL, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ topic, name })
+      });
+      return response.ok;
+    } catch {
+      return false;
+    }
+  }
+
+  // Controller writes and change notifications share one /api/ws connection.
+  // Each write carries a sequence number the bridge acks with the committed
+  // version; while writes are unacked, pushed states are ignored because our
+  // own full-state write supersedes them. Command batches are the exception:
+  // the bridge computes their result, so it pushes it back after the ack.
+  function connectControllerSocket(onRemoteState) {
+    if (typeof WebSocket !== 'function') return;
+
+    let socket;
+    try {
+      socket = new WebSocket(BRIDGE_WS_URL);
+    } catch {
+      return;
+    }
+
+    socket.addEventListener('open', () => {
+      controllerSocket = socket;
+    });
+
+    socket.addEventListener('message', (event) => {
+      let message;
+      try {
+        message = JSON.parse(event.data);
+      } catch {
+        return;
+      }
+
+      if (message?.type === 'ack') {
+        const write = controllerSocketPending.get(message.seq);
+        controllerSocketPending.delete(message.seq);
+        if (!write?.commands) {
+          controllerSocketAckedVersion = Math.max(controllerSocketAckedVersion, Number(message.version) || 0);
+        }
+      } else if (message?.type === 'state') {
+        if (controllerSocketPending.size) return;
+        if ((Number(message.version) || 0) <= controllerSocketAckedVersion) return;
+        onRemoteState(mergeBridgeState(readLocalState(), parseBridgeState(message.state)));
+      }
+    });
+
+    socket.addEventListener('close', () => {
+      if (controllerSocket === socket) controllerSocket = null;
+      // Resend the unacked writes over HTTP so no edit is lost, each the way it
+      // was sent: commands as commands, so they still merge with other
+      // producers' edits. A full-document write supersedes the writes before it.
+      const unacked = Array.from(controllerSocketPending.values());
+      controllerSocketPending.clear();
+      let lastSet = -1;
+      unacked.forEach((write, index) => {
+        if (!write.commands) lastSet = index;
+      });
+      const commands = unacked.slice(lastSet + 1).flatMap((write) => write.commands);
+      const resent = lastSet >= 0 ? postBridgeState(unacked[lastSet].payload) : Promise.resolve();
+      if (commands.length) resent.then(() => postBridgeCommands(commands));
+      setTimeout(() => connectControllerSocket(onRemoteState), CONTROLLER_SOCKET_RETRY_MS);
+    });
+  }
+
+  // `commands` (see STATE_COMMANDS in gui_tool.py) describe the edit to the
+  // bridge in a few bytes and merge with concurrent edits from other producers;
+  // without them the whole document is sent. localStorage always gets it all.
+  function writeState(nextState, commands = null) {
+    const payload = sanitizeState({ ...nextState, updatedAt: Date.now() });
+
+    localStorage.setItem(STATE_KEY, JSON.stringify(payload));
+
+    if (controllerSocket?.readyState === WebSocket.OPEN) {
+      controllerSocketSeq += 1;
+      controllerSocketPending.set(controllerSocketSeq, { payload, commands });
+      controllerSocket.send(JSON.stringify(commands
+        ? { type: 'commands', seq: controllerSocketSeq, commands }
+        : { type: 'set', seq: controllerSocketSeq, state: payload }));
+    } else if (commands) {
+      postBridgeCommands(commands);
+    } else {
+      postBridgeState(payload);
+    }
 
     return payload;
   }
@@ -739,13 +1094,13 @@
       };
     };
 
-    const applyState = async () => {
+    const applyState = (state, prerendered = false) => {
       const queryHero = getQueryHero();
-      const state = await readSharedState();
       const selectedName = (queryHero || state?.[teamId]?.ban || '').trim();
-      const signature = `${selectedName}:${state.updatedAt}`;
+      const signature = selectedName;
       if (signature === lastSignature) return;
       lastSignature = signature;
+      if (prerendered) return;
 
       if (fadeTimer) {
         clearTimeout(fadeTimer);
@@ -759,12 +1114,7 @@
       }, FADE_TRANSITION_MS);
     };
 
-    applyState();
-
-    window.addEventListener('storage', (event) => {
-      if (event.key === STATE_KEY) applyState();
-    });
-    setInterval(applyState, OVERLAY_POLL_MS);
+    watchSharedState(applyState, `heroBans/${teamId}`);
   }
 
   function renderScoreboardOverlay() {
@@ -816,7 +1166,7 @@
           imageNode.style.width = `${sizePercent}%`;
           imageNode.style.height = `${sizePercent}%`;
           if (usePng) {
-            imageNode.src = scoreboardTeam.namePng;
+            imageNode.src = resolveAssetUrl(scoreboardTeam.namePng);
             imageNode.style.display = 'block';
           } else {
             imageNode.removeAttribute('src');
@@ -831,7 +1181,7 @@
         valueNode.style.height = `${logoSizePercent}%`;
 
         if (scoreboardTeam.logo) {
-          valueNode.src = scoreboardTeam.logo;
+          valueNode.src = resolveAssetUrl(scoreboardTeam.logo);
           valueNode.style.display = 'block';
         } else {
           valueNode.removeAttribute('src');
@@ -842,20 +1192,16 @@
       }
     };
 
-    const applyState = async () => {
-      const state = await readSharedState();
+    const applyState = async (state, prerendered = false) => {
       const scoreboardTeam = state?.scoreboard?.[team] || { name: '', nameUsePng: false, namePng: '', namePngScale: 0, logo: '', logoScale: 0, score: 0, nameColor: '#e9eefc', bevelColor: '#7dd3fc', nameFont: 'varsity' };
-      const signature = `${scoreboardTeam.name}|${scoreboardTeam.nameUsePng}|${scoreboardTeam.namePng}|${scoreboardTeam.namePngScale}|${scoreboardTeam.logo}|${scoreboardTeam.logoScale}|${scoreboardTeam.score}|${scoreboardTeam.nameColor}|${scoreboardTeam.bevelColor}|${scoreboardTeam.nameFont}|${state.updatedAt}`;
+      const signature = `${scoreboardTeam.name}|${scoreboardTeam.nameUsePng}|${scoreboardTeam.namePng}|${scoreboardTeam.namePngScale}|${scoreboardTeam.logo}|${scoreboardTeam.logoScale}|${scoreboardTeam.score}|${scoreboardTeam.nameColor}|${scoreboardTeam.bevelColor}|${scoreboardTeam.nameFont}`;
       if (signature === lastSignature) return;
       lastSignature = signature;
+      if (prerendered) return;
       await paint(scoreboardTeam);
     };
 
-    applyState();
-    window.addEventListener('storage', (event) => {
-      if (event.key === STATE_KEY) applyState();
-    });
-    setInterval(applyState, OVERLAY_POLL_MS);
+    watchSharedState(applyState, `scoreboard/${team}`);
   }
 
   function initTabs() {
@@ -1026,21 +1372,22 @@
 
     if (!controls.team1.score || !controls.team2.score || !controls.team1.minus || !controls.team1.plus || !controls.team2.minus || !controls.team2.plus) return;
 
-    const persistScore = (teamId, nextScore) => {
+    const persistScore = (teamId, nextScore, command) => {
       pendingState.scoreboard[teamId].score = sanitizeScore(nextScore);
       syncInputs();
-      writeState(pendingState);
+      writeState(pendingState, [command]);
     };
 
     ['team1', 'team2'].forEach((teamId) => {
       controls[teamId].score.addEventListener('input', (event) => {
-        persistScore(teamId, event.target.value);
+        const value = sanitizeScore(event.target.value);
+        persistScore(teamId, value, { op: 'score.set', team: teamId, value });
       });
       controls[teamId].minus.addEventListener('click', () => {
-        persistScore(teamId, sanitizeScore(pendingState.scoreboard[teamId].score) - 1);
+        persistScore(teamId, sanitizeScore(pendingState.scoreboard[teamId].score) - 1, { op: 'score.increment', team: teamId, by: -1 });
       });
       controls[teamId].plus.addEventListener('click', () => {
-        persistScore(teamId, sanitizeScore(pendingState.scoreboard[teamId].score) + 1);
+        persistScore(teamId, sanitizeScore(pendingState.scoreboard[teamId].score) + 1, { op: 'score.increment', team: teamId, by: 1 });
       });
     });
   }
@@ -1237,9 +1584,10 @@
 
     VETO_FIELD_IDS.forEach((fieldId) => {
       fields[fieldId].addEventListener('change', (event) => {
-        pendingState.valorantMapVeto[fieldId] = sanitizeValorantMapSelection(event.target.value);
+        const map = sanitizeValorantMapSelection(event.target.value);
+        pendingState.valorantMapVeto[fieldId] = map;
         syncInputs();
-        writeState(pendingState);
+        writeState(pendingState, [{ op: 'veto.set', slot: fieldId, map }]);
       });
     });
 
@@ -1254,7 +1602,7 @@
           : { attackers: cleanTeam, defenders: cleanTeam === 'team1' ? 'team2' : 'team1' };
         pendingState.valorantPickSides[pickId] = nextSides;
         syncInputs();
-        writeState(pendingState);
+        writeState(pendingState, [{ op: 'sides.set', pick: pickId, defenders: nextSides.defenders }]);
       };
 
       ['change', 'input'].forEach((eventName) => {
@@ -1272,21 +1620,19 @@
       if (!fieldsForPick?.winner || !fieldsForPick?.team1Score || !fieldsForPick?.team2Score) return;
 
       fieldsForPick.winner.addEventListener('change', (event) => {
-        pendingState.valorantGameScore[pickId].winner = sanitizeValorantWinner(event.target.value);
+        const winner = sanitizeValorantWinner(event.target.value);
+        pendingState.valorantGameScore[pickId].winner = winner;
         syncInputs();
-        writeState(pendingState);
+        writeState(pendingState, [{ op: 'gameScore.set', pick: pickId, winner }]);
       });
 
-      fieldsForPick.team1Score.addEventListener('input', (event) => {
-        pendingState.valorantGameScore[pickId].team1Score = sanitizeScore(event.target.value);
-        syncInputs();
-        writeState(pendingState);
-      });
-
-      fieldsForPick.team2Score.addEventListener('input', (event) => {
-        pendingState.valorantGameScore[pickId].team2Score = sanitizeScore(event.target.value);
-        syncInputs();
-        writeState(pendingState);
+      ['team1Score', 'team2Score'].forEach((scoreKey) => {
+        fieldsForPick[scoreKey].addEventListener('input', (event) => {
+          const score = sanitizeScore(event.target.value);
+          pendingState.valorantGameScore[pickId][scoreKey] = score;
+          syncInputs();
+          writeState(pendingState, [{ op: 'gameScore.set', pick: pickId, [scoreKey]: score }]);
+        });
       });
     });
 
@@ -1387,25 +1733,47 @@
     [fields.density, fields.size, fields.speed, fields.depth, fields.burstForce, fields.cameraDistance, fields.startAngle, fields.holdTime].forEach(bindRange);
     fields.team1Reset.addEventListener('change', () => mutateParticle());
 
-    fields.startSequence.addEventListener('click', () => mutateParticle('start-sequence'));
-    fields.burst.addEventListener('click', () => mutateParticle('burst'));
+    // Without a bridge, triggers ride in the state as a nonce'd command that
+    // localStorage carries to overlays in the same browser profile.
+    const triggerParticle = async (name) => {
+      if (!(await sendBridgeSignal('logoParticle', name))) mutateParticle(name);
+    };
+
+    fields.startSequence.addEventListener('click', () => triggerParticle('start-sequence'));
+    fields.burst.addEventListener('click', () => triggerParticle('burst'));
     fields.reset.addEventListener('click', () => {
       pendingState.logoParticle = defaultLogoParticleState();
       syncInputs();
       writeState(pendingState);
     });
 
+    const uploadBlob = async (file) => {
+      try {
+        const response = await fetch(BRIDGE_BLOBS_URL, {
+          method: 'POST',
+          headers: { 'Content-Type': file.type || 'application/octet-stream' },
+          body: file
+        });
+        if (!response.ok) return '';
+        const result = await response.json();
+        return sanitizeParticleLogoSource(result?.ref);
+      } catch {
+        return '';
+      }
+    };
+
     const handleUpload = async (file, index) => {
       if (!file) return;
       try {
-        const src = sanitizeParticleLogoSource(await toDataUrl(file));
+        // Without a bridge the logo has to live inline in local state.
+        const src = (await uploadBlob(file)) || sanitizeParticleLogoSource(await toDataUrl(file));
         const next = sanitizeLogoParticleState(pendingState.logoParticle);
         const logos = Array.isArray(next.logoSources) ? [...next.logoSources] : ['', ''];
         logos[index] = src;
         next.logoSources = logos;
         next.activeLogoIndex = index;
-        const nonce = Number(next?.command?.nonce) || 0;
-        next.command = { type: 'start-sequence', nonce: nonce + 1, ts: Date.now() };
+        // The overlay restarts its sequence on every particle change, so the
+        // new logo needs no separate start-sequence trigger.
         pendingState.logoParticle = sanitizeLogoParticleState(next);
         syncInputs();
         writeState(pendingState);
@@ -1592,9 +1960,11 @@
 
     const loadImage = (url) => new Promise((resolve, reject) => {
       const image = new Image();
+      // Bridge-hosted blobs are cross-origin for file:// overlays; CORS keeps the canvas readable.
+      if (BLOB_REF_PATTERN.test(url)) image.crossOrigin = 'anonymous';
       image.onload = () => resolve(image);
       image.onerror = reject;
-      image.src = url;
+      image.src = resolveAssetUrl(url);
     });
 
     const applyParticleState = async (state) => {
@@ -1610,7 +1980,7 @@
       settings.cameraDistance = config.cameraDistance;
       activeLogoIndex = config.activeLogoIndex;
 
-      if (JSON.stringify(config.logoSources) !== JSON.stringify(logoSources)) {
+      if (logoSourcesChanged(config.logoSources)) {
         logoSources = config.logoSources;
         logos = [null, null];
         for (let i = 0; i < 2; i += 1) {
@@ -1632,14 +2002,25 @@
       if (command.type === 'start-sequence') startSequence();
     };
 
-    const applyState = async () => {
-      const state = await readSharedState();
-      const signature = JSON.stringify(state?.logoParticle || {});
-      if (!signature || signature === lastSignature) return;
+    // Logo sources can be multi-megabyte data URLs, so they are compared by
+    // entry instead of being re-serialized into the signature on every update.
+    const logoSourcesChanged = (next) => !Array.isArray(next)
+      || next.length !== logoSources.length
+      || next.some((source, index) => source !== logoSources[index]);
+
+    const applyState = async (state) => {
+      const { logoSources: nextSources, ...rest } = state?.logoParticle || {};
+      const signature = JSON.stringify(rest);
+      if (signature === lastSignature && !logoSourcesChanged(nextSources)) return;
       lastSignature = signature;
       await applyParticleState(state);
     };
 
+    const applySignal = (signal) => {
+      if (signal?.name === 'burst') burst();
+      if (signal?.name === 'start-sequence') startSequence();
+    };
+
     let lastTs = 0;
     const animate = (ts) => {
       const dt = Math.min((ts - lastTs) / 1000, 0.032);
@@ -1656,13 +2037,9 @@
       resizeCanvas();
       if (logos[activeLogoIndex]) makeTargetsFromImage(logos[activeLogoIndex]);
     });
-    window.addEventListener('storage', (event) => {
-      if (event.key === STATE_KEY) applyState();
-    });
 
     resizeCanvas();
-    applyState();
-    setInterval(applyState, OVERLAY_POLL_MS);
+    watchSharedState(applyState, 'logoParticle', applySignal);
     requestAnimationFrame(animate);
   }
 
@@ -1679,7 +2056,7 @@
       if (!node) return;
       const hasLogo = Boolean((logoPath || '').trim());
       node.classList.toggle('is-empty', !hasLogo);
-      node.style.backgroundImage = hasLogo ? `url("${logoPath}")` : 'none';
+      node.style.backgroundImage = hasLogo ? `url("${resolveAssetUrl(logoPath)}")` : 'none';
     };
 
     const applyBackground = (node, type, imageUrls) => {
@@ -1762,12 +2139,11 @@
       });
     };
 
-    const applyState = async () => {
-      const state = await readSharedState();
+    const applyState = (state) => {
       const vetoState = state?.valorantMapVeto || defaultState().valorantMapVeto;
       const sideState = state?.valorantPickSides || {};
       const gameScoreState = state?.valorantGameScore || {};
-      const signature = `${vetoState.ban1}|${vetoState.ban2}|${vetoState.pick1}|${vetoState.pick2}|${vetoState.ban3}|${vetoState.ban4}|${vetoState.pick3}|${JSON.stringify(sideState)}|${JSON.stringify(gameScoreState)}|${state?.scoreboard?.team1?.logo || ''}|${state?.scoreboard?.team2?.logo || ''}|${state.updatedAt}`;
+      const signature = `${vetoState.ban1}|${vetoState.ban2}|${vetoState.pick1}|${vetoState.pick2}|${vetoState.ban3}|${vetoState.ban4}|${vetoState.pick3}|${JSON.stringify(sideState)}|${JSON.stringify(gameScoreState)}|${state?.scoreboard?.team1?.logo || ''}|${state?.scoreboard?.team2?.logo || ''}`;
       if (signature === lastSignature) return;
       lastSignature = signature;
       preloadSelected(vetoState);
@@ -1778,11 +2154,7 @@
       document.body.classList.add('animate-in');
     }, 500);
 
-    applyState();
-    window.addEventListener('storage', (event) => {
-      if (event.key === STATE_KEY) applyState();
-    });
-    setInterval(applyState, OVERLAY_POLL_MS);
+    watchSharedState(applyState, 'valorantMapVeto');
   }
 
   async function initControlPage() {
@@ -1882,7 +2254,10 @@
         pendingState.team1.ban = pendingState.team2.ban;
         pendingState.team2.ban = team1Ban;
         syncInputs();
-        writeState(pendingState);
+        writeState(pendingState, [
+          { op: 'ban.set', team: 'team1', hero: pendingState.team1.ban },
+          { op: 'ban.set', team: 'team2', hero: pendingState.team2.ban }
+        ]);
       });
     }
 
@@ -1949,9 +2324,7 @@
 
     syncInputs();
 
-    window.addEventListener('storage', (event) => {
-      if (event.key !== STATE_KEY) return;
-      const next = readLocalState();
+    const applyRemoteState = (next) => {
       pendingState.team1.ban = next.team1.ban;
       pendingState.team2.ban = next.team2.ban;
       pendingState.scoreboard.team1 = { ...next.scoreboard.team1 };
@@ -1970,31 +2343,80 @@
       };
       pendingState.logoParticle = sanitizeLogoParticleState(next?.logoParticle);
       syncInputs();
+    };
+
+    // Undo/redo walk the bridge's history ring; the bridge commits the earlier
+    // state as a new version, which reaches the overlays like any other write.
+    const stepHistory = async (url) => {
+      try {
+        const response = await fetch(url, { method: 'POST', cache: 'no-store' });
+        if (!response.ok) return;
+        const next = mergeBridgeState(readLocalState(), parseBridgeState(await response.json()));
+        localStorage.setItem(STATE_KEY, JSON.stringify(next));
+        applyRemoteState(next);
+      } catch {
+        // Without the bridge there is no history to walk.
+      }
+    };
+    document.getElementById('undo-state')?.addEventListener('click', () => stepHistory(BRIDGE_UNDO_URL));
+    document.getElementById('redo-state')?.addEventListener('click', () => stepHistory(BRIDGE_REDO_URL));
+
+    window.addEventListener('storage', (event) => {
+      if (event.key !== STATE_KEY) return;
+      applyRemoteState(readLocalState());
     });
+    connectControllerSocket(applyRemoteState);
   }
 
-  async function init() {
+  // One entry per kind of page, each loading only the catalogs it renders.
+  // scripts/build_assets.py bundles every entry into its own chunk holding
+  // just the code it reaches; unbuilt pages run them all through init().
+  async function initControllerEntry() {
+    await loadBridgeBootstrap();
     await Promise.all([loadHeroes(), loadValorantMaps()]);
+    initControlPage();
+  }
+
+  async function initHeroCardEntry() {
+    const teamId = document.querySelector('[data-overlay-team]')?.dataset.overlayTeam;
+    if (!teamId) return;
+    await loadHeroes();
+    renderOverlay(teamId);
+  }
+
+  function initScoreboardEntry() {
+    renderScoreboardOverlay();
+  }
+
+  async function initValorantVetoEntry() {
+    await loadValorantMaps();
+    renderValorantMapVetoOverlay();
+  }
 
+  function initParticleEntry() {
+    renderLogoParticleOverlay();
+  }
+
+  function init() {
     if (document.body.classList.contains('control-page')) {
-      initControlPage();
+      initControllerEntry();
     }
 
     if (document.body.classList.contains('overlay-page')) {
-      const stage = document.querySelector('[data-overlay-team]');
-      const teamId = stage?.dataset.overlayTeam;
-      if (teamId) renderOverlay(teamId);
+      if (document.querySelector('[data-overlay-team]')) {
+        initHeroCardEntry();
+      }
 
       if (document.querySelector('[data-scoreboard-role]')) {
-        renderScoreboardOverlay();
+        initScoreboardEntry();
       }
 
       if (document.querySelector('[data-valorant-map-veto-overlay]')) {
-        renderValorantMapVetoOverlay();
+        initValorantVetoEntry();
       }
 
       if (document.querySelector('[data-logo-particle-overlay]')) {
-        renderLogoParticleOverlay();
+        initParticleEntry();
       }
     }
   }
@@ -0,0 +1,195 @@
+"""Load-test a running bridge so the threaded and asyncio engines can be compared.
+
+Start a bridge with the engine under test (``python gui_tool.py --engine asyncio``
+or the OBS script's "Bridge server engine" setting), then run for example:
+
+    python scripts/bench_bridge.py --clients 24 --requests 200 /api/state /js/app.js
+
+Every client thread reuses one ``http.client`` connection, so keep-alive is used
+whenever the engine offers it and a new TCP connection is opened otherwise.
+
+``--streams 40`` instead checks how the bridge behaves with more open event
+streams than it has stream workers: every stream must get an answer (``200``
+or ``503`` with ``Retry-After``), and a long-poll and a plain state read made
+while they are all held open must answer too. It exits non-zero otherwise.
+
+``--history`` checks that the match history writer outlives a change SQLite
+cannot store as is: it raises a score of the ``bench-history`` match past the
+64-bit range, bans a hero after it, and expects ``GET /api/stats`` to drain
+its queue and log the ban. It exits non-zero otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+
+def _run_client(host: str, port: int, paths: list[str], requests: int, latencies: list[float], errors: list[str], connections: list[int]) -> None:
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    opened = 0
+    for index in range(requests):
+        path = paths[index % len(paths)]
+        started = time.perf_counter()
+        try:
+            if connection.sock is None:
+                opened += 1
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(f"{path}: HTTP {response.status}")
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(f"{path}: {exc}")
+            connection.close()
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    connections.append(opened)
+
+
+def _open_stream(host: str, port: int, path: str, timeout: float) -> tuple[socket.socket | None, str]:
+    """Open ``path`` as an event stream and return the socket with the status line it got."""
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode("latin-1"))
+        head = b""
+        while b"\r\n\r\n" not in head:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            head += chunk
+    except OSError as exc:
+        return None, f"no response ({exc})"
+    lines = head.decode("latin-1").split("\r\n")
+    retry_after = next((line.split(":", 1)[1].strip() for line in lines if line.lower().startswith("retry-after:")), "")
+    return sock, lines[0] + (f" (Retry-After {retry_after})" if retry_after else "")
+
+
+def _check_saturation(host: str, port: int, streams: int, timeout: float) -> bool:
+    opened = [_open_stream(host, port, "/api/events", timeout) for _ in range(streams)]
+    statuses: dict[str, int] = {}
+    for _sock, status in opened:
+        statuses[status] = statuses.get(status, 0) + 1
+    for status, count in sorted(statuses.items()):
+        print(f"{count:4d} x {status}")
+    healthy = all(status.startswith(("HTTP/1.1 200", "HTTP/1.0 200", "HTTP/1.1 503", "HTTP/1.0 503")) for _sock, status in opened)
+
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        connection.request("GET", "/api/state")
+        response = connection.getresponse()
+        version = json.loads(response.read()).get("version", 0)
+        print(f"plain read while saturated: HTTP {response.status}")
+        healthy = healthy and response.status == 200
+        connection.request("GET", f"/api/state?since={version}&timeout=1")
+        response = connection.getresponse()
+        response.read()
+        print(f"long-poll while saturated: HTTP {response.status} {response.getheader('Retry-After') or ''}".rstrip())
+        healthy = healthy and response.status in (200, 304, 503)
+    except (OSError, ValueError, http.client.HTTPException) as exc:
+        print(f"state read while saturated failed: {exc}")
+        healthy = False
+    finally:
+        connection.close()
+        for sock, _status in opened:
+            if sock is not None:
+                sock.close()
+    print("ok" if healthy else "FAILED: some requests got no answer")
+    return healthy
+
+
+def _request_json(connection: http.client.HTTPConnection, method: str, path: str, body: Any = None) -> tuple[int, Any]:
+    payload = json.dumps(body).encode("utf-8") if body is not None else None
+    connection.request(method, path, body=payload, headers={"Content-Type": "application/json"} if payload else {})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read() or b"null")
+
+
+def _check_history(host: str, port: int, timeout: float) -> bool:
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        status, before = _request_json(connection, "GET", "/api/stats")
+        if status != 200:
+            print(f"match history unavailable: HTTP {status} {before}")
+            return False
+        commands = [
+            {"op": "score.increment", "team": "team1", "by": 2**64},
+            {"op": "ban.set", "team": "team1", "hero": f"bench-{time.time_ns()}"},
+        ]
+        for command in commands:
+            status, reply = _request_json(connection, "POST", "/api/matches/bench-history/commands", [command])
+            if status != 200:
+                print(f"{command['op']} failed: HTTP {status} {reply}")
+                return False
+        deadline = time.monotonic() + timeout
+        while True:
+            _status, after = _request_json(connection, "GET", "/api/stats")
+            if after["pending"] == 0 and after["rows"].get("hero_bans", 0) > before["rows"].get("hero_bans", 0):
+                break
+            if time.monotonic() > deadline:
+                print(f"history writer stalled: {after['pending']} pending, last error {after.get('lastError')}")
+                return False
+            time.sleep(0.1)
+    except (OSError, ValueError, KeyError, http.client.HTTPException) as exc:
+        print(f"history check failed: {exc}")
+        return False
+    finally:
+        connection.close()
+    print(f"history writer alive: {after['rows']['hero_bans']} bans logged, {after['errors']} skipped changes")
+    print("ok")
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=["/api/state"], help="request paths, cycled per client (default: /api/state)")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="bridge base URL")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--streams", type=int, default=0, help="instead of the load test, hold this many /api/events streams open and check every request is answered")
+    parser.add_argument("--history", action="store_true", help="instead of the load test, check the match history writer survives an out-of-range score")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds to wait for each answer in --streams and --history mode")
+    args = parser.parse_args()
+
+    target = urlparse(args.url)
+    host, port = target.hostname or "127.0.0.1", target.port or 80
+    if args.streams:
+        sys.exit(0 if _check_saturation(host, port, args.streams, args.timeout) else 1)
+    if args.history:
+        sys.exit(0 if _check_history(host, port, args.timeout) else 1)
+    latencies: list[float] = []
+    errors: list[str] = []
+    connections: list[int] = []
+    threads = [
+        threading.Thread(target=_run_client, args=(host, port, args.paths, args.requests, latencies, errors, connections))
+        for _ in range(args.clients)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(latencies)} ok, {len(errors)} failed in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)")
+    print(f"TCP connections opened: {sum(connections)}")
+    if latencies:
+        ordered = sorted(latencies)
+        percentile = lambda fraction: ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+        print(f"latency ms: p50 {statistics.median(ordered) * 1000:.2f}  p95 {percentile(0.95):.2f}  p99 {percentile(0.99):.2f}  max {ordered[-1] * 1000:.2f}")
+    for error in errors[:5]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
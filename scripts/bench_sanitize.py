@@ -0,0 +1,103 @@
+"""Compare the generated state sanitizer with a generic schema-walking validator.
+
+Both run the same leaf helpers from ``scripts/state_schema.py``; the difference
+is the per-field dispatch the generated code compiles away. Besides the real
+controller state, synthetic flat schemas of growing size show how the cost per
+POST scales with the number of fields:
+
+    python scripts/bench_sanitize.py
+    python scripts/bench_sanitize.py --sizes 10 100 1000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import re
+import time
+import timeit
+from typing import Any, Callable
+
+from state_schema import STATE, Choice, Color, Number, Object, Slots, Text, Toggle, interpret, python_function, python_source
+
+# Stand-ins for the hand-written leaves; the bridges' versions need the map
+# catalog and the blob store, and cost the same in both validators anyway.
+CUSTOM_LEAVES: dict[str, Callable[[Any], Any]] = {
+    "_sanitize_valorant_map": lambda value: value if isinstance(value, str) else "",
+    "_sanitize_valorant_map_pool": lambda value: list(value) if isinstance(value, list) else None,
+    "_sanitize_valorant_pick_sides": lambda value: {"defenders": "team1", "attackers": "team2"},
+    "_sanitize_particle_logo_source": lambda value: value if isinstance(value, str) else "",
+    "_sanitize_logo_particle_command": lambda value: None,
+}
+SYNTHETIC_LEAVES = (
+    Text(),
+    Number(0, 0, None, "floor"),
+    Number(0, -50, 50, "round"),
+    Number(1.0, 0.0, 2.0),
+    Toggle(),
+    Color("#e9eefc"),
+    Choice(("team1", "team2"), ""),
+)
+SYNTHETIC_VALUES = ("Team Liquid", 3, 12, 0.75, True, "#112233", "team2")
+
+
+def _namespace() -> dict[str, Any]:
+    namespace: dict[str, Any] = {"re": re, "math": math, "time": time, **CUSTOM_LEAVES}
+    exec(python_source(), namespace)
+    namespace["_schema_now"] = lambda: int(time.time() * 1000)
+    return namespace
+
+
+def _synthetic(size: int, namespace: dict[str, Any]) -> tuple[Object, Callable[[Any], Any], dict[str, Any]]:
+    fields = {f"field{index}": SYNTHETIC_LEAVES[index % len(SYNTHETIC_LEAVES)] for index in range(size)}
+    schema = Object(fields, python=f"_sanitize_synthetic_{size}")
+    exec(python_function(schema), namespace)
+    payload = {f"field{index}": SYNTHETIC_VALUES[index % len(SYNTHETIC_VALUES)] for index in range(size)}
+    return schema, namespace[schema.python], payload
+
+
+def _count_leaves(node: Any) -> int:
+    if isinstance(node, Object):
+        return sum(_count_leaves(child) for child in node.fields.values())
+    if isinstance(node, Slots):
+        return node.count
+    return 1
+
+
+def _best_us(call: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(call)
+    number, _elapsed = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def _row(label: str, fields: int, generic: float, compiled: float) -> str:
+    return (
+        f"{label:<12} {fields:>6} {generic:>11.1f} {compiled:>12.1f} "
+        f"{compiled * 1000 / fields:>10.0f} {generic / compiled:>8.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000], help="synthetic schema sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    namespace = _namespace()
+    compiled_state = namespace[STATE.python]
+    payload = compiled_state({"scoreboard": {"team1": {"name": "Team A", "score": 2}, "team2": {"name": "Team B", "score": 1}}})
+
+    print(f"{'schema':<12} {'fields':>6} {'generic us':>11} {'compiled us':>12} {'ns/field':>10} {'speedup':>9}")
+    generic = _best_us(lambda: interpret(STATE, payload, namespace), args.repeat)
+    compiled = _best_us(lambda: compiled_state(payload), args.repeat)
+    print(_row("state", _count_leaves(STATE), generic, compiled))
+    for size in args.sizes:
+        schema, compiled_synthetic, synthetic_payload = _synthetic(size, namespace)
+        assert compiled_synthetic(synthetic_payload) == interpret(schema, synthetic_payload, namespace)
+        generic = _best_us(lambda: interpret(schema, synthetic_payload, namespace), args.repeat)
+        compiled = _best_us(lambda: compiled_synthetic(synthetic_payload), args.repeat)
+        print(_row("synthetic", size, generic, compiled))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Talk to a running bridge over its Unix domain socket.
+
+Examples:
+
+    python scripts/bridge_socket.py get heroBans/team1
+    python scripts/bridge_socket.py patch '{"scoreboard": {"team1": {"score": 2}}}'
+    python scripts/bridge_socket.py command score.increment '{"team": "team1"}'
+    python scripts/bridge_socket.py signal logoParticle burst
+    python scripts/bridge_socket.py watch scoreboard
+    python scripts/bridge_socket.py --match grand-final get scoreboard
+    python scripts/bridge_socket.py undo
+    python scripts/bridge_socket.py bench --count 5000
+
+Every message is a 4-byte big-endian length followed by a UTF-8 JSON object;
+see ``LocalSocketSession`` in ``gui_tool.py`` for the message types.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import struct
+import sys
+import tempfile
+import time
+from typing import Any
+
+
+def _default_socket_path() -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, "ow2-hero-bans-8765.sock")
+
+
+class BridgeSocket:
+    def __init__(self, path: str, match: str | None = None) -> None:
+        self._match = match
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(path)
+        self._rfile = self._sock.makefile("rb")
+        self._seq = 0
+
+    def send(self, message: dict[str, Any]) -> int:
+        self._seq += 1
+        if self._match:
+            message = {**message, "match": self._match}
+        body = json.dumps({**message, "seq": self._seq}).encode("utf-8")
+        self._sock.sendall(struct.pack(">I", len(body)) + body)
+        return self._seq
+
+    def receive(self) -> dict[str, Any]:
+        header = self._rfile.read(4)
+        if len(header) < 4:
+            raise ConnectionError("bridge closed the socket")
+        (size,) = struct.unpack(">I", header)
+        return json.loads(self._rfile.read(size))
+
+    def request(self, message: dict[str, Any]) -> dict[str, Any]:
+        seq = self.send(message)
+        while True:
+            reply = self.receive()
+            if reply.get("seq") == seq:
+                if reply.get("type") == "error":
+                    raise RuntimeError(reply.get("error"))
+                return reply
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=_default_socket_path(), help="bridge socket path")
+    parser.add_argument("--match", help="match namespace to talk to (default: the default match)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    get = commands.add_parser("get", help="print the state or one section")
+    get.add_argument("section", nargs="?")
+    put = commands.add_parser("set", help="replace the whole state with a JSON document")
+    put.add_argument("state")
+    patch = commands.add_parser("patch", help="merge a partial JSON document into the state")
+    patch.add_argument("state")
+    command = commands.add_parser("command", help="run one state command (score.increment, ban.set, veto.set, ...)")
+    command.add_argument("name")
+    command.add_argument("args", nargs="?", default="{}")
+    signal = commands.add_parser("signal", help="fire a one-shot trigger (logoParticle burst, ...) without touching the state")
+    signal.add_argument("topic")
+    signal.add_argument("name")
+    signal.add_argument("--ttl", type=int, help="drop the signal if not delivered within this many ms")
+    commands.add_parser("undo", help="step back to the previous state")
+    commands.add_parser("redo", help="step forward again after an undo")
+    watch = commands.add_parser("watch", help="print every change of the state or one section")
+    watch.add_argument("section", nargs="?")
+    bench = commands.add_parser("bench", help="time round trips of score patches")
+    bench.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    client = BridgeSocket(args.socket, args.match)
+    if args.command == "get":
+        print(json.dumps(client.request({"type": "get", "section": args.section})["state"], indent=2))
+    elif args.command == "set":
+        print(client.request({"type": "set", "state": json.loads(args.state)})["version"])
+    elif args.command == "patch":
+        print(client.request({"type": "command", "name": "patch", "args": {"state": json.loads(args.state)}})["version"])
+    elif args.command == "command":
+        print(client.request({"type": "command", "name": args.name, "args": json.loads(args.args)})["version"])
+    elif args.command == "signal":
+        print(client.request({"type": "signal", "topic": args.topic, "name": args.name, "ttl": args.ttl})["signal"])
+    elif args.command in ("undo", "redo"):
+        print(client.request({"type": "command", "name": args.command, "args": {}})["version"])
+    elif args.command == "watch":
+        client.request({"type": "subscribe", "section": args.section})
+        try:
+            while True:
+                message = client.receive()
+                print(message["version"], json.dumps(message["state"]), flush=True)
+        except KeyboardInterrupt:
+            return
+    else:
+        latencies = []
+        for index in range(args.count):
+            started = time.perf_counter()
+            client.request({"type": "command", "name": "patch", "args": {"state": {"scoreboard": {"team1": {"score": index % 10}}}}})
+            latencies.append(time.perf_counter() - started)
+        total = sum(latencies)
+        print(f"{args.count} patches in {total:.2f}s ({args.count / total:.0f}/s)")
+        print(f"round trip us: p50 {statistics.median(latencies) * 1e6:.0f}  max {max(latencies) * 1e6:.0f}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, RuntimeError) as exc:
+        sys.exit(f"bridge_socket: {exc}")
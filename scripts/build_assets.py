@@ -0,0 +1,363 @@
+"""Bundle the overlay scripts and styles into minified, content-hashed files.
+
+``js/app.js`` serves every page; its page entries (``initControllerEntry``,
+``initHeroCardEntry``, ...) each become a chunk holding only the top-level
+functions and constants that entry reaches, so a scoreboard overlay no longer
+parses the controller or the hero catalog. Run after editing the scripts or
+styles:
+
+    python scripts/build_assets.py
+
+Output goes to ``bundles/``: ``<chunk>.<hash>.js``, ``styles.<hash>.css``,
+``heroes-data.<hash>.js`` and ``manifest.json``, which lists the hashed files
+each page loads in place of its ``./js/app.js``, ``./js/heroes-data.js`` and
+``./css/styles.css`` tags. The bridges rewrite the pages from the manifest and
+serve the hashed files as immutable; they ignore a manifest whose sources have
+changed since the build, so pages fall back to the unbundled files until this
+script is run again. Minification is conservative: comments, indentation and
+redundant spaces go, line breaks stay wherever automatic semicolon insertion
+could depend on them, and names are left as they are.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_SCRIPT = "js/app.js"
+HEROES_SCRIPT = "js/heroes-data.js"
+STYLESHEET = "css/styles.css"
+BUNDLES_DIR = ROOT_DIR / "bundles"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+
+
+@dataclass(frozen=True)
+class Entry:
+    """One page entry of ``js/app.js`` and the markup that makes ``init()`` run it."""
+
+    function: str
+    marker: str
+    overlay: bool = True
+
+
+# Mirrors init() in js/app.js: overlay entries only run on pages with the overlay-page body class.
+ENTRIES = {
+    "controller": Entry("initControllerEntry", "", overlay=False),
+    "hero-card": Entry("initHeroCardEntry", "data-overlay-team"),
+    "scoreboard": Entry("initScoreboardEntry", "data-scoreboard-role"),
+    "valorant-veto": Entry("initValorantVetoEntry", "data-valorant-map-veto-overlay"),
+    "particle": Entry("initParticleEntry", "data-logo-particle-overlay"),
+}
+# Chunks reaching this function read js/heroes-data.js; pages without one drop that script.
+HEROES_LOADER = "loadHeroes"
+
+_TOP_LEVEL_DECLARATION = re.compile(r"^  (?:async\s+)?(?:function\s*\*?\s*|const\s+|let\s+|var\s+)([A-Za-z_$][\w$]*)")
+_BOOTSTRAP = "  document.addEventListener('DOMContentLoaded', init);"
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+_BODY_CLASS = re.compile(r"<body\b[^>]*\bclass=\"([^\"]*)\"")
+_REGEX_KEYWORDS = frozenset(
+    {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "instanceof", "yield", "await"}
+)
+# A line break after these characters, or before the next set, never ends a statement.
+_JOIN_AFTER = "{;,([=:?&|"
+_JOIN_BEFORE = "}]),.;:?"
+
+
+def _word_char(char: str) -> bool:
+    return char.isalnum() or char in "_$" or ord(char) > 127
+
+
+def _needs_space(left: str, right: str) -> bool:
+    if _word_char(left) and _word_char(right):
+        return True
+    # Keep `a - -b`, `a + +b` and a division followed by a regex literal apart.
+    return (left in "+-" and right in "+-") or (left == "/" and right == "/")
+
+
+def minify_js(source: str) -> str:
+    """Strip comments and redundant whitespace, leaving strings, templates and regex literals untouched."""
+    out: list[str] = []
+    templates: list[int] = []  # brace depth at each open `${`
+    depth = 0
+    pending = ""  # "", " " or "\n": whitespace skipped since the last emitted token
+    last_word = ""
+    index, length = 0, len(source)
+
+    def emit(text: str) -> None:
+        nonlocal pending
+        previous = out[-1][-1] if out else ""
+        if previous and pending == "\n" and not (previous in _JOIN_AFTER or text[0] in _JOIN_BEFORE):
+            out.append("\n")
+        elif previous and pending and _needs_space(previous, text[0]):
+            out.append(" ")
+        pending = ""
+        out.append(text)
+
+    def scan_template(start: int) -> int:
+        """Index just past the template text starting at ``start``: after the closing backtick or the ``${``."""
+        position = start
+        while position < length:
+            char = source[position]
+            if char == "\\":
+                position += 2
+            elif char == "`":
+                return position + 1
+            elif char == "$" and source.startswith("${", position):
+                return position + 2
+            else:
+                position += 1
+        raise ValueError("unterminated template literal")
+
+    while index < length:
+        char = source[index]
+        if char in " \t\r\n":
+            end = index
+            while end < length and source[end] in " \t\r\n":
+                end += 1
+            if "\n" in source[index:end] or pending == "\n":
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            index = end
+            continue
+        if source.startswith("//", index):
+            end = source.find("\n", index)
+            index = length if end < 0 else end
+            continue
+        if source.startswith("/*", index):
+            end = source.find("*/", index + 2)
+            if end < 0:
+                raise ValueError("unterminated comment")
+            if "\n" in source[index:end]:
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            index = end + 2
+            continue
+        if char in "'\"":
+            end = index + 1
+            while end < length and source[end] != char:
+                if source[end] == "\n":
+                    raise ValueError(f"unterminated string at offset {index}")
+                end += 2 if source[end] == "\\" else 1
+            emit(source[index : end + 1])
+            index = end + 1
+            last_word = ""
+            continue
+        if char == "`" or (char == "}" and templates and templates[-1] == depth):
+            if char == "}":
+                templates.pop()
+            end = scan_template(index + 1)
+            emit(source[index:end])
+            if source.startswith("${", end - 2):
+                templates.append(depth)
+            index = end
+            last_word = ""
+            continue
+        if char == "/":
+            previous = out[-1][-1] if out else ""
+            if not previous or previous in "(,=:[!&|?{};+-*%<>~^" or last_word in _REGEX_KEYWORDS:
+                end = index + 1
+                in_class = False
+                while end < length and (in_class or source[end] != "/"):
+                    if source[end] == "\n":
+                        raise ValueError(f"unterminated regex at offset {index}")
+                    if source[end] == "\\":
+                        end += 1
+                    elif source[end] == "[":
+                        in_class = True
+                    elif source[end] == "]":
+                        in_class = False
+                    end += 1
+                end += 1
+                while end < length and source[end].isalpha():
+                    end += 1
+                emit(source[index:end])
+                index = end
+                last_word = ""
+                continue
+        if _word_char(char):
+            end = index + 1
+            while end < length and (_word_char(source[end]) or (source[end] == "." and source[index].isdigit())):
+                end += 1
+            last_word = source[index:end]
+            emit(last_word)
+            index = end
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        emit(char)
+        index += 1
+        last_word = ""
+    return "".join(out) + "\n"
+
+
+def minify_css(source: str) -> str:
+    """Strip comments and collapse whitespace; strings and selectors keep their meaning."""
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};,])\s*", r"\1", source)
+    return source.replace(";}", "}").strip() + "\n"
+
+
+@dataclass
+class Unit:
+    """One top-level declaration of ``js/app.js`` with the comments above it."""
+
+    name: str
+    source: str
+    references: frozenset[str] = frozenset()
+
+
+def split_units(source: str) -> list[Unit]:
+    """Cut the body of the ``js/app.js`` IIFE into its top-level declarations."""
+    lines = source.splitlines()
+    if lines[0] != "(() => {" or lines[-1] != "})();":
+        raise ValueError(f"{APP_SCRIPT} is not a single (() => { ... })(); wrapper")
+    units: list[Unit] = []
+    leading: list[str] = []
+    for number, line in enumerate(lines[1:-1], start=2):
+        match = _TOP_LEVEL_DECLARATION.match(line)
+        if match:
+            units.append(Unit(match.group(1), "\n".join([*leading, line])))
+            leading = []
+        elif line.startswith("  //") and not line.startswith("   "):
+            leading.append(line)
+        elif line == _BOOTSTRAP:
+            continue
+        elif line.strip() and not line.startswith("   ") and not re.match(r"^  [}\])]", line):
+            raise ValueError(f"{APP_SCRIPT}:{number}: unsupported top-level statement: {line.strip()}")
+        elif units:
+            units[-1].source += "\n" + line
+    names = {unit.name for unit in units}
+    for unit in units:
+        minified = minify_js(unit.source)
+        unit.references = frozenset(_IDENTIFIER.findall(minified)) & names - {unit.name}
+    return units
+
+
+def reachable(units: list[Unit], entry: str) -> set[str]:
+    by_name = {unit.name: unit for unit in units}
+    if entry not in by_name:
+        raise ValueError(f"{APP_SCRIPT} has no entry function {entry}")
+    found = {entry}
+    pending = [entry]
+    while pending:
+        for name in by_name[pending.pop()].references - found:
+            found.add(name)
+            pending.append(name)
+    return found
+
+
+def chunk_source(units: list[Unit], names: set[str], entry: str) -> str:
+    body = "\n".join(unit.source for unit in units if unit.name in names)
+    return f"(() => {{\n{body}\n  document.addEventListener('DOMContentLoaded', {entry});\n}})();\n"
+
+
+def page_entries(html: str) -> list[str]:
+    body_class = _BODY_CLASS.search(html)
+    classes = body_class.group(1).split() if body_class else []
+    chunks = []
+    for chunk, entry in ENTRIES.items():
+        if entry.overlay:
+            if "overlay-page" in classes and re.search(rf"\b{entry.marker}\b", html):
+                chunks.append(chunk)
+        elif "control-page" in classes:
+            chunks.append(chunk)
+    return chunks
+
+
+def _hashed_name(stem: str, suffix: str, content: bytes) -> str:
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{suffix}"
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_bytes(content)
+    os.replace(temp_path, path)
+
+
+def build(out_dir: Path = BUNDLES_DIR, verbose: bool = True) -> dict:
+    sources = {name: (ROOT_DIR / name).read_bytes() for name in (APP_SCRIPT, HEROES_SCRIPT, STYLESHEET)}
+    units = split_units(sources[APP_SCRIPT].decode("utf-8"))
+    outputs: dict[str, bytes] = {}
+    chunk_files: dict[str, str] = {}
+    chunk_heroes: dict[str, bool] = {}
+    for chunk, entry in ENTRIES.items():
+        names = reachable(units, entry.function)
+        content = minify_js(chunk_source(units, names, entry.function)).encode("utf-8")
+        chunk_files[chunk] = _hashed_name(chunk, ".js", content)
+        chunk_heroes[chunk] = HEROES_LOADER in names
+        outputs[chunk_files[chunk]] = content
+    heroes = minify_js(sources[HEROES_SCRIPT].decode("utf-8")).encode("utf-8")
+    heroes_file = _hashed_name("heroes-data", ".js", heroes)
+    outputs[heroes_file] = heroes
+    styles = minify_css(sources[STYLESHEET].decode("utf-8")).encode("utf-8")
+    styles_file = _hashed_name("styles", ".css", styles)
+    outputs[styles_file] = styles
+
+    try:
+        prefix = out_dir.resolve().relative_to(ROOT_DIR).as_posix()
+    except ValueError:
+        raise ValueError(f"{out_dir} is outside {ROOT_DIR}; the bridges only serve files under it") from None
+    pages = {}
+    # The overlay templates are pages too once the bridge has rendered them.
+    for page in sorted([*ROOT_DIR.glob("*.html"), *ROOT_DIR.glob("templates/*.html")]):
+        chunks = page_entries(page.read_text(encoding="utf-8"))
+        pages[page.relative_to(ROOT_DIR).as_posix()] = {
+            APP_SCRIPT: [f"{prefix}/{chunk_files[chunk]}" for chunk in chunks],
+            HEROES_SCRIPT: [f"{prefix}/{heroes_file}"] if any(chunk_heroes[chunk] for chunk in chunks) else [],
+            STYLESHEET: [f"{prefix}/{styles_file}"],
+        }
+    manifest = {
+        "version": 1,
+        "sources": {name: hashlib.sha256(content).hexdigest() for name, content in sources.items()},
+        "pages": pages,
+    }
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, content in outputs.items():
+        if not (out_dir / name).exists():
+            _write_atomic(out_dir / name, content)
+    _write_atomic(out_dir / MANIFEST_NAME, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    # Hashed files of earlier builds are only removed once the new manifest no longer names them.
+    for stale in out_dir.iterdir():
+        if stale.name != MANIFEST_NAME and stale.name not in outputs and not stale.name.startswith("."):
+            stale.unlink()
+
+    if verbose:
+        total = sum(len(content) for content in sources.values())
+        print(f"sources: {total} bytes ({', '.join(sources)})")
+        for name, content in outputs.items():
+            print(f"  {prefix}/{name}: {len(content)} bytes")
+        for page, refs in pages.items():
+            loaded = sum(len(outputs[ref.rsplit("/", 1)[1]]) for files in refs.values() for ref in files)
+            print(f"  {page}: {loaded} bytes")
+    return manifest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, default=BUNDLES_DIR, help="output directory under the repository root")
+    parser.add_argument("--quiet", action="store_true", help="do not print the file sizes")
+    args = parser.parse_args()
+    try:
+        build(args.out.resolve(), verbose=not args.quiet)
+    except (OSError, ValueError) as exc:
+        print(f"build_assets: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,621 @@
+"""Declarative schema of the shared controller state and the sanitizer generator.
+
+The state is validated in three places: the GUI bridge (``gui_tool.py``), the
+OBS dock bridge (``obs_hero_bans_dock.py``) and the browser (``js/app.js``).
+All three sanitizers are generated from ``STATE`` below as flat, straight-line
+functions, so adding a field means editing this file and running:
+
+    python scripts/state_schema.py          # rewrite the generated blocks
+    python scripts/state_schema.py --check  # exit 1 if any block is stale
+
+The generated code lives between the ``BEGIN GENERATED STATE SANITIZER`` and
+``END GENERATED STATE SANITIZER`` markers of each target. The Python output
+sticks to Python 3.6 syntax because OBS may embed an old interpreter.
+Leaves that need bridge- or browser-only knowledge (the Valorant map catalog,
+the blob store) are ``Custom`` fields naming a hand-written function per
+language.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Union
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PYTHON_TARGETS = (ROOT_DIR / "gui_tool.py", ROOT_DIR / "obs_hero_bans_dock.py")
+JS_TARGETS = (ROOT_DIR / "js" / "app.js",)
+BEGIN_MARKER = "BEGIN GENERATED STATE SANITIZER (scripts/state_schema.py; do not edit by hand)"
+END_MARKER = "END GENERATED STATE SANITIZER"
+
+BUILTIN_FONTS = ("varsity", "block", "classic")
+COLOR_PATTERN = r"#[0-9a-fA-F]{6}"
+FONT_FILE_PATTERN = r"file:[a-zA-Z0-9_./ %\\-]+\.(ttf|otf|woff2?)"
+
+
+@dataclass(frozen=True)
+class Text:
+    """Any string; empty strings and non-strings become ``default``."""
+
+    default: str = ""
+
+
+@dataclass(frozen=True)
+class Toggle:
+    """Boolean that also accepts numbers (non-zero is true) and the strings "1", "true", "yes" and "on"."""
+
+    default: bool = False
+
+
+@dataclass(frozen=True)
+class Flag:
+    """Strict boolean; anything that is not ``true``/``false`` becomes ``default``."""
+
+    default: bool
+
+
+@dataclass(frozen=True)
+class Number:
+    """Finite number or numeric string, clamped to ``minimum``/``maximum``.
+
+    ``rounding`` is ``None`` for floats, ``"round"`` (half up, like
+    ``Math.round``) or ``"floor"`` for integers.
+    """
+
+    default: float
+    minimum: float | None = None
+    maximum: float | None = None
+    rounding: str | None = None
+
+
+@dataclass(frozen=True)
+class Color:
+    """``#rrggbb`` hex color."""
+
+    default: str
+
+
+@dataclass(frozen=True)
+class Font:
+    """One of ``BUILTIN_FONTS`` or a ``file:`` token for a font under ``assets/Fonts``."""
+
+    default: str = "varsity"
+
+
+@dataclass(frozen=True)
+class Choice:
+    options: tuple[str, ...]
+    default: str
+
+
+@dataclass(frozen=True)
+class Custom:
+    """Leaf checked by a hand-written function in each language."""
+
+    python: str
+    js: str
+
+
+@dataclass(frozen=True)
+class Slots:
+    """Fixed-length list; missing entries are sanitized from ``None``/``undefined``."""
+
+    item: Field
+    count: int
+
+
+@dataclass(frozen=True)
+class Timestamp:
+    """Milliseconds since the epoch: the commit time on the bridges, the payload's (or now) in the browser."""
+
+
+@dataclass(frozen=True)
+class Object:
+    """Nested object. Named objects get their own generated function, which other code can call."""
+
+    fields: dict[str, Field] = field(hash=False)
+    python: str | None = None
+    js: str | None = None
+
+
+Field = Union[Text, Toggle, Flag, Number, Color, Font, Choice, Custom, Slots, Timestamp, Object]
+
+TEAM_STYLE = Object({
+    "name": Text(),
+    "nameUsePng": Toggle(),
+    "namePng": Text(),
+    "namePngScale": Number(0, -50, 50, "round"),
+    "logo": Text(),
+    "logoScale": Number(0, -50, 50, "round"),
+    "score": Number(0, 0, None, "floor"),
+    "nameColor": Color("#e9eefc"),
+    "bevelColor": Color("#7dd3fc"),
+    "nameFont": Font(),
+})
+VALORANT_MAP = Custom(python="_sanitize_valorant_map", js="sanitizeValorantMapSelection")
+PICK_SIDES = Custom(python="_sanitize_valorant_pick_sides", js="sanitizeValorantPickSides")
+GAME_SCORE = Object({
+    "winner": Choice(("team1", "team2"), ""),
+    "team1Score": Number(0, 0, None, "floor"),
+    "team2Score": Number(0, 0, None, "floor"),
+})
+
+STATE = Object(
+    {
+        "team1": Object({"ban": Text()}),
+        "team2": Object({"ban": Text()}),
+        "scoreboard": Object({"team1": TEAM_STYLE, "team2": TEAM_STYLE}),
+        "valorantMapVeto": Object({key: VALORANT_MAP for key in ("ban1", "ban2", "pick1", "pick2", "ban3", "ban4", "pick3")}),
+        # The bridges store ``null`` until a controller sends a pool; the browser reads that as "every map".
+        "valorantMapPool": Custom(python="_sanitize_valorant_map_pool", js="sanitizeValorantMapPool"),
+        "valorantPickSides": Object({key: PICK_SIDES for key in ("pick1", "pick2", "pick3")}),
+        "valorantGameScore": Object({key: GAME_SCORE for key in ("pick1", "pick2", "pick3")}),
+        "logoParticle": Object(
+            {
+                "density": Number(6, 3, 12, "round"),
+                "size": Number(2.0, 1.0, 5.0),
+                "speed": Number(0.08, 0.03, 0.2),
+                "depth": Number(0.55, 0.0, 1.0),
+                "startAngle": Number(10, 0, 359, "round"),
+                "team1Reset": Flag(True),
+                "holdTime": Number(6, 2, 15, "round"),
+                "burstForce": Number(1.0, 0.0, 2.0),
+                "cameraDistance": Number(700, 420, 1100, "round"),
+                "activeLogoIndex": Number(0, 0, 1, "round"),
+                "logoSources": Slots(Custom(python="_sanitize_particle_logo_source", js="sanitizeParticleLogoSource"), 2),
+                "command": Custom(python="_sanitize_logo_particle_command", js="sanitizeParticleCommand"),
+            },
+            python="_sanitize_logo_particle_state",
+            js="sanitizeLogoParticleState",
+        ),
+        "updatedAt": Timestamp(),
+    },
+    python="_sanitize_state",
+    js="sanitizeState",
+)
+
+
+def _snake(key: str) -> str:
+    return re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", key).lower()
+
+
+def _camel(parts: list[str]) -> str:
+    return parts[0] + "".join(part[:1].upper() + part[1:] for part in parts[1:])
+
+
+def _named_objects(node: Field, found: dict[str, Object]) -> dict[str, Object]:
+    """Every named object under ``node`` (itself included), outermost first."""
+    if isinstance(node, Object):
+        if node.python:
+            found.setdefault(node.python, node)
+        for child in node.fields.values():
+            _named_objects(child, found)
+    elif isinstance(node, Slots):
+        _named_objects(node.item, found)
+    return found
+
+
+# -- Python -------------------------------------------------------------------
+
+PYTHON_HELPERS = '''_SCHEMA_COLOR_RE = re.compile(r"{color}")
+_SCHEMA_FONT_FILE_RE = re.compile(r"{font_file}", re.IGNORECASE)
+_SCHEMA_BUILTIN_FONTS = {fonts}
+
+
+def _schema_list(value):
+    return value if isinstance(value, (list, tuple)) else ()
+
+
+def _schema_number(value):
+    # ints are by far the most common input, so they skip the float round trip.
+    if type(value) is int:
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        numeric = float(value)
+    except ValueError:
+        return None
+    return numeric if math.isfinite(numeric) else None
+
+
+def _schema_float(value, default, minimum, maximum):
+    numeric = None if value is None else _schema_number(value)
+    if numeric is None:
+        return default
+    if minimum is not None and numeric < minimum:
+        return minimum
+    if maximum is not None and numeric > maximum:
+        return maximum
+    return numeric
+
+
+def _schema_int(value, default, minimum, maximum):
+    numeric = None if value is None else _schema_number(value)
+    if numeric is None:
+        return default
+    if type(numeric) is not int:
+        numeric = int(math.floor(numeric + 0.5))
+    if minimum is not None and numeric < minimum:
+        return minimum
+    if maximum is not None and numeric > maximum:
+        return maximum
+    return numeric
+
+
+def _schema_floor(value, default, minimum, maximum):
+    numeric = None if value is None else _schema_number(value)
+    if numeric is None:
+        return default
+    if type(numeric) is not int:
+        numeric = int(math.floor(numeric))
+    if minimum is not None and numeric < minimum:
+        return minimum
+    if maximum is not None and numeric > maximum:
+        return maximum
+    return numeric
+
+
+def _schema_text(value, default):
+    return value if isinstance(value, str) and value else default
+
+
+def _schema_toggle(value, default):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(value, (int, float)):
+        return value != 0
+    return default
+
+
+def _schema_flag(value, default):
+    return value if isinstance(value, bool) else default
+
+
+def _schema_color(value, default):
+    raw = value.strip() if isinstance(value, str) else ""
+    return raw if _SCHEMA_COLOR_RE.fullmatch(raw) else default
+
+
+def _schema_font(value, default):
+    raw = value.strip() if isinstance(value, str) else ""
+    return raw if raw in _SCHEMA_BUILTIN_FONTS or _SCHEMA_FONT_FILE_RE.fullmatch(raw) else default
+
+
+def _schema_choice(value, options, default):
+    raw = value.strip() if isinstance(value, str) else ""
+    return raw if raw in options else default
+'''.format(color=COLOR_PATTERN, font_file=FONT_FILE_PATTERN, fonts="(" + ", ".join(json.dumps(font) for font in BUILTIN_FONTS) + ")")
+
+
+def _python_literal(value: Any) -> str:
+    if isinstance(value, str):
+        return json.dumps(value)
+    if isinstance(value, tuple):
+        return "(" + ", ".join(_python_literal(item) for item in value) + ("," if len(value) == 1 else "") + ")"
+    return repr(value)
+
+
+def _python_leaf(node: Field, value: str) -> str:
+    if isinstance(node, Text):
+        return f"_schema_text({value}, {_python_literal(node.default)})"
+    if isinstance(node, Toggle):
+        return f"_schema_toggle({value}, {_python_literal(node.default)})"
+    if isinstance(node, Flag):
+        return f"_schema_flag({value}, {_python_literal(node.default)})"
+    if isinstance(node, Number):
+        helper = {None: "_schema_float", "round": "_schema_int", "floor": "_schema_floor"}[node.rounding]
+        return f"{helper}({value}, {_python_literal(node.default)}, {_python_literal(node.minimum)}, {_python_literal(node.maximum)})"
+    if isinstance(node, Color):
+        return f"_schema_color({value}, {_python_literal(node.default)})"
+    if isinstance(node, Font):
+        return f"_schema_font({value}, {_python_literal(node.default)})"
+    if isinstance(node, Choice):
+        return f"_schema_choice({value}, {_python_literal(node.options)}, {_python_literal(node.default)})"
+    if isinstance(node, Custom):
+        return f"{node.python}({value})"
+    if isinstance(node, Timestamp):
+        return "int(time.time() * 1000)"
+    raise TypeError(f"unsupported schema node {node!r}")
+
+
+def _python_guard(node: Field, local: str) -> str | None:
+    """Condition under which ``local`` is already valid, so the common case needs no helper call."""
+    if isinstance(node, Text):
+        return f"type({local}) is str and {local}"
+    if isinstance(node, (Toggle, Flag)):
+        return f"type({local}) is bool"
+    if isinstance(node, Number) and (node.rounding or (node.minimum is not None and node.maximum is not None)):
+        bounds = [f"{_python_literal(node.minimum)} <= {local}"] if node.minimum is not None else []
+        bounds += [f"{local} <= {_python_literal(node.maximum)}"] if node.maximum is not None else []
+        kind = "int" if node.rounding else "float"
+        return " and ".join([f"type({local}) is {kind}", *bounds])
+    return None
+
+
+def _python_value(node: Field, source: str, key: str, path: list[str], setup: list[str], indent: str) -> str:
+    value = f"{source}.get({_python_literal(key)})"
+    local = "_".join(_snake(part) for part in path)
+    if isinstance(node, Object) and node.python:
+        return f"{node.python}({value})"
+    if isinstance(node, Object):
+        setup.extend([f"    {local} = {value}", f"    if type({local}) is not dict:", f"        {local} = {{}}"])
+        return _python_object(node, local, path, setup, indent)
+    if isinstance(node, Slots):
+        setup.append(f"    {local} = _schema_list({value})")
+        items = [
+            _python_leaf(node.item, f"{local}[{index}] if len({local}) > {index} else None")
+            for index in range(node.count)
+        ]
+        inner = indent + "    "
+        return "[\n" + "".join(f"{inner}{item},\n" for item in items) + f"{indent}]"
+    guard = _python_guard(node, local)
+    if guard is None:
+        return _python_leaf(node, value)
+    setup.append(f"    {local} = {value}")
+    fallback = _python_literal(node.default) if isinstance(node, Text) else _python_leaf(node, local)
+    return f"{local} if {guard} else {fallback}"
+
+
+def _python_object(node: Object, source: str, path: list[str], setup: list[str], indent: str) -> str:
+    inner = indent + "    "
+    lines = ["{"]
+    for key, child in node.fields.items():
+        lines.append(f"{inner}{_python_literal(key)}: {_python_value(child, source, key, path + [key], setup, inner)},")
+    lines.append(indent + "}")
+    return "\n".join(lines)
+
+
+def python_function(node: Object) -> str:
+    setup: list[str] = []
+    body = _python_object(node, "source", [], setup, "    ")
+    lines = [f"def {node.python}(payload):", "    source = payload if type(payload) is dict else {}", *setup, f"    return {body}"]
+    return "\n".join(lines) + "\n"
+
+
+def python_source(schema: Object = STATE) -> str:
+    functions = [python_function(node) for node in _named_objects(schema, {}).values()]
+    return PYTHON_HELPERS + "\n\n" + "\n\n".join(functions)
+
+
+# -- JavaScript -----------------------------------------------------------------
+
+JS_HELPERS = '''function schemaObject(value) {{
+  return value && typeof value === 'object' && !Array.isArray(value) ? value : {{}};
+}}
+
+function schemaList(value) {{
+  return Array.isArray(value) ? value : [];
+}}
+
+function schemaNumber(value) {{
+  if (typeof value === 'number') return Number.isFinite(value) ? value : null;
+  if (typeof value !== 'string' || !value.trim()) return null;
+  const numeric = Number(value);
+  return Number.isFinite(numeric) ? numeric : null;
+}}
+
+function schemaClamp(numeric, min, max) {{
+  if (min !== null && numeric < min) return min;
+  if (max !== null && numeric > max) return max;
+  return numeric;
+}}
+
+function schemaFloat(value, fallback, min, max) {{
+  const numeric = schemaNumber(value);
+  return numeric === null ? fallback : schemaClamp(numeric, min, max);
+}}
+
+function schemaInt(value, fallback, min, max) {{
+  const numeric = schemaNumber(value);
+  return numeric === null ? fallback : schemaClamp(Math.floor(numeric + 0.5), min, max);
+}}
+
+function schemaFloor(value, fallback, min, max) {{
+  const numeric = schemaNumber(value);
+  return numeric === null ? fallback : schemaClamp(Math.floor(numeric), min, max);
+}}
+
+function schemaText(value, fallback) {{
+  return typeof value === 'string' && value ? value : fallback;
+}}
+
+function schemaToggle(value, fallback) {{
+  if (typeof value === 'boolean') return value;
+  if (typeof value === 'string') return ['1', 'true', 'yes', 'on'].includes(value.trim().toLowerCase());
+  if (typeof value === 'number') return value !== 0;
+  return fallback;
+}}
+
+function schemaFlag(value, fallback) {{
+  return typeof value === 'boolean' ? value : fallback;
+}}
+
+function schemaColor(value, fallback) {{
+  const raw = typeof value === 'string' ? value.trim() : '';
+  return /^{color}$/.test(raw) ? raw : fallback;
+}}
+
+function schemaFont(value, fallback) {{
+  const raw = typeof value === 'string' ? value.trim() : '';
+  if ({builtins}) return raw;
+  return /^{font_file}$/i.test(raw) ? raw : fallback;
+}}
+
+function schemaChoice(value, options, fallback) {{
+  const raw = typeof value === 'string' ? value.trim() : '';
+  return options.includes(raw) ? raw : fallback;
+}}
+'''.format(
+    color=COLOR_PATTERN,
+    font_file=FONT_FILE_PATTERN,
+    builtins=" || ".join(f"raw === '{font}'" for font in BUILTIN_FONTS),
+)
+
+
+def _js_literal(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, tuple):
+        return "[" + ", ".join(_js_literal(item) for item in value) + "]"
+    return repr(value)
+
+
+def _js_leaf(node: Field, value: str) -> str:
+    if isinstance(node, Text):
+        return f"schemaText({value}, {_js_literal(node.default)})"
+    if isinstance(node, Toggle):
+        return f"schemaToggle({value}, {_js_literal(node.default)})"
+    if isinstance(node, Flag):
+        return f"schemaFlag({value}, {_js_literal(node.default)})"
+    if isinstance(node, Number):
+        helper = {None: "schemaFloat", "round": "schemaInt", "floor": "schemaFloor"}[node.rounding]
+        return f"{helper}({value}, {_js_literal(node.default)}, {_js_literal(node.minimum)}, {_js_literal(node.maximum)})"
+    if isinstance(node, Color):
+        return f"schemaColor({value}, {_js_literal(node.default)})"
+    if isinstance(node, Font):
+        return f"schemaFont({value}, {_js_literal(node.default)})"
+    if isinstance(node, Choice):
+        return f"schemaChoice({value}, {_js_literal(node.options)}, {_js_literal(node.default)})"
+    if isinstance(node, Custom):
+        return f"{node.js}({value})"
+    if isinstance(node, Timestamp):
+        return f"Number({value}) || Date.now()"
+    raise TypeError(f"unsupported schema node {node!r}")
+
+
+def _js_value(node: Field, source: str, key: str, path: list[str], setup: list[str], indent: str) -> str:
+    value = f"{source}.{key}"
+    if isinstance(node, Object) and node.js:
+        return f"{node.js}({value})"
+    if isinstance(node, Object):
+        local = _camel(path)
+        setup.append(f"  const {local} = schemaObject({value});")
+        return _js_object(node, local, path, setup, indent)
+    if isinstance(node, Slots):
+        local = _camel(path)
+        setup.append(f"  const {local} = schemaList({value});")
+        return "[" + ", ".join(_js_leaf(node.item, f"{local}[{index}]") for index in range(node.count)) + "]"
+    return _js_leaf(node, value)
+
+
+def _js_object(node: Object, source: str, path: list[str], setup: list[str], indent: str) -> str:
+    inner = indent + "  "
+    entries = [f"{inner}{key}: {_js_value(child, source, key, path + [key], setup, inner)}" for key, child in node.fields.items()]
+    return "{\n" + ",\n".join(entries) + f"\n{indent}}}"
+
+
+def js_function(node: Object) -> str:
+    setup: list[str] = []
+    body = _js_object(node, "source", [], setup, "  ")
+    lines = [f"function {node.js}(payload) {{", "  const source = schemaObject(payload);", *setup, f"  return {body};", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def js_source(schema: Object = STATE) -> str:
+    functions = [js_function(node) for node in _named_objects(schema, {}).values()]
+    return JS_HELPERS + "\n" + "\n".join(functions)
+
+
+# -- Reference interpreter --------------------------------------------------------
+
+
+def interpret(node: Field, value: Any, namespace: dict[str, Any]) -> Any:
+    """Sanitize ``value`` by walking the schema at run time.
+
+    This is the generic, recursive validator the generated code replaces; it
+    calls the same leaf helpers (looked up in ``namespace``), so it serves as
+    the reference for ``scripts/bench_sanitize.py``.
+    """
+    if isinstance(node, Object):
+        source = value if isinstance(value, dict) else {}
+        return {key: interpret(child, source.get(key), namespace) for key, child in node.fields.items()}
+    if isinstance(node, Slots):
+        items = value if isinstance(value, (list, tuple)) else ()
+        return [interpret(node.item, items[index] if len(items) > index else None, namespace) for index in range(node.count)]
+    if isinstance(node, Text):
+        return namespace["_schema_text"](value, node.default)
+    if isinstance(node, Toggle):
+        return namespace["_schema_toggle"](value, node.default)
+    if isinstance(node, Flag):
+        return namespace["_schema_flag"](value, node.default)
+    if isinstance(node, Number):
+        helper = {None: "_schema_float", "round": "_schema_int", "floor": "_schema_floor"}[node.rounding]
+        return namespace[helper](value, node.default, node.minimum, node.maximum)
+    if isinstance(node, Color):
+        return namespace["_schema_color"](value, node.default)
+    if isinstance(node, Font):
+        return namespace["_schema_font"](value, node.default)
+    if isinstance(node, Choice):
+        return namespace["_schema_choice"](value, node.options, node.default)
+    if isinstance(node, Custom):
+        return namespace[node.python](value)
+    if isinstance(node, Timestamp):
+        return namespace["_schema_now"]()
+    raise TypeError(f"unsupported schema node {node!r}")
+
+
+# -- Targets ----------------------------------------------------------------------
+
+
+def _indent(source: str, prefix: str) -> str:
+    return "".join(prefix + line if line.strip() else line for line in source.splitlines(keepends=True))
+
+
+def render(text: str, generated: str, comment: str, prefix: str) -> str:
+    """Replace the generated block of ``text`` (markers included) with ``generated``."""
+    pattern = re.compile(
+        rf"^([ \t]*){re.escape(comment)} {re.escape(BEGIN_MARKER)}\n.*?^[ \t]*{re.escape(comment)} {re.escape(END_MARKER)}\n",
+        re.MULTILINE | re.DOTALL,
+    )
+    block = f"{prefix}{comment} {BEGIN_MARKER}\n{_indent(generated, prefix)}{prefix}{comment} {END_MARKER}\n"
+    rendered, count = pattern.subn(lambda _match: block, text)
+    if count != 1:
+        raise ValueError(f"expected exactly one generated block, found {count}")
+    return rendered
+
+
+def _targets() -> list[tuple[Path, str]]:
+    python = python_source()
+    javascript = js_source()
+    targets = []
+    for path in PYTHON_TARGETS:
+        text = path.read_text(encoding="utf-8")
+        targets.append((path, render(text, python, "#", "")))
+    for path in JS_TARGETS:
+        text = path.read_text(encoding="utf-8")
+        targets.append((path, render(text, javascript, "//", "  ")))
+    return targets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="only report stale generated blocks")
+    args = parser.parse_args()
+
+    stale = []
+    for path, rendered in _targets():
+        if rendered == path.read_text(encoding="utf-8"):
+            continue
+        stale.append(path)
+        if not args.check:
+            path.write_text(rendered, encoding="utf-8")
+    for path in stale:
+        print(f"{'stale' if args.check else 'updated'}: {path.relative_to(ROOT_DIR)}")
+    return 1 if args.check and stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())